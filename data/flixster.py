@@ -14,6 +14,8 @@ Instruction
 3. Run this script. As default, converted files are generated at
    ``../kamrecsys/datasets/data/`` directory. If you want change the target
    directory, you need to specify it as the first argument of this script.
+   If ``--binary`` option is specified, data are also saved in a binary
+   format, which the sample loader memory-maps without parsing texts.
 4. Remove original files, if you do not need them.
 """
 
@@ -60,8 +62,10 @@ if ('-h' in sys.argv) or ('--help' in sys.argv):
 # set directories
 stem = 'flixster'
 pwd = os.path.dirname(__file__)
-if len(sys.argv) >= 2:
-    target = sys.argv[1]
+binary = '--binary' in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != '--binary']
+if len(args) >= 1:
+    target = args[0]
 else:
     target = os.path.join(pwd, '..', 'kamrecsys', 'datasets', 'data')
 
@@ -94,9 +98,16 @@ print(
     "#     {0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0}\n",
     end='', file=outfile)
 
-for line in infile.readlines():
+for line in infile:
     f = line.rstrip('\r\n').split('\t')
     print(f[0], f[1], f[2], sep='\t', file=outfile)
 
 infile.close()
 outfile.close()
+
+# convert into a binary format ------------------------------------------------
+
+if binary:
+    from kamrecsys.datasets import convert_binary
+
+    convert_binary(stem, target, (0.5, 5.0, 0.5))
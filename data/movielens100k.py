@@ -13,6 +13,8 @@ Instruction
 3. Run this script. As default, converted files are generated at
    ../kamrecsys/datasets/data/ directory. If you want change the target
    directory, you need to specify it as the first argument of this script.
+   If ``--binary`` option is specified, data are also saved in a binary
+   format, which the sample loader memory-maps without parsing texts.
 4. Remove original files, if you do not need them.
 """
 
@@ -59,8 +61,10 @@ if ('-h' in sys.argv) or ('--help' in sys.argv):
 # set directories
 stem = 'movielens100k'
 pwd = os.path.dirname(__file__)
-if len(sys.argv) >= 2:
-    target = sys.argv[1]
+binary = '--binary' in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != '--binary']
+if len(args) >= 1:
+    target = args[0]
 else:
     target = os.path.join(pwd, '..', "kamrecsys", 'datasets', 'data')
 
@@ -94,7 +98,7 @@ print(
     "#     UNIX seconds since 1/1/1970 UTC\n",
     end='', file=outfile)
 
-for line in infile.readlines():
+for line in infile:
     f = line.rstrip('\r\n').split("\t")
     print("\t".join(f), file=outfile)
 
@@ -137,7 +141,7 @@ occupation = {'none': 0, 'other': 1, 'administrator': 2, 'artist': 3,
               'retired': 15, 'salesman': 16, 'scientist': 17, 'student': 18,
               'technician': 19, 'writer': 20}
 
-for line in infile.readlines():
+for line in infile:
     f = line.rstrip('\r\n').split("|")
     print(f[0], f[1], sep='\t', end='\t', file=outfile)
     if f[2] == 'M':
@@ -187,7 +191,7 @@ print(
 month = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6, 'Jul': 7,
          'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
 
-for line in infile.readlines():
+for line in infile:
     f = line.rstrip('\r\n').split("|")
     print(f[0], f[1], sep='\t', end='\t', file=outfile)
     d = f[2].split('-')
@@ -200,3 +204,19 @@ for line in infile.readlines():
 
 infile.close()
 outfile.close()
+
+# convert into a binary format ------------------------------------------------
+
+if binary:
+    from functools import partial
+    from kamrecsys.datasets import convert_binary, event_dtype_timestamp
+    from kamrecsys.datasets.movielens import (
+        _read_movielens100k_user, _read_movielens100k_item)
+
+    user_file = os.path.join(target, stem + '.user')
+    item_file = os.path.join(target, stem + '.item')
+    convert_binary(
+        stem, target, (1., 5., 1.), event_dtype=event_dtype_timestamp,
+        readers=[(0, partial(_read_movielens100k_user, user_file)),
+                 (1, partial(_read_movielens100k_item, item_file))],
+        sources=[user_file, item_file])
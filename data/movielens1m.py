@@ -13,6 +13,8 @@ Instruction
 3. Run this script. As default, converted files are generated at
    ../kamrecsys/datasets/data/ directory. If you want change the target
    directory, you need to specify it as the first argument of this script.
+   If ``--binary`` option is specified, data are also saved in a binary
+   format, which the sample loader memory-maps without parsing texts.
 4. Remove original files, if you do not need them.
 """
 
@@ -60,8 +62,10 @@ if ('-h' in sys.argv) or ('--help' in sys.argv):
 # set directories
 stem = 'movielens1m'
 pwd = os.path.dirname(__file__)
-if len(sys.argv) >= 2:
-    target = sys.argv[1]
+binary = '--binary' in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != '--binary']
+if len(args) >= 1:
+    target = args[0]
 else:
     target = os.path.join(pwd, '..', "kamrecsys", 'datasets', 'data')
 
@@ -101,7 +105,7 @@ print(
     "#     represented in seconds since the epoch as returned by time(2)\n",
     end='', file=outfile)
 
-for line in infile.readlines():
+for line in infile:
     f = line.rstrip('\r\n').split("::")
     print('\t'.join(f), file=outfile)
 
@@ -146,7 +150,7 @@ print(
 
 age = {'1': 0, '18': 1, '25': 2, '35': 3, '45': 4, '50': 5, '56': 6}
 
-for line in infile.readlines():
+for line in infile:
     f = line.rstrip('\r\n').split("::")
     print(f[0], end='\t', file=outfile)
     if f[1] == 'M':
@@ -198,7 +202,7 @@ genre = {"Action": 0, "Adventure": 1, "Animation": 2, "Children's": 3,
 
 year_p = re.compile(r'\((\d\d\d\d)\)$')
 
-for line in infile.readlines():
+for line in infile:
     f = line.rstrip('\r\n').split("::")
     # for buggy character in original file
     if f[0] == '3845':
@@ -214,3 +218,19 @@ for line in infile.readlines():
 
 infile.close()
 outfile.close()
+
+# convert into a binary format ------------------------------------------------
+
+if binary:
+    from functools import partial
+    from kamrecsys.datasets import convert_binary, event_dtype_timestamp
+    from kamrecsys.datasets.movielens import (
+        _read_movielens1m_user, _read_movielens1m_item)
+
+    user_file = os.path.join(target, stem + '.user')
+    item_file = os.path.join(target, stem + '.item')
+    convert_binary(
+        stem, target, (1., 5., 1.), event_dtype=event_dtype_timestamp,
+        readers=[(0, partial(_read_movielens1m_user, user_file)),
+                 (1, partial(_read_movielens1m_item, item_file))],
+        sources=[user_file, item_file])
@@ -15,6 +15,8 @@ Sets
 3. Run this script. As default, converted files are generated at
    ``../kamrecsys/datasets/data/`` directory. If you want change the target
    directory, you need to specify it as the first argument of this script.
+   If ``--binary`` option is specified, data are also saved in a binary
+   format, which the sample loader memory-maps without parsing texts.
 4. Remove original files, if you do not need them.
 """
 
@@ -61,8 +63,10 @@ if ('-h' in sys.argv) or ('--help' in sys.argv):
 # set directories
 stem = 'sushi3'
 pwd = os.path.dirname(__file__)
-if len(sys.argv) >= 2:
-    target = sys.argv[1]
+binary = '--binary' in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != '--binary']
+if len(args) >= 1:
+    target = args[0]
 else:
     target = os.path.join(pwd, '..', 'kamrecsys', 'datasets', 'data')
 
@@ -97,7 +101,7 @@ print(
     end='', file=outfile)
 
 uid = 0
-for line in infile.readlines():
+for line in infile:
     rating = line.rstrip('\r\n').split(" ")
     for iid in xrange(len(rating)):
         if int(rating[iid]) >= 0:
@@ -149,7 +153,7 @@ print(
     end='', file=outfile)
 
 uid = 0
-for line in infile.readlines():
+for line in infile:
     user_feature = line.rstrip('\r\n').split("\t")
     print(uid, "\t".join(user_feature), sep="\t", file=outfile)
     uid += 1
@@ -200,9 +204,25 @@ print(
     '#    the ratio of shops that supplies the sushi\n',
     end='', file=outfile)
 
-for line in infile.readlines():
+for line in infile:
     item_feature = line.rstrip('\r\n').split("\t")
     print("\t".join(item_feature), sep="\t", file=outfile)
 
 infile.close()
 outfile.close()
+
+# convert into a binary format ------------------------------------------------
+
+if binary:
+    from functools import partial
+    from kamrecsys.datasets import convert_binary
+    from kamrecsys.datasets.sushi3 import (
+        _read_sushi3_user, _read_sushi3_item)
+
+    user_file = os.path.join(target, stem + '.user')
+    item_file = os.path.join(target, stem + '.item')
+    convert_binary(
+        stem + 'b_score', target, (0., 4., 1.),
+        readers=[(0, partial(_read_sushi3_user, user_file)),
+                 (1, partial(_read_sushi3_item, item_file))],
+        sources=[user_file, item_file])
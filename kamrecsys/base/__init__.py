@@ -20,6 +20,7 @@ import logging
 from .base import (
     BaseRecommender,
     BaseEventRecommender)
+from .matrix_factorization import MatrixFactorizationMixin
 
 # =============================================================================
 # Metadata variables
@@ -31,7 +32,8 @@ from .base import (
 
 __all__ = [
     'BaseRecommender',
-    'BaseEventRecommender']
+    'BaseEventRecommender',
+    'MatrixFactorizationMixin']
 
 # =============================================================================
 # Constants
@@ -60,7 +60,7 @@ class BaseRecommender(with_metaclass(ABCMeta, BaseEstimator, ObjectUtilMixin)):
         data sets
     eid : array_like, shape=(n_otypes,), dtype=(array_like)
         conversion table to external ids, succeed from training data sets
-    iid : dictionary
+    iid : array_like, shape=(n_otypes,), dtype=(IdIndex)
         conversion table to internal ids, succeed from training data sets
     random_state : RandomState or an int seed (None by default)
         A random number generator instance
@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Common Parts of Matrix Factorization Models
+"""
+
+from __future__ import (
+    print_function,
+    division,
+    absolute_import,
+    unicode_literals)
+from six.moves import xrange
+
+# =============================================================================
+# Imports
+# =============================================================================
+
+import logging
+
+import numpy as np
+from scipy import sparse
+
+from ..utils import gen_group_index, minimize_sgd
+
+# =============================================================================
+# Module metadata variables
+# =============================================================================
+
+# =============================================================================
+# Public symbols
+# =============================================================================
+
+__all__ = []
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+# the number of elements of latent factors of events gathered at once
+CHUNK_SIZE = 1 << 16
+
+# keyword arguments of :func:`kamrecsys.utils.minimize_sgd` accepted by the
+# 'sgd' solver
+SGD_KWARGS = (
+    'n_epochs', 'batch_size', 'learning_rate', 'eta0', 'decay', 'beta1',
+    'beta2', 'epsilon', 'tol')
+
+# =============================================================================
+# Classes
+# =============================================================================
+
+
+class MatrixFactorizationMixin(object):
+    """
+    Mixin for matrix factorization models of pairs of a user and an item
+
+    A model must have attributes: `k` , the number of latent factors, `C` , a
+    regularization parameter, `_rng` , a random number generator, `_dt` , a
+    dtype whose fields 'mu', 'bu', 'bi', 'p', and 'q' are views of
+    coefficients, and `_buffers` , which is initialized by None.  A score of
+    an event is estimated by :meth:`_transform_estimates` applied to the sum
+    of biases and the cross product of latent factors, and a loss function
+    is one whose derivative by the sum is an estimated score minus a target
+    score.
+    """
+
+    def _transform_estimates(self, esc):
+        """
+        Transform sums of biases and cross products into estimated scores
+
+        Parameters
+        ----------
+        esc : array, shape=(n_events,), dtype=float
+            sums of biases and cross products, which are overwritten
+
+        Returns
+        -------
+        esc : array, shape=(n_events,), dtype=float
+            estimated scores.  identical to input by default.
+        """
+        return esc
+
+    def _get_buffers(self, ev, n_objects):
+        """
+        Work buffers that are reused over evaluations of loss functions
+
+        Parameters
+        ----------
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+
+        Returns
+        -------
+        buffers : dict
+            work buffers.  'pu' and 'qi' store latent factors of users and
+            items of a chunk of events, and 'esc' stores values of events.
+            'res' is a sparse matrix of users x items, and its non-zero
+            elements correspond to events arranged by 'order' .
+        """
+        n_users = n_objects[0]
+        n_items = n_objects[1]
+
+        if (self._buffers is None or self._buffers['ev'] is not ev or
+                self._buffers['res'].shape != (n_users, n_items)):
+            n_events = ev.shape[0]
+            n_rows = min(max(CHUNK_SIZE // self.k, 1), n_events)
+            order = np.argsort(ev[:, 0], kind='mergesort')
+            indptr = np.zeros(n_users + 1, dtype=int)
+            np.cumsum(np.bincount(ev[:, 0], minlength=n_users),
+                      out=indptr[1:])
+            self._buffers = {
+                'ev': ev,
+                'order': order,
+                'res': sparse.csr_matrix(
+                    (np.zeros(n_events, dtype=float), ev[order, 1], indptr),
+                    shape=(n_users, n_items)),
+                'pu': np.empty((n_rows, self.k), dtype=float),
+                'qi': np.empty((n_rows, self.k), dtype=float),
+                'tmp': np.empty(n_rows, dtype=float),
+                'esc': np.empty(n_events, dtype=float)}
+
+        return self._buffers
+
+    def _get_estimates(self, coef, ev, buf):
+        """
+        Estimated scores of events
+
+        Latent factors of events are gathered in chunks so that temporaries
+        stay small.  Estimates are shared by a loss function and its
+        gradient.
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        buf : dict
+            work buffers returned by :meth:`_get_buffers`
+
+        Returns
+        -------
+        esc : array, shape=(n_events,), dtype=float
+            estimated scores, which are stored in ``buf['esc']``
+        """
+        # constants
+        n_events = ev.shape[0]
+        n_rows = buf['pu'].shape[0]
+
+        # set input array's view
+        mu = coef.view(self._dt)['mu'][0]
+        bu = coef.view(self._dt)['bu'][0]
+        bi = coef.view(self._dt)['bi'][0]
+        p = coef.view(self._dt)['p'][0]
+        q = coef.view(self._dt)['q'][0]
+
+        for i in xrange(0, n_events, n_rows):
+            s = slice(i, min(i + n_rows, n_events))
+            m = s.stop - s.start
+            pu = np.take(p, ev[s, 0], axis=0, out=buf['pu'][:m])
+            qi = np.take(q, ev[s, 1], axis=0, out=buf['qi'][:m])
+            esc = np.einsum('ij,ij->i', pu, qi, out=buf['esc'][s])
+            esc += mu[0]
+            esc += np.take(bu, ev[s, 0], out=buf['tmp'][:m])
+            esc += np.take(bi, ev[s, 1], out=buf['tmp'][:m])
+            self._transform_estimates(esc)
+
+        return buf['esc']
+
+    def _get_regularizer(self, coef):
+        """
+        Squared L2 norm of biases and latent factors
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+
+        Returns
+        -------
+        reg : float
+            sum of squares of coefficients except for a global bias
+        """
+        bu = coef.view(self._dt)['bu'][0]
+        bi = coef.view(self._dt)['bi'][0]
+        p = coef.view(self._dt)['p'][0]
+        q = coef.view(self._dt)['q'][0]
+
+        return (np.dot(bu, bu) + np.dot(bi, bi) +
+                np.vdot(p, p) + np.vdot(q, q))
+
+    def _grad_objects(self, obj, common_term, factor, b, f, n_obj_events):
+        """
+        stochastic gradients of biases and latent factors of objects in a
+        mini-batch
+
+        Parameters
+        ----------
+        obj : array, shape=(n_batch,), dtype=int
+            objects of events in a mini-batch
+        common_term : array, shape=(n_batch,), dtype=float
+            common terms of gradients of events divided by ``n_batch``
+        factor : array, shape=(n_batch, k), dtype=float
+            latent factors of objects of the other side of events
+        b : array, shape=(n_objects,), dtype=float
+            biases of objects
+        f : array, shape=(n_objects, k), dtype=float
+            latent factors of objects
+        n_obj_events : array, shape=(n_objects,), dtype=int
+            the numbers of events of objects
+
+        Returns
+        -------
+        objs : array, shape=(n_batch_objects,), dtype=int
+            distinct objects in a mini-batch
+        grad_b : array, shape=(n_batch_objects,), dtype=float
+            gradients of biases of `objs`
+        grad_f : array, shape=(n_batch_objects, k), dtype=float
+            gradients of latent factors of `objs`
+        """
+        n_batch = obj.shape[0]
+
+        # sums over events are products with an indicator matrix
+        objs, inv = np.unique(obj, return_inverse=True)
+        offsets, order = gen_group_index(inv, objs.shape[0])
+        indicator = sparse.csr_matrix(
+            (np.ones(n_batch, dtype=float), order, offsets),
+            shape=(objs.shape[0], n_batch))
+
+        # each event of an object bears 1 / n_obj_events of its
+        # regularization term
+        reg = self.C * np.diff(offsets) / (n_obj_events[objs] * n_batch)
+        grad_b = indicator.dot(common_term) + reg * b[objs]
+        grad_f = (indicator.dot(common_term[:, np.newaxis] * factor) +
+                  reg[:, np.newaxis] * f[objs])
+
+        return objs, grad_b, grad_f
+
+    def _grad_batch(self, coef, batch, ev, sc, n_objects, n_object_events):
+        """
+        stochastic gradient of loss function over a mini-batch of events
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+        batch : array, shape=(n_batch,), dtype=int
+            indexes of events in a mini-batch
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        sc : array_like, shape(n_events,), dtype=float
+            target scores
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+        n_object_events : tuple(array, array)
+            the numbers of events of users and items
+
+        Returns
+        -------
+        index : array, dtype=int
+            positions of elements of `coef` affected by a mini-batch
+        grad : array, dtype=float
+            the gradient of loss function divided by the number of events
+            at `index`
+        """
+        # constants
+        n_users = n_objects[0]
+        n_items = n_objects[1]
+        n_batch = batch.shape[0]
+        k = self.k
+
+        # set input array's view
+        mu = coef.view(self._dt)['mu'][0]
+        bu = coef.view(self._dt)['bu'][0]
+        bi = coef.view(self._dt)['bi'][0]
+        p = coef.view(self._dt)['p'][0]
+        q = coef.view(self._dt)['q'][0]
+
+        # common terms of gradients
+        user = ev[batch, 0].astype(int)
+        item = ev[batch, 1].astype(int)
+        pu = p[user]
+        qi = q[item]
+        esc = np.einsum('ij,ij->i', pu, qi)
+        esc += mu[0] + bu[user] + bi[item]
+        common_term = self._transform_estimates(esc)
+        common_term -= sc[batch]
+        common_term /= n_batch
+
+        # gradients of affected elements
+        users, grad_bu, grad_p = self._grad_objects(
+            user, common_term, qi, bu, p, n_object_events[0])
+        items, grad_bi, grad_q = self._grad_objects(
+            item, common_term, pu, bi, q, n_object_events[1])
+        factor = np.arange(k)
+        offset_bi = 1 + n_users
+        offset_p = offset_bi + n_items
+        offset_q = offset_p + n_users * k
+        index = np.concatenate([
+            [0], 1 + users, offset_bi + items,
+            (offset_p + users[:, np.newaxis] * k + factor).ravel(),
+            (offset_q + items[:, np.newaxis] * k + factor).ravel()])
+        grad = np.concatenate([
+            [np.sum(common_term)], grad_bu, grad_bi,
+            grad_p.ravel(), grad_q.ravel()])
+
+        return index, grad
+
+    def _optimize_sgd(self, ev, sc, n_objects, options=None, **kwargs):
+        """
+        Optimize model parameters by mini-batch stochastic gradient descent
+
+        Parameters
+        ----------
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        sc : array_like, shape(n_events,), dtype=float
+            target scores
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+        options : optional, dict
+            `maxiter` is the number of epochs, which is overridden by
+            `n_epochs` , and `disp` is ignored.
+        kwargs : keyword arguments
+            keyword arguments of :func:`kamrecsys.utils.minimize_sgd` listed
+            in `SGD_KWARGS`
+
+        Returns
+        -------
+        res : OptimizeResult
+            results in the same format as :func:`scipy.optimize.minimize`
+
+        Raises
+        ------
+        ValueError
+            if unsupported arguments or options are specified
+        """
+        invalid = sorted(set(kwargs) - set(SGD_KWARGS))
+        if invalid:
+            raise ValueError(
+                "Invalid arguments of the 'sgd' solver: " + ", ".join(invalid))
+        options = {} if options is None else options
+        invalid = sorted(set(options) - {'maxiter', 'disp'})
+        if invalid:
+            raise ValueError(
+                "Invalid options of the 'sgd' solver: " + ", ".join(invalid))
+        if options.get('maxiter') is not None:
+            kwargs.setdefault('n_epochs', options['maxiter'])
+
+        n_object_events = (
+            np.bincount(ev[:, 0], minlength=n_objects[0]),
+            np.bincount(ev[:, 1], minlength=n_objects[1]))
+
+        return minimize_sgd(
+            lambda x: self.loss(x, ev, sc, n_objects),
+            self._coef,
+            lambda x, batch: self._grad_batch(
+                x, batch, ev, sc, n_objects, n_object_events),
+            ev.shape[0], random_state=self._rng, **kwargs)
+
+
+# =============================================================================
+# Module initialization
+# =============================================================================
+
+# init logging system
+logger = logging.getLogger('kamrecsys')
+if not logger.handlers:
+    logger.addHandler(logging.NullHandler())
+
+# =============================================================================
+# Test routine
+# =============================================================================
+
+
+def _test():
+    """ test function for this module
+    """
+
+    # perform doctest
+    import sys
+    import doctest
+
+    doctest.testmod()
+
+    sys.exit(0)
+
+
+# Check if this is call as command script
+
+if __name__ == '__main__':
+    _test()
@@ -18,6 +18,7 @@ from six.moves import xrange
 import logging
 
 from .base import (
+    IdIndex,
     ObjectUtilMixin,
     BaseData)
 from .event import (
@@ -26,6 +27,7 @@ from .event import (
 from .event_with_score import (
     ScoreUtilMixin,
     EventWithScoreData)
+from .builder import EventDataBuilder
 
 # =============================================================================
 # Metadata variables
@@ -36,12 +38,14 @@ from .event_with_score import (
 # =============================================================================
 
 __all__ = [
+    'IdIndex',
     'BaseData',
     'ObjectUtilMixin',
     'EventData',
     'EventUtilMixin',
     'EventWithScoreData',
-    'ScoreUtilMixin']
+    'ScoreUtilMixin',
+    'EventDataBuilder']
 
 # =============================================================================
 # Constants
@@ -16,10 +16,17 @@ from six.moves import xrange
 # =============================================================================
 
 import logging
+import importlib
+import io
+import json
+import os
 from abc import ABCMeta
+from functools import partial
 
 import numpy as np
+import six
 from six import with_metaclass
+from six.moves import collections_abc
 
 # =============================================================================
 # Public symbols
@@ -31,6 +38,9 @@ __all__ = []
 # Constants
 # =============================================================================
 
+# version of the format of data saved by :meth:`BaseData.save`
+DATA_FORMAT_VERSION = 1
+
 # =============================================================================
 # Module variables
 # =============================================================================
@@ -40,6 +50,189 @@ __all__ = []
 # =============================================================================
 
 
+class IdIndex(collections_abc.Mapping):
+    """
+    Map from external ids to internal ids
+
+    The internal id of an object is the position of its external id in the
+    array `eid` .  External ids are looked up by a binary search on `eid` ,
+    which is sorted if it is generated by :meth:`EventData.set_event` .  For
+    an unsorted `eid` , a sorting permutation is additionally kept.
+    If external ids are integers distributed densely enough, bulk
+    conversions by :meth:`lookup` use a direct-address table that is built
+    on the first call.
+
+    This class is a read-only mapping compatible with a dictionary whose keys
+    are external ids and whose values are internal ids.  An instance is
+    pickled as the array `eid` only.
+
+    Parameters
+    ----------
+    eid : array_like, shape=(n_objects,)
+        external ids. the i-th element is the external id of the object whose
+        internal id is i. all the elements must be distinct.
+
+    Attributes
+    ----------
+    eid : array, shape=(n_objects,)
+        map from internal id to external id
+
+    Raises
+    ------
+    ValueError
+        if eid is not an one-dimensional array
+    """
+
+    # the maximum ratio of the size of a direct-address table to the number
+    # of objects
+    _max_table_ratio = 8
+
+    def __init__(self, eid):
+        self.eid = np.asarray(eid)
+        if self.eid.ndim != 1:
+            raise ValueError("eid must be an one-dimensional array")
+
+        # a sorting permutation is required for an unsorted eid
+        if np.all(self.eid[1:] > self.eid[:-1]):
+            self._sorter = None
+        else:
+            self._sorter = np.argsort(self.eid, kind='mergesort')
+
+        # direct-address table, which is generated on demand
+        self._table = None
+        self._table_offset = 0
+
+    def __reduce__(self):
+        return self.__class__, (self.eid,)
+
+    def __repr__(self):
+        return '{0:s}({1!r})'.format(self.__class__.__name__, self.eid)
+
+    def __len__(self):
+        return self.eid.shape[0]
+
+    def __iter__(self):
+        return iter(self.eid)
+
+    def __contains__(self, key):
+        if np.ndim(key) != 0:
+            return False
+        return bool(self._search(key)[1])
+
+    def __getitem__(self, key):
+        if np.ndim(key) != 0:
+            return self.lookup(key)
+
+        iid, found = self._search(key)
+        if not found:
+            raise KeyError(key)
+
+        return int(iid)
+
+    def _search(self, key):
+        """
+        Binary search of external ids
+
+        Parameters
+        ----------
+        key : array_like
+            external ids to search
+
+        Returns
+        -------
+        iid : array, dtype=int, shape=key.shape
+            internal ids of the given external ids. the values for unknown
+            external ids are undefined.
+        found : array, dtype=bool, shape=key.shape
+            True if the corresponding external id is known
+        """
+        key = np.asarray(key)
+        n_objects = self.eid.shape[0]
+        iid = np.zeros(key.shape, dtype=int)
+        found = np.zeros(key.shape, dtype=bool)
+        if n_objects == 0:
+            return iid, found
+
+        try:
+            iid[...] = np.searchsorted(self.eid, key, sorter=self._sorter)
+            np.minimum(iid, n_objects - 1, out=iid)
+            if self._sorter is not None:
+                iid[...] = self._sorter[iid]
+            found[...] = (self.eid[iid] == key)
+        except (TypeError, ValueError):
+            # external ids whose type is incomparable with eid
+            found[...] = False
+
+        return iid, found
+
+    def _get_table(self):
+        """
+        Direct-address table from external ids to internal ids
+
+        Returns
+        -------
+        table : array or None
+            `table[eid - offset]` is the internal id of an external id,
+            `eid` , or -1 if the id is unknown.  None if external ids are not
+            integers or too sparse to be stored in a table.
+        """
+        if self._table is None:
+            self._table = False
+            if self.eid.shape[0] > 0 and self.eid.dtype.kind == 'i':
+                offset = int(np.min(self.eid))
+                size = int(np.max(self.eid)) - offset + 1
+                if size <= self._max_table_ratio * self.eid.shape[0]:
+                    table = np.full(size, -1, dtype=int)
+                    table[self.eid - offset] = np.arange(self.eid.shape[0])
+                    self._table = table
+                    self._table_offset = offset
+
+        return self._table if self._table is not False else None
+
+    def lookup(self, key, missing=None):
+        """
+        Convert external ids to internal ids in bulk
+
+        Parameters
+        ----------
+        key : array_like
+            array of external ids
+        missing : optional, int
+            internal id assigned to unknown external ids.  If None, unknown
+            external ids raise an exception.
+
+        Returns
+        -------
+        iid : array, dtype=int, shape=key.shape
+            internal ids corresponding to the given external ids
+
+        Raises
+        ------
+        KeyError
+            unknown external ids are found, and `missing` is None
+        """
+        key = np.asarray(key)
+        table = self._get_table()
+        if table is not None and key.dtype.kind == 'i':
+            iid = key.astype(int).reshape(-1)
+            iid -= self._table_offset
+            found = (iid >= 0) & (iid < table.shape[0])
+            iid[~found] = 0
+            iid = table[iid]
+            found &= (iid >= 0)
+            iid = iid.reshape(key.shape)
+            found = found.reshape(key.shape)
+        else:
+            iid, found = self._search(key)
+
+        if not np.all(found):
+            if missing is None:
+                raise KeyError("Unknown external ids are included")
+            iid[~found] = missing
+
+        return iid
+
+
 class ObjectUtilMixin(object):
     """
     Methods that are commonly used in data containers and recommenders for
@@ -102,13 +295,13 @@ class ObjectUtilMixin(object):
         ----------
         otype : int
             object type
-        eid : int
-            an external id
+        eid : int or array_like
+            an external id or an array of external ids
 
         Returns
         -------
-        iid : int
-            the corresponding internal id
+        iid : int or array, dtype=int
+            the corresponding internal id(s)
 
         Raises
         ------
@@ -136,14 +329,17 @@ class ObjectUtilMixin(object):
             the number of unique objects
         eid : array, shape=(variable,)
             map from internal id to external id
-        iid : dict
+        iid : :class:`IdIndex`
             map from external id to internal id
+        iev : array, dtype=int, shape=event.shape
+            internal ids corresponding to the elements of `event`
         """
 
-        eid = np.unique(event)
-        iid = {k: i for (i, k) in enumerate(eid)}
+        event = np.asarray(event)
+        eid, iev = np.unique(event, return_inverse=True)
+        iid = IdIndex(eid)
 
-        return len(eid), eid, iid
+        return len(eid), eid, iid, iev.reshape(event.shape)
 
     @staticmethod
     def _gen_id_substitution_table(orig_obj, sub_index):
@@ -192,8 +388,8 @@ class BaseData(with_metaclass(ABCMeta, ObjectUtilMixin, object)):
     eid : array_like, shape=(n_otypes,), dtype=(array_like)
         id[i] is a vector of external ids. the j-th element of the array is the
         external id that corresponds to the object with internal id j.
-    iid : dictionary
-        id[i] is a dictionary for internal ids whose object type is i. the
+    iid : array_like, shape=(n_otypes,), dtype=(:class:`IdIndex`)
+        id[i] is a mapping to internal ids whose object type is i. the
         value for the key 'j' contains the internal id of the object whose
         external id is j.
     feature : array_like, shape=(n_otypes), dtype=array_like
@@ -206,6 +402,16 @@ class BaseData(with_metaclass(ABCMeta, ObjectUtilMixin, object)):
     ValueError
         if n_otypes < 1
 
+    Notes
+    -----
+    The computation of some attributes can be deferred by :meth:`_defer` .
+    Such attributes are computed when they are accessed for the first time,
+    or when the instance is pickled or saved.  A shallow copy of the
+    instance keeps them deferred, and computes them from the original
+    instance when they are accessed.  Data derived from attributes can be
+    cached in a dictionary returned by :meth:`_get_cache` , which is neither
+    copied nor pickled.
+
     See Also
     --------
     :ref:`glossary`
@@ -226,31 +432,340 @@ class BaseData(with_metaclass(ABCMeta, ObjectUtilMixin, object)):
         self.iid = np.tile(None, self.n_otypes)
         self.feature = np.tile(None, self.n_otypes)
 
-    def set_feature(self, otype, eid, feature):
+    def __getattr__(self, name):
+        # called only if `name` is not found; compute a deferred attribute
+        deferred = self.__dict__.get('_deferred')
+        if deferred is None or name not in deferred:
+            raise AttributeError(
+                "'{0:s}' object has no attribute '{1:s}'".format(
+                    self.__class__.__name__, name))
+
+        value = deferred[name]()
+        self.__dict__[name] = value
+        del deferred[name]
+        if len(deferred) == 0:
+            del self.__dict__['_deferred']
+
+        return value
+
+    def __getstate__(self):
+        self._materialize()
+        state = self.__dict__.copy()
+        state.pop('_cache', None)
+        return state
+
+    def __copy__(self):
+        data = self.__class__.__new__(self.__class__)
+        data.__dict__.update(self._get_state_without_deferred())
+        for name in self.__dict__.get('_deferred', {}):
+            data._defer(name, partial(getattr, self, name))
+        return data
+
+    def _get_state_without_deferred(self):
+        """
+        State of the instance except for deferred attributes, which are not
+        computed
+
+        Returns
+        -------
+        state : dict
+            state returned by :meth:`__getstate__` without deferred
+            attributes
+        """
+        deferred = self.__dict__.pop('_deferred', None)
+        try:
+            return self.__getstate__()
+        finally:
+            if deferred is not None:
+                self.__dict__['_deferred'] = deferred
+
+    def _defer(self, name, func):
+        """
+        Defer the computation of an attribute until it is accessed
+
+        Parameters
+        ----------
+        name : str
+            name of an attribute
+        func : callable
+            function without arguments that returns the value of the
+            attribute
+        """
+        self.__dict__.pop(name, None)
+        self.__dict__.setdefault('_deferred', {})[name] = func
+
+    def _materialize(self):
+        """
+        Compute all the deferred attributes
+        """
+        for name in list(self.__dict__.get('_deferred', {})):
+            getattr(self, name)
+
+    def _get_cache(self):
+        """
+        Get a dictionary to cache data derived from attributes
+
+        Returns
+        -------
+        cache : dict
+            cache of this data
+        """
+        return self.__dict__.setdefault('_cache', {})
+
+    def _clear_cache(self):
+        """
+        Clear cached data.  This must be called if attributes are modified.
+        """
+        self.__dict__.pop('_cache', None)
+
+    def save(self, path, materialize=True):
+        """
+        Save data into a directory
+
+        Arrays are stored in ``.npy`` files, and the other information is
+        stored in ``header.json`` .  Internal id maps are not stored, because
+        they are re-generated from arrays of external ids.
+
+        Parameters
+        ----------
+        path : str
+            path to a directory.  if it does not exist, it is created.
+        materialize : optional, bool
+            if False, deferred attributes are neither computed nor saved, and
+            they are missing in loaded data.  (default=True)
+
+        Raises
+        ------
+        TypeError
+            if an attribute can be stored in neither an array nor a header
+        """
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        header = {
+            'format_version': DATA_FORMAT_VERSION,
+            'class': [self.__class__.__module__, self.__class__.__name__],
+            'attributes': {},
+            'arrays': {},
+            'object_arrays': {}}
+
+        if materialize:
+            state = self.__getstate__()
+        else:
+            state = self._get_state_without_deferred()
+        for name, value in sorted(state.items()):
+            if name == 'iid':
+                continue
+            elif isinstance(value, np.ndarray) and value.dtype.hasobject:
+                # arrays, like eid or feature, whose elements are per otype
+                files = []
+                for i, x in enumerate(value):
+                    if x is None:
+                        files.append(None)
+                    elif isinstance(x, dict):
+                        # column-oriented features
+                        files.append([])
+                        for k, v in x.items():
+                            files[-1].append([
+                                k, '{0:s}_{1:d}.{2:s}.npy'.format(name, i, k)])
+                            np.save(os.path.join(path, files[-1][-1][1]),
+                                    v, allow_pickle=False)
+                    else:
+                        files.append('{0:s}_{1:d}.npy'.format(name, i))
+                        np.save(os.path.join(path, files[-1]),
+                                np.asarray(x), allow_pickle=False)
+                header['object_arrays'][name] = files
+            elif isinstance(value, np.ndarray):
+                header['arrays'][name] = name + '.npy'
+                np.save(os.path.join(path, name + '.npy'), value,
+                        allow_pickle=False)
+            elif isinstance(value, np.generic):
+                header['attributes'][name] = value.item()
+            elif value is None or isinstance(
+                    value, six.integer_types + (bool, float) +
+                    six.string_types):
+                header['attributes'][name] = value
+            else:
+                raise TypeError(
+                    "Attribute {0:s} cannot be saved".format(name))
+
+        with io.open(os.path.join(path, 'header.json'), 'w',
+                     encoding='utf-8') as f:
+            f.write(six.text_type(
+                json.dumps(header, indent=2, sort_keys=True)))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Load data saved by :meth:`save`
+
+        A class of data is restored from a header, and it must be a subclass
+        of the class whose method is called.
+
+        Parameters
+        ----------
+        path : str
+            path to a directory
+        mmap_mode : optional, {None, 'r+', 'r', 'w+', 'c'}
+            mode of memory-mapping arrays.  see :func:`numpy.load` .  if None,
+            arrays are read into memory.  arrays are read-only if 'r', and
+            use 'c' to modify them without writing back to files.
+            (default='r')
+
+        Returns
+        -------
+        data : :class:`BaseData`
+            loaded data
+
+        Raises
+        ------
+        ValueError
+            if the format of data is not supported
+        TypeError
+            if the class of data is not a subclass of `cls`
+        """
+        with io.open(os.path.join(path, 'header.json'), encoding='utf-8') as f:
+            header = json.load(f)
+        if header['format_version'] != DATA_FORMAT_VERSION:
+            raise ValueError("Unsupported format version")
+
+        module_name, class_name = header['class']
+        klass = getattr(importlib.import_module(module_name), class_name)
+        if not issubclass(klass, cls):
+            raise TypeError(
+                "{0:s} is not a subclass of {1:s}".format(
+                    class_name, cls.__name__))
+
+        def load_array(file_name):
+            return np.load(os.path.join(path, file_name), mmap_mode=mmap_mode,
+                           allow_pickle=False)
+
+        data = klass.__new__(klass)
+        data.__dict__.update(header['attributes'])
+        for name, file_name in header['arrays'].items():
+            data.__dict__[name] = load_array(file_name)
+        for name, files in header['object_arrays'].items():
+            value = np.tile(None, len(files))
+            for i, file_name in enumerate(files):
+                if isinstance(file_name, list):
+                    value[i] = {k: load_array(f) for k, f in file_name}
+                elif file_name is not None:
+                    value[i] = load_array(file_name)
+            data.__dict__[name] = value
+
+        # re-generate internal id maps
+        data.iid = np.tile(None, data.n_otypes)
+        for otype in xrange(data.n_otypes):
+            if data.eid[otype] is not None:
+                data.iid[otype] = IdIndex(data.eid[otype])
+
+        return data
+
+    def set_feature(self, otype, eid, feature, columnar=None):
         """
         Set object feature
-        
+
+        Feature rows are aligned to internal ids by :meth:`IdIndex.lookup` ,
+        and rows of objects whose features are not given are filled by zeros.
+
         Parameters
         ----------
         otype : int
             target object type
         eid : array_like, shape=(n_objects,)
             external ids of the corresponding object features
-        feature : array_like
-            array of object feature
+        feature : array_like or dict
+            array of object feature, or dict of arrays each of which is
+            a column of features
+        columnar : optional, bool
+            if True, features are stored as a dict of column arrays, each of
+            which corresponds to a field of a structured array.  if False,
+            features are stored as a structured array.  as default, the form
+            of `feature` is kept.
         """
-        iid = self.iid[otype]
-        index = np.repeat(len(eid), len(iid))
-        for i, j in enumerate(eid):
-            if j in iid:
-                index[iid[j]] = i
-        self.feature[otype] = feature[index].copy()
+        eid = np.asarray(eid)
+        if isinstance(feature, dict):
+            feature = {k: np.asarray(v) for k, v in feature.items()}
+            if columnar is not None and not columnar:
+                feature = _to_structured(feature)
+        else:
+            feature = np.asarray(feature)
+            if columnar:
+                feature = {k: feature[k] for k in feature.dtype.names}
+
+        self.feature[otype] = _take_rows(
+            feature, self.iid[otype].lookup(eid, missing=-1),
+            self.n_objects[otype])
 
 
 # =============================================================================
 # Functions
 # =============================================================================
 
+
+def _take_rows(feature, index, n_rows=None):
+    """
+    Take rows of features
+
+    Parameters
+    ----------
+    feature : array or dict
+        array of features, or dict of column arrays
+    index : array, dtype=int
+        if `n_rows` is None, the i-th output row is the ``index[i]`` -th row
+        of features, and it is filled by zeros if ``index[i]`` is negative.
+        otherwise, the i-th row of features is placed at the ``index[i]`` -th
+        output row, and it is discarded if ``index[i]`` is negative.
+    n_rows : optional, int
+        the number of output rows
+
+    Returns
+    -------
+    feature : array or dict
+        a copy of features whose rows are re-arranged
+    """
+    if n_rows is not None:
+        mask = (index >= 0)
+        inverse = np.repeat(-1, n_rows)
+        inverse[index[mask]] = np.arange(index.shape[0])[mask]
+        index = inverse
+
+    def take(x):
+        if x.shape[0] == 0:
+            return np.zeros((index.shape[0],) + x.shape[1:], dtype=x.dtype)
+        y = x[np.maximum(index, 0)]
+        y[index < 0] = np.zeros((), dtype=x.dtype)
+        return y
+
+    if isinstance(feature, dict):
+        return {k: take(v) for k, v in feature.items()}
+    return take(feature)
+
+
+def _to_structured(feature):
+    """
+    Convert a dict of column arrays to a structured array
+
+    Parameters
+    ----------
+    feature : dict
+        dict of column arrays
+
+    Returns
+    -------
+    feature : array
+        structured array
+    """
+    names = list(feature)
+    dtype = np.dtype([
+        (str(k), feature[k].dtype, feature[k].shape[1:]) for k in names])
+    x = np.empty(feature[names[0]].shape[0], dtype=dtype)
+    for k in names:
+        x[k] = feature[k]
+
+    return x
+
+
 # =============================================================================
 # Module initialization
 # =============================================================================
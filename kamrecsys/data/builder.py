@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Data model: builder of event data from chunks of events
+"""
+
+from __future__ import (
+    print_function,
+    division,
+    absolute_import,
+    unicode_literals)
+from six.moves import xrange
+
+# =============================================================================
+# Imports
+# =============================================================================
+
+import logging
+
+import numpy as np
+
+from . import IdIndex, EventData, EventWithScoreData
+from ..utils import get_index_dtype
+
+# =============================================================================
+# Public symbols
+# =============================================================================
+
+__all__ = []
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+# =============================================================================
+# Module variables
+# =============================================================================
+
+# =============================================================================
+# Classes
+# =============================================================================
+
+
+class EventDataBuilder(object):
+    """
+    Builder of event data from chunks of events
+
+    Chunks of events are added by :meth:`add` or :meth:`extend` , and
+    external ids in each chunk are mapped to internal ids incrementally.
+    Events are stored in buffers of compact dtypes, and :meth:`build`
+    re-labels internal ids in place so that the resultant data is identical
+    to the data whose events are set at once by
+    :meth:`kamrecsys.data.EventData.set_event` .  Therefore, the whole parsed
+    events and the final container need not be held at the same time.
+
+    If scores are given with the first chunk, an instance of
+    :class:`kamrecsys.data.EventWithScoreData` is built; otherwise, an
+    instance of :class:`kamrecsys.data.EventData` is built.
+
+    Parameters
+    ----------
+    n_otypes : optional, int
+        see attribute n_otypes (default=2)
+    event_otypes : array_like, shape=(variable,), optional
+        see attribute event_otypes. as default, a type of the i-th element of
+        each event is the i-th object type.
+    score_domain : optional, tuple or 1d-array of tuple
+        min and max of scores, and the interval between scores.  If None,
+        these values are estimated from all scores.
+    index_dtype : optional, dtype
+        dtype of an event array.  see
+        :meth:`kamrecsys.data.EventData.set_event`
+    score_dtype : optional, dtype
+        dtype of scores.  see
+        :meth:`kamrecsys.data.EventWithScoreData.set_event`
+
+    Examples
+    --------
+    >>> builder = EventDataBuilder()
+    >>> builder.add([[1, 10], [3, 20]], score=[5, 3])
+    >>> builder.add([[2, 10]], score=[4])
+    >>> data = builder.build()
+    >>> data.event
+    array([[0, 0],
+           [2, 1],
+           [1, 0]], dtype=int32)
+    """
+
+    def __init__(self, n_otypes=2, event_otypes=None, score_domain=None,
+                 index_dtype=None, score_dtype=None):
+        self.n_otypes = n_otypes
+        self.event_otypes = event_otypes
+        self.score_domain = score_domain
+        self.index_dtype = index_dtype
+        self.score_dtype = score_dtype
+
+        self._data = None
+
+    def add(self, event, score=None, event_feature=None):
+        """
+        Add a chunk of events
+
+        Parameters
+        ----------
+        event : array_like, shape=(n_chunk_events, s_event)
+            each row corresponds to an event represented by a vector of object
+            with external ids
+        score : optional, array_like, shape=(n_chunk_events,)
+            a set of rating scores.  these must be specified for all chunks
+            or for no chunks.
+        event_feature : optional, array_like, shape=(n_chunk_events, variable)
+            feature of events.  these must be specified for all chunks or
+            for no chunks.
+
+        Raises
+        ------
+        ValueError
+            if the specification of scores or event features is inconsistent
+            with previous chunks
+        """
+        event = np.asarray(event)
+
+        if self._data is None:
+            if score is None:
+                self._data = EventData(
+                    n_otypes=self.n_otypes, event_otypes=self.event_otypes)
+                self._data.set_event(
+                    event, event_feature=event_feature,
+                    index_dtype=self.index_dtype)
+            else:
+                self._data = EventWithScoreData(
+                    n_otypes=self.n_otypes, event_otypes=self.event_otypes)
+                self._data.set_event(
+                    event, score, score_domain=self.score_domain,
+                    event_feature=event_feature, index_dtype=self.index_dtype,
+                    score_dtype=self.score_dtype)
+        elif isinstance(self._data, EventWithScoreData):
+            self._data.append_events(
+                event, score, event_feature=event_feature)
+        elif score is not None:
+            raise ValueError("Scores are inconsistent with previous chunks")
+        else:
+            self._data.append_events(event, event_feature=event_feature)
+
+    def extend(self, chunks):
+        """
+        Add chunks of events
+
+        Parameters
+        ----------
+        chunks : iterable
+            each element is a tuple of arguments of :meth:`add` , such as
+            ``(event, score, event_feature)`` .  chunks read from an event
+            file are generated by :func:`kamrecsys.datasets.iter_event_chunks`
+        """
+        for chunk in chunks:
+            self.add(*chunk)
+
+    def build(self):
+        """
+        Build event data from added chunks.  After building, this builder is
+        reset to the initial state.
+
+        Returns
+        -------
+        data : :class:`kamrecsys.data.EventData`
+            event data
+
+        Raises
+        ------
+        ValueError
+            if no chunks have been added, or if `index_dtype` cannot
+            represent internal ids
+        """
+        if self._data is None:
+            raise ValueError("No events have been added")
+        data, self._data = self._data, None
+        data._trim_buffers()
+
+        # re-label internal ids in the order of sorted external ids
+        for otype in xrange(data.n_otypes):
+            order = np.argsort(data.eid[otype], kind='mergesort')
+            table = np.empty_like(order)
+            table[order] = np.arange(order.shape[0])
+            data.eid[otype] = data.eid[otype][order]
+            data.iid[otype] = IdIndex(data.eid[otype])
+            for e in np.nonzero(data.event_otypes == otype)[0]:
+                data.event[:, e] = table[data.event[:, e]]
+
+        # check the dtype of events
+        index_dtype = get_index_dtype(np.max(data.n_objects), self.index_dtype)
+        if data.event.dtype != index_dtype:
+            data.event = data.event.astype(index_dtype)
+
+        # estimate a score domain from all scores
+        if isinstance(data, EventWithScoreData) and self.score_domain is None:
+            data._set_score_domain()
+        data._clear_cache()
+
+        return data
+
+
+# =============================================================================
+# Functions
+# =============================================================================
+
+# =============================================================================
+# Module initialization
+# =============================================================================
+
+# init logging system ---------------------------------------------------------
+logger = logging.getLogger('kamrecsys')
+if not logger.handlers:
+    logger.addHandler(logging.NullHandler())
+
+# =============================================================================
+# Test routine
+# =============================================================================
+
+
+def _test():
+    """ test function for this module
+    """
+
+    # perform doctest
+    import sys
+    import doctest
+
+    doctest.testmod()
+
+    sys.exit(0)
+
+
+# Check if this is call as command script -------------------------------------
+
+if __name__ == '__main__':
+    _test()
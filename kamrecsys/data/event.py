@@ -21,8 +21,11 @@ from abc import ABCMeta
 from six import with_metaclass
 
 import numpy as np
+from scipy import sparse
 
-from . import BaseData
+from . import BaseData, IdIndex
+from .base import _take_rows
+from ..utils import gen_group_index, get_index_dtype
 
 # =============================================================================
 # Public symbols
@@ -52,28 +55,34 @@ class EventUtilMixin(with_metaclass(ABCMeta, object)):
         convert an event vector or array represented by internal ids to those
         by external ids.
 
+        Each column of events is converted at once by fancy indexing of an
+        array of external ids.
+
         Parameters
         ----------
-        data : array_like
-            array whose elements are represented by external ids
+        data : array_like, shape=(s_event,) or (n_events, s_event)
+            array whose elements are represented by internal ids
         
         Returns
         -------
-        new_data : array_like
+        new_data : array_like, shape=data.shape
             array whose elements are represented by external ids
+
+        Raises
+        ------
+        TypeError
+            Shape of an input array is illegal
         """
+        data = np.asarray(data)
         if data.ndim == 1 and data.shape[0] == self.s_event:
-            new_data = np.array(
-                [self.eid[self.event_otypes[e]][data[e]]
-                 for e in xrange(self.s_event)],
-                dtype=self.eid[0].dtype)
-        elif data.ndim == 2 and data.shape[1] == self.s_event:
-            new_data = np.empty_like(data, dtype=self.eid[0].dtype)
-            for e in xrange(self.s_event):
-                new_data[:, e] = self.eid[self.event_otypes[e]][data[:, e]]
-        else:
+            return self.to_eid_event(data[np.newaxis, :])[0]
+        elif not (data.ndim == 2 and data.shape[1] == self.s_event):
             raise TypeError("Shape of input is illegal")
 
+        new_data = np.empty(data.shape, dtype=self.eid[0].dtype)
+        for e in xrange(self.s_event):
+            new_data[:, e] = self.eid[self.event_otypes[e]][data[:, e]]
+
         return new_data
 
     def to_iid_event(self, ev, missing_values=None):
@@ -81,9 +90,12 @@ class EventUtilMixin(with_metaclass(ABCMeta, object)):
         convert an event vector or array represented by external ids to those
         by internal ids.
 
+        Each column of events is converted at once by
+        :meth:`kamrecsys.data.IdIndex.lookup` .
+
         Parameters
         ----------
-        ev : array_like
+        ev : array_like, shape=(s_event,) or (n_events, s_event)
             array whose elements are represented by external ids
         missing_values : optional, int or array_like, shape=(s_event,)
             if unknown external ids are detected, these will be converted to
@@ -91,29 +103,37 @@ class EventUtilMixin(with_metaclass(ABCMeta, object)):
 
         Returns
         -------
-        new_ev : array_like
-            array whose elements are represented by external ids
+        new_ev : array_like, shape=ev.shape
+            array whose elements are represented by internal ids.  its dtype
+            is that of `event` if it can represent the numbers of objects and
+            `missing_values` ; otherwise, the dtype chosen by
+            :func:`kamrecsys.utils.get_index_dtype` .
 
         Raises
         ------
         TypeError
             Shape of an input array is illegal
         """
-        if missing_values is None:
-            missing_values = self.n_objects[self.event_otypes]
+        ev = np.asarray(ev)
         if ev.ndim == 1 and ev.shape[0] == self.s_event:
-            new_ev = np.array(
-                [self.iid[self.event_otypes[e]].get(ev[e], missing_values[e])
-                 for e in xrange(self.s_event)], dtype=int)
-        elif ev.ndim == 2 and ev.shape[1] == self.s_event:
-            new_ev = np.empty_like(ev, dtype=int)
-            for e in xrange(self.s_event):
-                iid = self.iid[self.event_otypes[e]]
-                new_ev[:, e] = [iid.get(i, missing_values[e])
-                                for i in ev[:, e]]
-        else:
+            return self.to_iid_event(ev[np.newaxis, :], missing_values)[0]
+        elif not (ev.ndim == 2 and ev.shape[1] == self.s_event):
             raise TypeError('The shape of an input is illegal')
 
+        if missing_values is None:
+            missing_values = self.n_objects[self.event_otypes]
+        missing_values = np.broadcast_to(missing_values, (self.s_event,))
+
+        index_dtype = get_index_dtype(max(
+            np.max(self.n_objects[self.event_otypes]),
+            np.max(missing_values)))
+        if self.event is not None:
+            index_dtype = np.promote_types(self.event.dtype, index_dtype)
+        new_ev = np.empty(ev.shape, dtype=index_dtype)
+        for e in xrange(self.s_event):
+            new_ev[:, e] = self.iid[self.event_otypes[e]].lookup(
+                ev[:, e], missing=missing_values[e])
+
         return new_ev
 
     def _set_event_info(self, data):
@@ -174,6 +194,8 @@ class EventData(BaseData, EventUtilMixin):
     :ref:`glossary`
     """
 
+    _default_values = 'binary'
+
     def __init__(self, n_otypes=2, event_otypes=None):
         super(EventData, self).__init__(n_otypes=n_otypes)
 
@@ -182,6 +204,7 @@ class EventData(BaseData, EventUtilMixin):
         self.n_events = 0
         self.event = None
         self.event_feature = None
+        self.event_count = None
 
         if event_otypes is None:
             self.s_event = n_otypes
@@ -194,7 +217,7 @@ class EventData(BaseData, EventUtilMixin):
             self.s_event = event_otypes.shape[0]
             self.event_otypes = event_otypes
 
-    def set_event(self, event, event_feature=None):
+    def set_event(self, event, event_feature=None, index_dtype=None):
         """Set event data from structured array.
 
         Parameters
@@ -204,33 +227,420 @@ class EventData(BaseData, EventUtilMixin):
             with external ids
         event_feature : optional, array_like, shape=(n_events, variable)
             feature of events
+        index_dtype : optional, dtype
+            dtype of an event array.  as default, int32 is used if it can
+            represent internal ids; otherwise, int64 is used.
+
+        Raises
+        ------
+        ValueError
+            if `index_dtype` cannot represent internal ids
         """
+        event = np.asarray(event)
+
+        # internal ids are assigned in the order of sorted external ids
+        iev = np.empty(self.n_otypes, dtype=object)
         for otype in xrange(self.n_otypes):
-            self.n_objects[otype], self.eid[otype], self.iid[otype] = (
-                self._gen_id(event[:, self.event_otypes == otype]))
+            cols = (self.event_otypes == otype)
+            (self.n_objects[otype], self.eid[otype], self.iid[otype],
+             iev[otype]) = self._gen_id(event[:, cols])
 
-        self.event = np.empty_like(event, dtype=int)
-        for e in xrange(self.s_event):
-            iid = self.iid[self.event_otypes[e]]
-            self.event[:, e] = [iid[i] for i in event[:, e]]
+        index_dtype = get_index_dtype(np.max(self.n_objects), index_dtype)
+        self.event = np.empty(event.shape, dtype=index_dtype)
+        for otype in xrange(self.n_otypes):
+            self.event[:, self.event_otypes == otype] = iev[otype]
 
         self.n_events = self.event.shape[0]
         if event_feature is not None:
             self.event_feature = np.asarray(event_feature).copy()
         else:
             self.event_feature = None
+        self.event_count = None
+
+        self._clear_cache()
+
+    def __getstate__(self):
+        state = super(EventData, self).__getstate__()
+        state.pop('_buffer', None)
+        return state
+
+    def append_events(self, event, event_feature=None):
+        """
+        Append events to the data.
+
+        Internal ids of existing objects are kept unchanged, and new objects
+        are assigned to internal ids following those of existing objects.
+        Arrays of events are extended in a pre-allocated buffer whose size is
+        doubled if needed, and features of new objects are filled by zeros.
+
+        Parameters
+        ----------
+        event : array_like, shape=(n_new_events, s_event)
+            each row corresponds to an event represented by a vector of object
+            with external ids
+        event_feature : optional, array_like, shape=(n_new_events, variable)
+            feature of events. this must be specified if and only if the
+            event features have been set.
 
-    def filter_event(self, filter_cond):
+        Raises
+        ------
+        ValueError
+            if the shape of events is illegal, or the specification of event
+            features is inconsistent with existing events.
+        """
+        event = np.asarray(event)
+        if event.ndim != 2 or event.shape[1] != self.s_event:
+            raise ValueError("The shape of events is illegal")
+        if event_feature is not None:
+            event_feature = np.asarray(event_feature)
+            if event_feature.shape[0] != event.shape[0]:
+                raise ValueError("The length of event features is illegal")
+
+        # no events have been set
+        if self.event is None:
+            self.set_event(event, event_feature)
+            return
+        if (event_feature is None) != (self.event_feature is None):
+            raise ValueError("Event features are inconsistent")
+
+        # containers of object info may be shared with copies of this data,
+        # or may be read-only memory-mapped arrays
+        self.n_objects = self.n_objects.copy()
+        self.eid = self.eid.copy()
+        self.iid = self.iid.copy()
+        self.feature = self.feature.copy()
+
+        new_event = np.empty(event.shape, dtype=int)
+        for otype in xrange(self.n_otypes):
+            cols = (self.event_otypes == otype)
+            if not np.any(cols):
+                continue
+
+            # assign internal ids to new objects
+            iev = self.iid[otype].lookup(event[:, cols], missing=-1)
+            new_eid = np.unique(event[:, cols][iev < 0])
+            if new_eid.shape[0] > 0:
+                n_old_objects = self.n_objects[otype]
+                self.eid[otype] = np.concatenate((self.eid[otype], new_eid))
+                self.iid[otype] = IdIndex(self.eid[otype])
+                self.n_objects[otype] = self.eid[otype].shape[0]
+                iev[iev < 0] = self.iid[otype].lookup(
+                    event[:, cols][iev < 0])
+
+                # extend features of objects
+                if self.feature[otype] is not None:
+                    self.feature[otype] = _take_rows(
+                        self.feature[otype], np.arange(n_old_objects),
+                        self.n_objects[otype])
+
+            new_event[:, cols] = iev
+
+        # promote the dtype of events if internal ids cannot be represented
+        new_event = new_event.astype(np.promote_types(
+            self.event.dtype, get_index_dtype(np.max(self.n_objects))))
+
+        # extend events
+        self._append_rows('event', new_event)
+        self.n_events = self.event.shape[0]
+        if event_feature is not None:
+            self._append_rows('event_feature', event_feature)
+        if self.event_count is not None:
+            self._append_rows(
+                'event_count', np.ones(event.shape[0], dtype=int))
+
+        self._clear_cache()
+
+    def _append_rows(self, name, rows):
+        """
+        Append rows to an array attribute.
+
+        An attribute is stored as a head of a buffer array, and the buffer is
+        extended so as to double its size only if it is full.  A buffer is
+        extended in place if no other arrays refer to it.  A dtype of an
+        attribute is promoted if appended rows cannot be cast to it without
+        changing their kind, e.g., int scores become float if fractional
+        scores are appended, while the precision of floats is kept.
+
+        Parameters
+        ----------
+        name : str
+            name of an attribute
+        rows : array, shape=(n_rows, variable)
+            rows to append
+        """
+        array = getattr(self, name)
+        buffers = self.__dict__.setdefault('_buffer', {})
+        buf = buffers.pop(name, None)
+        n = array.shape[0]
+        n_new = n + rows.shape[0]
+        capacity = max(2 * n, n_new)
+        dtype = array.dtype
+        if dtype.names is None and rows.dtype.names is None and (
+                dtype.kind in 'iu' or
+                not np.can_cast(rows.dtype, dtype, casting='same_kind')):
+            dtype = np.result_type(dtype, rows.dtype)
+
+        if (buf is None or array.base is not buf or
+                array.__array_interface__['data'][0] !=
+                buf.__array_interface__['data'][0] or buf.dtype != dtype):
+            buf = np.empty((capacity,) + array.shape[1:], dtype=dtype)
+            buf[:n] = array
+        elif buf.shape[0] < n_new:
+            del array
+            delattr(self, name)
+            try:
+                buf.resize((capacity,) + buf.shape[1:])
+            except ValueError:
+                old_buf = buf
+                buf = np.empty((capacity,) + buf.shape[1:], dtype=dtype)
+                buf[:n] = old_buf[:n]
+                del old_buf
+        buf[n:n_new] = rows
+
+        buffers[name] = buf
+        setattr(self, name, buf[:n_new])
+
+    def _trim_buffers(self):
+        """
+        Release the unused space of buffers allocated by :meth:`_append_rows`
+        """
+        buffers = self.__dict__.pop('_buffer', {})
+        for name in list(buffers):
+            buf = buffers.pop(name)
+            n = getattr(self, name).shape[0]
+            if getattr(self, name).base is not buf:
+                continue
+            delattr(self, name)
+            try:
+                # shrink a buffer in place if no other views refer to it
+                buf.resize((n,) + buf.shape[1:])
+            except ValueError:
+                buf = buf[:n].copy()
+            setattr(self, name, buf)
+
+    def get_event_index(self, e):
+        """
+        Get a CSR-style index of events grouped by objects in the `e` -th
+        column of events.
+
+        Indexes of events whose `e` -th object is `iid` are
+        ``order[offsets[iid]:offsets[iid + 1]]`` .  An index is computed in
+        O(n_events) time, and it is cached until events are modified.
+
+        Parameters
+        ----------
+        e : int
+            column of events
+
+        Returns
+        -------
+        offsets : array, shape=(n_objects[event_otypes[e]] + 1,), dtype=int
+            start position of each object in `order`
+        order : array, shape=(n_events,), dtype=int
+            indexes of events sorted by objects in the `e` -th column
+        """
+        cache = self._get_cache()
+        key = ('event_index', e)
+        if key not in cache:
+            cache[key] = gen_group_index(
+                self.event[:, e], self.n_objects[self.event_otypes[e]])
+
+        return cache[key]
+
+    def events_of(self, e, iid):
+        """
+        Get indexes of events whose `e` -th object is `iid`
+
+        Parameters
+        ----------
+        e : int
+            column of events
+        iid : int
+            internal id of an object
+
+        Returns
+        -------
+        index : array, dtype=int
+            indexes of events in the ascending order
+        """
+        offsets, order = self.get_event_index(e)
+
+        return order[offsets[iid]:offsets[iid + 1]]
+
+    def iter_event_groups(self, e):
+        """
+        Iterate over groups of events that share the `e` -th object
+
+        Parameters
+        ----------
+        e : int
+            column of events
+
+        Yields
+        ------
+        iid : int
+            internal id of an object
+        index : array, dtype=int
+            indexes of events whose `e` -th object is `iid`
+        """
+        offsets, order = self.get_event_index(e)
+        for iid in xrange(offsets.shape[0] - 1):
+            yield iid, order[offsets[iid]:offsets[iid + 1]]
+
+    def _get_event_values(self, values):
+        """
+        Get values of events that are elements of sparse matrices
+
+        Parameters
+        ----------
+        values : {'binary', 'count'}
+            see :meth:`to_csr`
+
+        Returns
+        -------
+        values : array, shape=(n_events,)
+            values of events
+
+        Raises
+        ------
+        ValueError
+            if `values` is illegal
+        """
+        dtype = np.promote_types(self.event.dtype, np.int32)
+        if values == 'binary':
+            return np.ones(self.n_events, dtype=dtype)
+        elif values == 'count':
+            if self.event_count is None:
+                return np.ones(self.n_events, dtype=dtype)
+            return self.event_count.astype(dtype)
+        raise ValueError("Illegal type of values: {0!s}".format(values))
+
+    def to_csr(self, values=None, event_index=(0, 1)):
+        """
+        Get a sparse matrix in CSR format whose elements are values of events
+
+        Rows and columns of a matrix correspond to objects in the
+        ``event_index[0]`` -th and the ``event_index[1]`` -th columns of
+        events, respectively.  Values of duplicated events are summed.  A
+        matrix is cached until events are modified, and the cached matrix is
+        shared by all callers.  Therefore, arrays of the matrix are read-only.
+        Indices are int32 if they can represent the numbers of objects and
+        events.
+
+        Parameters
+        ----------
+        values : optional, {'score', 'binary', 'count'}
+            'score': scores of events, which is available only for
+            :class:`kamrecsys.data.EventWithScoreData` , 'binary': 1 if an
+            event is observed, and 'count': the number of events, which is
+            summed over `event_count` if events have been aggregated.  as
+            default, 'score' is used if available; otherwise, 'binary'.
+        event_index : optional, array_like, shape=(2,)
+            columns of events that specify rows and columns of a matrix
+            (default=(0, 1))
+
+        Returns
+        -------
+        matrix : :class:`scipy.sparse.csr_matrix`, shape=(n_rows, n_cols)
+            sparse matrix of events
+        """
+        if values is None:
+            values = self._default_values
+        event_index = tuple(int(e) for e in event_index)
+        cache = self._get_cache()
+        key = ('csr', values, event_index)
+        if key not in cache:
+            shape = tuple(
+                self.n_objects[self.event_otypes[e]] for e in event_index)
+            matrix = sparse.coo_matrix(
+                (self._get_event_values(values),
+                 (self.event[:, event_index[0]],
+                  self.event[:, event_index[1]])), shape=shape).tocsr()
+            if values == 'binary':
+                matrix.data[:] = 1
+            cache[key] = _set_read_only(matrix)
+
+        return cache[key]
+
+    def to_csc(self, values=None, event_index=(0, 1)):
+        """
+        Get a sparse matrix in CSC format whose elements are values of events
+
+        See :meth:`to_csr` .
+
+        Parameters
+        ----------
+        values : optional, str
+            type of values.  see :meth:`to_csr`
+        event_index : optional, array_like, shape=(2,)
+            columns of events that specify rows and columns of a matrix
+            (default=(0, 1))
+
+        Returns
+        -------
+        matrix : :class:`scipy.sparse.csc_matrix`, shape=(n_rows, n_cols)
+            sparse matrix of events
+        """
+        if values is None:
+            values = self._default_values
+        event_index = tuple(int(e) for e in event_index)
+        cache = self._get_cache()
+        key = ('csc', values, event_index)
+        if key not in cache:
+            cache[key] = _set_read_only(
+                self.to_csr(values, event_index).tocsc())
+
+        return cache[key]
+
+    def to_coo(self, values=None, event_index=(0, 1)):
+        """
+        Get a sparse matrix in COO format whose elements are values of events
+
+        Elements are sorted in the row-major order, and no duplicated
+        elements are included.  See :meth:`to_csr` .
+
+        Parameters
+        ----------
+        values : optional, str
+            type of values.  see :meth:`to_csr`
+        event_index : optional, array_like, shape=(2,)
+            columns of events that specify rows and columns of a matrix
+            (default=(0, 1))
+
+        Returns
+        -------
+        matrix : :class:`scipy.sparse.coo_matrix`, shape=(n_rows, n_cols)
+            sparse matrix of events
+        """
+        if values is None:
+            values = self._default_values
+        event_index = tuple(int(e) for e in event_index)
+        cache = self._get_cache()
+        key = ('coo', values, event_index)
+        if key not in cache:
+            cache[key] = _set_read_only(
+                self.to_csr(values, event_index).tocoo())
+
+        return cache[key]
+
+    def filter_event(self, filter_cond, view=False):
         """
         Returns a copy of data whose events are filtered based on
         `filter_cond` .  Information about the objects that is not contained
         in a filtered event set are eliminated as well.
 
+        If `view` is True, a filtered data shares arrays with this data, and
+        arrays related to events or features are filtered when they are
+        accessed for the first time.  Note that this data must not be modified
+        while such a view is in use.
+
         Parameters
         ----------
         filter_cond : array, dtype=bool, shape=(n_events,)
             Boolean array that specifies whether each event should be included
             in a new event array.
+        view : optional, bool
+            if True, the filtering of arrays is deferred (default=False)
 
         Returns
         -------
@@ -245,48 +655,225 @@ class EventData(BaseData, EventUtilMixin):
         # re-arrange filter
         filter_cond = np.asarray(filter_cond)
 
+        data = self._gen_filtered_view(filter_cond)
+        if not view:
+            data._materialize()
+
+        return data
+
+    def _gen_filtered_view(self, filter_cond):
+        """
+        Generate a filtered data whose arrays related to events and features
+        are deferred
+
+        Parameters
+        ----------
+        filter_cond : array, dtype=bool or int
+            Boolean array or array of indexes that specifies events to include
+
+        Returns
+        -------
+        data : :class:`kamrecsys.EventData`
+            A filtered data
+        """
+
         # copy data
         data = copy(self)
+        feature_deferred = 'feature' in self.__dict__.get('_deferred', {})
 
-        # generate a copy of filtered events
-        data.event = self.event[filter_cond, :].copy()
-        data.n_events = data.event.shape[0]
-
-        # update object info and iid's in an event set
+        # update object info
         data.n_objects = self.n_objects.copy()
         data.eid = self.eid.copy()
         data.iid = self.iid.copy()
-        data.feature = self.feature.copy()
-        # data.event_otypes = self.event_otypes.copy()
+        if not feature_deferred:
+            data.feature = self.feature.copy()
+        tables = [None] * self.s_event
+        sub_indexes = [None] * self.n_otypes
 
         for otype in xrange(data.n_otypes):
+            cols = np.nonzero(self.event_otypes == otype)[0]
 
             # indexes of objects contained in a filtered event set
-            sub_index = np.unique(data.event[:, data.event_otypes == otype])
-
-            # update iid's in an event set
+            present = np.zeros(self.n_objects[otype], dtype=bool)
+            for e in cols:
+                sub_event = self.event[filter_cond, e]
+                present[sub_event] = True
+            sub_index = np.nonzero(present)[0]
+            sub_indexes[otype] = sub_index
+
+            # table to update iid's in an event set
             table = self._gen_id_substitution_table(self.eid[otype], sub_index)
-            data.event[:, self.event_otypes == otype] = table[
-                data.event[:, self.event_otypes == otype]]
+            for e in cols:
+                tables[e] = table
 
             # filter object info
             data.eid[otype] = self.eid[otype][sub_index]
-            data.iid[otype] = {k: i for (i, k) in enumerate(data.eid[otype])}
+            data.iid[otype] = IdIndex(data.eid[otype])
             data.n_objects[otype] = data.eid[otype].shape[0]
-            if self.feature[otype] is not None:
-                data.feature[otype] = self.feature[otype][sub_index]
 
-        # filter out event features
+        if filter_cond.dtype == bool:
+            data.n_events = np.count_nonzero(filter_cond)
+        else:
+            data.n_events = len(filter_cond)
+
+        # filter events
+        def filter_event():
+            event = np.empty(
+                (data.n_events, self.s_event), dtype=self.event.dtype)
+            for e in xrange(self.s_event):
+                event[:, e] = tables[e][self.event[filter_cond, e]]
+            return event
+
+        data._defer('event', filter_event)
+
+        # filter object features
+        def filter_feature():
+            feature = self.feature.copy()
+            for otype in xrange(self.n_otypes):
+                if self.feature[otype] is not None:
+                    feature[otype] = _take_rows(
+                        self.feature[otype], sub_indexes[otype])
+            return feature
+
+        # features that are not computed yet are filtered when accessed
+        if feature_deferred or any(f is not None for f in self.feature):
+            data._defer('feature', filter_feature)
+
+        # filter event features
         if self.event_feature is not None:
-            data.event_feature = self.event_feature[filter_cond]
+            data._defer(
+                'event_feature', lambda: self.event_feature[filter_cond])
+        if self.event_count is not None:
+            data._defer('event_count', lambda: self.event_count[filter_cond])
 
         return data
 
+    def _group_events(self):
+        """
+        Group duplicated events
+
+        Events are sorted by keys that identify their objects with a stable
+        sort, so that duplicated events are contiguous and kept in their
+        original order.
+
+        Returns
+        -------
+        order : array, shape=(n_events,), dtype=int
+            indexes of events sorted by their objects
+        starts : array, shape=(n_groups,), dtype=int
+            start position of each group in `order`
+        last : array, shape=(n_groups,), dtype=int
+            index of the last event in each group
+        """
+        if self.n_events == 0:
+            empty = np.zeros(0, dtype=int)
+            return empty, empty, empty
+
+        dims = self.n_objects[self.event_otypes]
+        if np.prod(dims.astype(float)) < 2.0 ** 62:
+            key = np.ravel_multi_index(
+                tuple(self.event.T.astype(np.int64)), dims)
+        else:
+            key = np.unique(self.event, axis=0, return_inverse=True)[1]
+            key = key.ravel()
+        order = np.argsort(key, kind='mergesort')
+        key = key[order]
+
+        is_start = np.ones(self.n_events, dtype=bool)
+        np.not_equal(key[1:], key[:-1], out=is_start[1:])
+        starts = np.nonzero(is_start)[0]
+        last = order[np.r_[starts[1:], self.n_events] - 1]
+
+        return order, starts, last
+
+    def aggregate(self):
+        """
+        Returns a copy of data whose duplicated events are collapsed
+
+        Events consisting of the same objects are collapsed into one event,
+        which is placed at the position of the last one.  The number of
+        collapsed events is stored in an attribute `event_count` , and counts
+        are summed if the data have been already aggregated.  Features of
+        events are taken from the last ones.
+
+        Returns
+        -------
+        data : :class:`kamrecsys.EventData`
+            A copy of data whose events are distinct.
+        """
+
+        # check whether event info is available
+        if self.event is None:
+            return
+
+        data = self._gen_aggregated_view()[0]
+        data._materialize()
+
+        return data
+
+    def _gen_aggregated_view(self):
+        """
+        Generate data whose duplicated events are collapsed
+
+        Returns
+        -------
+        data : :class:`kamrecsys.EventData`
+            A data whose arrays related to events are deferred
+        order : array, shape=(n_events,), dtype=int
+            indexes of events sorted by their objects
+        starts : array, shape=(n_groups,), dtype=int
+            start position of each group in `order`
+        group_order : array, shape=(n_groups,), dtype=int
+            indexes of groups in the order of collapsed events
+        """
+        order, starts, last = self._group_events()
+
+        # order groups by their last events in linear time
+        is_last = np.zeros(self.n_events, dtype=bool)
+        is_last[last] = True
+        group_order = np.empty(last.shape[0], dtype=int)
+        group_order[np.cumsum(is_last)[last] - 1] = np.arange(last.shape[0])
+
+        if self.event_count is None:
+            count = np.diff(np.r_[starts, self.n_events])
+        else:
+            count = np.add.reduceat(self.event_count[order], starts)
+
+        data = self._gen_filtered_view(last[group_order])
+        data._defer('event_count', lambda: count[group_order])
+
+        return data, order, starts, group_order
+
 
 # =============================================================================
 # Functions
 # =============================================================================
 
+
+def _set_read_only(matrix):
+    """
+    Make arrays of a sparse matrix read-only
+
+    Parameters
+    ----------
+    matrix : :class:`scipy.sparse.spmatrix`
+        a sparse matrix in CSR, CSC, or COO format
+
+    Returns
+    -------
+    matrix : :class:`scipy.sparse.spmatrix`
+        the input matrix
+    """
+    if matrix.format == 'coo':
+        arrays = (matrix.data, matrix.row, matrix.col)
+    else:
+        arrays = (matrix.data, matrix.indices, matrix.indptr)
+    for x in arrays:
+        x.flags.writeable = False
+
+    return matrix
+
+
 # =============================================================================
 # Module initialization
 # =============================================================================
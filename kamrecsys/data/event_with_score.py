@@ -120,6 +120,8 @@ class EventWithScoreData(EventData, ScoreUtilMixin):
     :ref:`glossary`
     """
 
+    _default_values = 'score'
+
     def __init__(self, n_otypes=2, event_otypes=None):
         super(EventWithScoreData, self).__init__(n_otypes=n_otypes,
                                                  event_otypes=event_otypes)
@@ -127,7 +129,8 @@ class EventWithScoreData(EventData, ScoreUtilMixin):
         self.score = None
         self.n_score_levels = None
 
-    def set_event(self, event, score, score_domain=None, event_feature=None):
+    def set_event(self, event, score, score_domain=None, event_feature=None,
+                  index_dtype=None, score_dtype=None):
         """
         Set event data from structured array.
 
@@ -143,20 +146,97 @@ class EventWithScoreData(EventData, ScoreUtilMixin):
             If None, these values are estimated from an array of scores.
         event_feature : optional, array_like, shape=(n_events, variable)
             feature of events
+        index_dtype : optional, dtype
+            dtype of an event array.  see
+            :meth:`kamrecsys.data.EventData.set_event`
+        score_dtype : optional, dtype
+            dtype of scores.  as default, the dtype of `score` is used.
+            float32 halves the memory for scores, and recommenders
+            accumulate such scores in float64.
         """
 
-        super(EventWithScoreData, self).set_event(event, event_feature)
+        super(EventWithScoreData, self).set_event(
+            event, event_feature, index_dtype=index_dtype)
+
+        self.score = np.array(score, dtype=score_dtype)
+        self._set_score_domain(score_domain)
+
+    def _set_score_domain(self, score_domain=None):
+        """
+        Set a score domain and the number of score levels
 
-        self.score = np.array(score)
+        Parameters
+        ----------
+        score_domain : optional, tuple or 1d-array of tuple
+            min and max of scores, and the interval between scores.  If None,
+            these values are estimated from `score` .  If scores take only
+            one value, the interval is set to 1.
+        """
         if score_domain is None:
+            levels = np.unique(self.score)
             score_domain = [
-                np.min(self.score),
-                np.max(self.score),
-                np.min(np.diff(np.unique(self.score)))]
+                levels[0],
+                levels[-1],
+                np.min(np.diff(levels)) if levels.shape[0] > 1 else 1]
         self.score_domain = np.asanyarray(score_domain)
         self.n_score_levels = (
             int((score_domain[1] - score_domain[0]) / score_domain[2]) + 1)
 
+    def append_events(self, event, score=None, event_feature=None):
+        """
+        Append events and their scores to the data.
+
+        The score domain is not changed.  See
+        :meth:`kamrecsys.data.EventData.append_events` .
+
+        Parameters
+        ----------
+        event : array_like, shape=(n_new_events, s_event)
+            each row corresponds to an event represented by a vector of object
+            with external ids
+        score : array_like, shape=(n_new_events,)
+            a set of rating scores
+        event_feature : optional, array_like, shape=(n_new_events, variable)
+            feature of events
+
+        Raises
+        ------
+        ValueError
+            if scores are not specified, or their length is illegal.
+        """
+        if score is None:
+            raise ValueError("Scores must be specified")
+        score = np.asarray(score)
+        if score.shape[0] != np.shape(event)[0]:
+            raise ValueError("The length of scores is illegal")
+
+        # no events have been set
+        if self.event is None:
+            self.set_event(event, score, event_feature=event_feature)
+            return
+
+        super(EventWithScoreData, self).append_events(event, event_feature)
+        self._append_rows('score', score)
+
+    def _get_event_values(self, values):
+        """
+        Get values of events that are elements of sparse matrices
+
+        Parameters
+        ----------
+        values : {'score', 'binary', 'count'}
+            see :meth:`kamrecsys.data.EventData.to_csr`
+
+        Returns
+        -------
+        values : array, shape=(n_events,)
+            values of events
+        """
+        if values == 'score':
+            return self.score
+
+        return super(EventWithScoreData, self)._get_event_values(values)
+
     def digitize_score(self, score=None):
         """
         Returns discretized scores that starts with 0
@@ -205,34 +285,87 @@ class EventWithScoreData(EventData, ScoreUtilMixin):
         self.score_domain = np.array([0, 1, 1])
         self.n_score_levels = 2
 
-    def filter_event(self, filter_cond):
+        self._clear_cache()
+
+    def aggregate(self, how='last'):
         """
-        Returns a copy of data whose events are filtered based on
-        `filter_cond` .  Information about the objects that is not contained
-        in a filtered event set are eliminated as well.
+        Returns a copy of data whose duplicated events are collapsed
+
+        Scores of duplicated events are combined as specified by `how` .  See
+        :meth:`kamrecsys.data.EventData.aggregate` .
 
         Parameters
         ----------
-        filter_cond : array, dtype=bool, shape=(n_events,)
-            Boolean array that specifies whether each event should be included
-            in a new event array.
+        how : optional, {'last', 'mean', 'count', 'max'}
+            how to combine scores. 'last': the score of the last event,
+            'mean': the mean of scores, 'count': the number of events, and
+            'max': the maximum score.  If 'count', the score domain is
+            changed to ``[1, max count, 1]`` .  Means are weighted by the
+            counts of events if data have been already aggregated.
+            (default='last')
 
         Returns
         -------
-        data : :class:`kamrecsys.EventDataWithScore`
-            A copy of data whose events are filtered.
+        data : :class:`kamrecsys.EventWithScoreData`
+            A copy of data whose events are distinct.
+
+        Raises
+        ------
+        ValueError
+            if `how` is illegal
         """
+        if how not in ('last', 'mean', 'count', 'max'):
+            raise ValueError("Illegal aggregation method: {0!s}".format(how))
 
         # check whether event info is available
         if self.event is None:
             return
 
+        data, order, starts, group_order = self._gen_aggregated_view()
+        data._materialize()
+
+        if how == 'mean':
+            score = self.score[order].astype(float)
+            if self.event_count is not None:
+                score *= self.event_count[order]
+            score = np.add.reduceat(score, starts)[group_order]
+            score /= data.event_count
+            if self.score.dtype.kind == 'f':
+                score = score.astype(self.score.dtype)
+            data.score = score
+        elif how == 'max':
+            data.score = np.maximum.reduceat(
+                self.score[order], starts)[group_order]
+        elif how == 'count':
+            data.score = data.event_count.astype(self.score.dtype)
+            max_count = np.max(data.event_count) if data.n_events > 0 else 1
+            data.score_domain = np.array([1, max_count, 1])
+            data.n_score_levels = int(max_count)
+
+        return data
+
+    def _gen_filtered_view(self, filter_cond):
+        """
+        Generate a filtered data whose arrays related to events and features
+        are deferred
+
+        Parameters
+        ----------
+        filter_cond : array, dtype=bool or int
+            Boolean array or array of indexes that specifies events to include
+
+        Returns
+        -------
+        data : :class:`kamrecsys.EventDataWithScore`
+            A filtered data
+        """
+
         # filter out event related information
-        data = super(EventWithScoreData, self).filter_event(filter_cond)
+        data = super(EventWithScoreData, self)._gen_filtered_view(filter_cond)
 
         # filter out event data
         if self.score is not None:
-            data.score = self.score[filter_cond]
+            data._defer('score', lambda: self.score[filter_cond])
 
         return data
 
@@ -41,6 +41,61 @@ import numpy as np
 # =============================================================================
 
 
+class TestIdIndex(TestCase):
+
+    def test_class(self):
+        import pickle
+        from kamrecsys.data import IdIndex
+
+        # sorted external ids
+        iid = IdIndex(np.array([3, 5, 10, 21]))
+        assert_equal(len(iid), 4)
+        assert_equal(iid[10], 2)
+        assert_equal(iid.get(21), 3)
+        assert_equal(iid.get(4, -1), -1)
+        with assert_raises(KeyError):
+            iid[4]
+        self.assertIn(3, iid)
+        self.assertNotIn(100, iid)
+        self.assertNotIn('a', iid)
+        assert_equal(dict(iid), {3: 0, 5: 1, 10: 2, 21: 3})
+        assert_array_equal(iid[[21, 3]], [3, 0])
+
+        # bulk conversion
+        assert_array_equal(
+            iid.lookup([[5, 5], [22, 3]], missing=4), [[1, 1], [4, 0]])
+        with assert_raises(KeyError):
+            iid.lookup([5, 22])
+
+        # direct-address table
+        assert_array_equal(
+            iid.lookup(np.array([21, 2, 3, 100, -5, 10]), missing=-1),
+            [3, -1, 0, -1, -1, 2])
+        assert_equal(iid.lookup(np.array(5)), 1)
+        iid = IdIndex(np.array([3, 5, 10000]))
+        self.assertIsNone(iid._get_table())
+        assert_array_equal(iid.lookup([10000, 4], missing=3), [2, 3])
+
+        # unsorted external ids
+        iid = IdIndex(np.array(['c', 'a', 'd', 'b']))
+        assert_equal(iid['a'], 1)
+        assert_array_equal(
+            iid.lookup(['b', 'c', 'x', 'd'], missing=-1), [3, 0, -1, 2])
+        assert_equal(dict(iid), {'a': 1, 'b': 3, 'c': 0, 'd': 2})
+
+        # empty
+        iid = IdIndex(np.array([], dtype=int))
+        assert_equal(len(iid), 0)
+        assert_array_equal(iid.lookup([1, 2], missing=0), [0, 0])
+
+        # pickle
+        iid = IdIndex(np.array([3, 1, 2]))
+        iid2 = pickle.loads(pickle.dumps(iid))
+        assert_array_equal(iid2.eid, [3, 1, 2])
+        assert_equal(iid2[1], 1)
+        assert_equal(iid.__reduce__()[1][0] is iid.eid, True)
+
+
 class TestBaseData(TestCase):
 
     def test_class(self):
@@ -55,6 +110,39 @@ class TestBaseData(TestCase):
         with assert_raises(ValueError):
             data.to_eid(1, 100)
 
+    def test_set_feature(self):
+        from kamrecsys.data import EventData
+
+        data = EventData()
+        data.set_event(np.array([[5, 30], [1, 10], [5, 20], [3, 10]]))
+        fdtype = np.dtype([('age', int), ('genre', 'i1', 2)])
+        feature = np.array([(50, [0, 1]), (10, [1, 1]), (70, [1, 0])],
+                           dtype=fdtype)
+
+        # rows of objects without features are filled by zeros
+        data.set_feature(0, [5, 1, 7], feature)
+        assert_equal(data.feature[0].dtype, fdtype)
+        assert_array_equal(data.feature[0]['age'], [10, 0, 50])
+        assert_array_equal(data.feature[0]['genre'], [[1, 1], [0, 0], [0, 1]])
+
+        # column-oriented features
+        data.set_feature(0, [5, 1, 7], feature, columnar=True)
+        assert_equal(sorted(data.feature[0].keys()), ['age', 'genre'])
+        assert_array_equal(data.feature[0]['age'], [10, 0, 50])
+        assert_array_equal(data.feature[0]['genre'], [[1, 1], [0, 0], [0, 1]])
+        data.set_feature(1, [20, 10], {'x': [2., 1.]})
+        assert_array_equal(data.feature[1]['x'], [1., 2., 0.])
+        data.set_feature(1, [20, 10], {'x': [2., 1.]}, columnar=False)
+        assert_array_equal(data.feature[1]['x'], [1., 2., 0.])
+        assert_equal(data.feature[1].dtype.names, ('x',))
+
+        # column-oriented features of filtered data
+        data.set_feature(0, [5, 1, 3], feature, columnar=True)
+        filtered_data = data.filter_event([True, False, True, True])
+        assert_array_equal(filtered_data.feature[0]['age'], [70, 50])
+        data.append_events(np.array([[9, 10]]))
+        assert_array_equal(data.feature[0]['age'], [10, 70, 50, 0])
+
     def test_gen_id_substitution_table(self):
         from kamrecsys.data import ObjectUtilMixin
 
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import (
+    print_function,
+    division,
+    absolute_import,
+    unicode_literals)
+from six.moves import xrange
+
+# =============================================================================
+# Imports
+# =============================================================================
+
+from numpy.testing import (
+    TestCase,
+    run_module_suite,
+    assert_,
+    assert_allclose,
+    assert_array_almost_equal_nulp,
+    assert_array_max_ulp,
+    assert_array_equal,
+    assert_array_less,
+    assert_equal,
+    assert_raises,
+    assert_raises_regex,
+    assert_warns,
+    assert_string_equal)
+import numpy as np
+
+# =============================================================================
+# Module variables
+# =============================================================================
+
+# =============================================================================
+# Functions
+# =============================================================================
+
+# =============================================================================
+# Test Classes
+# =============================================================================
+
+
+class TestEventDataBuilder(TestCase):
+
+    def test_class(self):
+        from kamrecsys.data import (
+            EventData, EventWithScoreData, EventDataBuilder)
+
+        rng = np.random.RandomState(1234)
+        event = np.c_[rng.randint(0, 50, 1000) * 3, rng.randint(0, 20, 1000)]
+        score = rng.randint(1, 6, 1000) / 2
+        event_feature = np.zeros(1000, dtype=[('timestamp', int)])
+        event_feature['timestamp'] = np.arange(1000)
+
+        # events with scores
+        data = EventWithScoreData()
+        data.set_event(event, score, event_feature=event_feature)
+        builder = EventDataBuilder()
+        builder.extend(
+            (event[i:i + 64], score[i:i + 64], event_feature[i:i + 64])
+            for i in xrange(0, 1000, 64))
+        built_data = builder.build()
+
+        self.assertIsInstance(built_data, EventWithScoreData)
+        assert_equal(built_data.n_events, data.n_events)
+        assert_array_equal(built_data.n_objects, data.n_objects)
+        for otype in xrange(2):
+            assert_array_equal(built_data.eid[otype], data.eid[otype])
+            assert_equal(dict(built_data.iid[otype]), dict(data.iid[otype]))
+        assert_equal(built_data.event.dtype, data.event.dtype)
+        assert_array_equal(built_data.event, data.event)
+        assert_array_equal(built_data.score, data.score)
+        assert_array_equal(built_data.score_domain, [0.5, 2.5, 0.5])
+        assert_equal(built_data.n_score_levels, 5)
+        assert_array_equal(built_data.event_feature, data.event_feature)
+        self.assertNotIn('_buffer', built_data.__dict__)
+        assert_(built_data.event.flags.owndata)
+
+        # the first chunk whose scores take only one value
+        builder = EventDataBuilder()
+        builder.add([[1, 10], [2, 20]], score=[3., 3.])
+        builder.add([[3, 10]], score=[4.5])
+        built_data = builder.build()
+        assert_array_equal(built_data.score_domain, [3., 4.5, 1.5])
+        assert_equal(built_data.n_score_levels, 2)
+        data = EventWithScoreData()
+        data.append_events([[1, 10]], [3.])
+        assert_array_equal(data.score_domain, [3., 3., 1.])
+        assert_equal(data.n_score_levels, 1)
+
+        # events without scores
+        data = EventData(n_otypes=1, event_otypes=[0, 0])
+        data.set_event(event)
+        builder = EventDataBuilder(
+            n_otypes=1, event_otypes=[0, 0], index_dtype=np.int64)
+        builder.add(event[:500])
+        builder.add(event[500:])
+        built_data = builder.build()
+        self.assertNotIsInstance(built_data, EventWithScoreData)
+        assert_array_equal(built_data.eid[0], data.eid[0])
+        assert_array_equal(built_data.event, data.event)
+        assert_equal(built_data.event.dtype, np.int64)
+
+        # errors
+        with assert_raises(ValueError):
+            builder.build()
+        builder.add(event[:10])
+        with assert_raises(ValueError):
+            builder.add(event[10:20], score[10:20])
+
+
+# =============================================================================
+# Main Routines
+# =============================================================================
+
+if __name__ == '__main__':
+    run_module_suite()
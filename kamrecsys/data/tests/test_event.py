@@ -82,9 +82,224 @@ class TestEventUtilMixin(TestCase):
             check[i, :] = data.to_iid_event(j)
         assert_array_equal(data.event, check)
 
+    def test_bulk_conversion(self):
+        data = EventData()
+        data.set_event(np.array([[5, 30], [1, 10], [5, 20], [3, 10]]))
+
+        # to_iid_event, unknown ids are mapped to n_objects
+        iev = data.to_iid_event(np.array([[3, 20], [4, 10], [5, 40]]))
+        assert_array_equal(iev, [[1, 1], [3, 0], [2, 3]])
+        assert_equal(iev.dtype, np.int32)
+        assert_equal(data.to_iid_event(np.array([2, 30])).dtype, np.int32)
+        assert_equal(
+            data.to_iid_event(
+                np.array([[2, 30]]), missing_values=2 ** 40).dtype,
+            np.int64)
+        data2 = EventData()
+        data2.set_event(data.to_eid_event(data.event), index_dtype=np.int64)
+        assert_equal(
+            data2.to_iid_event(np.array([[3, 20]])).dtype, np.int64)
+        assert_array_equal(data.to_iid_event(np.array([2, 30])), [3, 2])
+        assert_array_equal(
+            data.to_iid_event(np.array([[2, 30]]), missing_values=-1),
+            [[-1, 2]])
+        assert_array_equal(
+            data.to_iid_event(np.array([[2, 30]]), missing_values=[7, 8]),
+            [[7, 2]])
+        with assert_raises(TypeError):
+            data.to_iid_event(np.array([1, 10, 5]))
+
+        # to_eid_event
+        assert_array_equal(
+            data.to_eid_event(data.event),
+            [[5, 30], [1, 10], [5, 20], [3, 10]])
+        assert_array_equal(data.to_eid_event(np.array([1, 2])), [3, 30])
+        with assert_raises(TypeError):
+            data.to_eid_event(np.array([[[1, 2]]]))
+
 
 class TestEventData(TestCase):
 
+    def test_set_event(self):
+
+        # two object types
+        data = EventData()
+        data.set_event(np.array([[5, 30], [1, 10], [5, 20], [3, 10]]))
+        assert_array_equal(data.n_objects, [3, 3])
+        assert_array_equal(data.eid[0], [1, 3, 5])
+        assert_array_equal(data.eid[1], [10, 20, 30])
+        assert_equal(dict(data.iid[0]), {1: 0, 3: 1, 5: 2})
+        assert_equal(dict(data.iid[1]), {10: 0, 20: 1, 30: 2})
+        assert_array_equal(data.event, [[2, 2], [0, 0], [2, 1], [1, 0]])
+        assert_equal(data.n_events, 4)
+        self.assertIsNone(data.event_feature)
+
+        # objects of the same type in multiple columns
+        data = EventData(n_otypes=1, event_otypes=[0, 0])
+        data.set_event(np.array([['b', 'd'], ['a', 'b'], ['c', 'a']]))
+        assert_array_equal(data.n_objects, [4])
+        assert_array_equal(data.eid[0], ['a', 'b', 'c', 'd'])
+        assert_array_equal(data.event, [[1, 3], [0, 1], [2, 0]])
+
+        # dtype of events
+        assert_equal(data.event.dtype, np.int32)
+        data.set_event(np.array([[1, 2]]), index_dtype=np.int64)
+        assert_equal(data.event.dtype, np.int64)
+        data.set_event(np.array([[1, 2]]), index_dtype=np.int8)
+        data.append_events(np.arange(300).reshape(150, 2))
+        assert_equal(data.event.dtype, np.int32)
+        assert_array_equal(data.to_eid_event(data.event[-1]), [298, 299])
+        with assert_raises(ValueError):
+            data.set_event(np.arange(300).reshape(150, 2), index_dtype=np.int8)
+
+    def test_append_events(self):
+        from kamrecsys.data import EventWithScoreData
+
+        data = EventData()
+        data.append_events(np.array([[5, 30], [1, 10]]))
+        assert_array_equal(data.event, [[1, 1], [0, 0]])
+        data.set_feature(0, [1, 5], np.array([10., 50.]))
+        assert_array_equal(data.events_of(0, 1), [0])
+
+        data.append_events(np.array([[3, 10], [5, 20], [3, 40]]))
+        assert_array_equal(data.n_objects, [3, 4])
+        assert_equal(data.n_events, 5)
+        assert_array_equal(data.eid[0], [1, 5, 3])
+        assert_array_equal(data.eid[1], [10, 30, 20, 40])
+        assert_equal(dict(data.iid[0]), {1: 0, 5: 1, 3: 2})
+        assert_array_equal(
+            data.event, [[1, 1], [0, 0], [2, 0], [1, 2], [2, 3]])
+        assert_array_equal(data.feature[0], [10., 50., 0.])
+        assert_array_equal(data.events_of(0, 1), [0, 3])
+
+        # buffer is re-allocated only if it is full
+        data.append_events(np.array([[1, 10]]))
+        buf = data.event.base
+        assert_equal(buf.shape, (10, 2))
+        data.append_events(np.array([[1, 30]]))
+        self.assertIs(data.event.base, buf)
+        assert_array_equal(data.event[-2:], [[0, 0], [0, 1]])
+        copied_data = data.filter_event(np.ones(data.n_events, dtype=bool))
+        copied_data.append_events(np.array([[7, 10]]))
+        data.append_events(np.array([[5, 10]]))
+        assert_array_equal(data.event[-1], [1, 0])
+        assert_array_equal(copied_data.event[-1], [3, 0])
+        assert_equal(data.n_events, 8)
+
+        with assert_raises(ValueError):
+            data.append_events(np.array([1, 10]))
+        with assert_raises(ValueError):
+            data.append_events(np.array([[1, 10]]), event_feature=[0])
+
+        # scores and event features
+        data = EventWithScoreData()
+        data.set_event(
+            np.array([['a', 'x']]), [1], score_domain=(1, 5, 1),
+            event_feature=np.array([10]))
+        data.append_events(
+            np.array([['b', 'x'], ['a', 'y']]), [5, 3], event_feature=[20, 30])
+        assert_array_equal(
+            data.to_eid_event(data.event),
+            [['a', 'x'], ['b', 'x'], ['a', 'y']])
+        assert_array_equal(data.score, [1, 5, 3])
+        assert_array_equal(data.event_feature, [10, 20, 30])
+        assert_array_equal(data.score_domain, [1, 5, 1])
+        with assert_raises(ValueError):
+            data.append_events(np.array([['b', 'x']]))
+        with assert_raises(ValueError):
+            data.append_events(np.array([['b', 'x']]), [1])
+
+    def test_save_load(self):
+        import shutil
+        import tempfile
+        from kamrecsys.data import EventWithScoreData
+
+        data = EventWithScoreData()
+        data.set_event(
+            np.array([['a', 'x'], ['b', 'x'], ['a', 'y']]), [1, 5, 3],
+            score_domain=(1, 5, 1),
+            event_feature=np.array(
+                [(10,), (20,), (30,)], dtype=[('timestamp', int)]))
+        fdtype = np.dtype([('name', 'U8'), ('genre', 'i1', 3)])
+        data.set_feature(
+            1, ['y', 'x'],
+            np.array([('Y', [0, 1, 0]), ('X', [1, 1, 0])], dtype=fdtype))
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            data.save(tmpdir)
+            for mmap_mode in ['r', None]:
+                loaded_data = EventData.load(tmpdir, mmap_mode=mmap_mode)
+                self.assertIsInstance(loaded_data, EventWithScoreData)
+                assert_equal(
+                    sorted(loaded_data.__dict__.keys()),
+                    sorted(data.__dict__.keys()))
+                assert_array_equal(loaded_data.event, data.event)
+                assert_array_equal(loaded_data.score, data.score)
+                assert_array_equal(loaded_data.score_domain, [1, 5, 1])
+                assert_equal(loaded_data.n_score_levels, 5)
+                assert_equal(
+                    loaded_data.event_feature.dtype, data.event_feature.dtype)
+                assert_array_equal(
+                    loaded_data.event_feature, data.event_feature)
+                assert_array_equal(loaded_data.eid[0], ['a', 'b'])
+                assert_equal(dict(loaded_data.iid[1]), {'x': 0, 'y': 1})
+                self.assertIsNone(loaded_data.feature[0])
+                assert_equal(loaded_data.feature[1].dtype, fdtype)
+                assert_array_equal(loaded_data.feature[1], data.feature[1])
+            self.assertIsInstance(loaded_data.event, np.ndarray)
+
+            # column-oriented features
+            data.set_feature(
+                1, ['y', 'x'], {'a': [1., 2.], 'b': [[1, 0], [0, 1]]})
+            data.save(tmpdir)
+            loaded_data = EventData.load(tmpdir)
+            assert_equal(list(loaded_data.feature[1].keys()), ['a', 'b'])
+            assert_array_equal(loaded_data.feature[1]['a'], [2., 1.])
+            assert_array_equal(loaded_data.feature[1]['b'], [[0, 1], [1, 0]])
+
+            # memory-mapped data can be extended
+            loaded_data = EventData.load(tmpdir)
+            self.assertIsInstance(loaded_data.event, np.memmap)
+            loaded_data.append_events(
+                np.array([['c', 'x']]), [4],
+                event_feature=np.array([(40,)], dtype=[('timestamp', int)]))
+            assert_array_equal(loaded_data.n_objects, [3, 2])
+            assert_array_equal(EventData.load(tmpdir).n_objects, [2, 2])
+
+            with assert_raises(TypeError):
+                EventData().save(tmpdir)
+                EventWithScoreData.load(tmpdir)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_event_index(self):
+        import pickle
+
+        data = EventData()
+        data.set_event(np.array([[5, 30], [1, 10], [5, 20], [3, 10]]))
+
+        offsets, order = data.get_event_index(0)
+        assert_array_equal(offsets, [0, 1, 2, 4])
+        assert_array_equal(order, [1, 3, 0, 2])
+        self.assertIs(data.get_event_index(0)[1], order)
+
+        assert_array_equal(data.events_of(0, 2), [0, 2])
+        assert_array_equal(data.events_of(1, 0), [1, 3])
+        assert_array_equal(data.events_of(1, 1), [2])
+        assert_equal(
+            [(i, list(j)) for i, j in data.iter_event_groups(1)],
+            [(0, [1, 3]), (1, [2]), (2, [0])])
+
+        # cached indexes are neither pickled nor copied
+        self.assertNotIn('_cache', pickle.loads(pickle.dumps(data)).__dict__)
+        filtered_data = data.filter_event([True, True, False, False])
+        assert_array_equal(filtered_data.events_of(0, 0), [1])
+
+        # an index is updated when events are modified
+        data.set_event(np.array([[1, 10], [1, 20]]))
+        assert_array_equal(data.events_of(0, 0), [0, 1])
+
     def test_filter_event(self):
         from kamrecsys.data import EventWithScoreData
 
@@ -117,10 +332,10 @@ class TestEventData(TestCase):
         assert_array_equal(filtered_data.eid[1], [1, 2, 3, 4, 5, 7, 8, 9])
 
         assert_equal(
-            filtered_data.iid[0],
+            dict(filtered_data.iid[0]),
             {1: 0, 5: 1, 6: 2, 7: 3, 8: 4, 10: 5})
         assert_equal(
-            filtered_data.iid[1],
+            dict(filtered_data.iid[1]),
             {1: 0, 2: 1, 3: 2, 4: 3, 5: 4, 7: 5, 8: 6, 9: 7})
 
         assert_equal(
@@ -142,6 +357,112 @@ class TestEventData(TestCase):
         assert_array_equal(
             filtered_data.event, [[0, 0], [2, 2], [3, 3], [1, 1], [2, 2]])
 
+    def test_filter_event_view(self):
+        import pickle
+        from kamrecsys.data import EventWithScoreData
+
+        rng = np.random.RandomState(1234)
+        event = np.c_[rng.randint(0, 20, 100) * 2, rng.randint(0, 10, 100)]
+        data = EventWithScoreData()
+        data.set_event(
+            event, rng.randint(1, 6, 100), score_domain=(1, 5, 1),
+            event_feature=np.arange(100))
+        data.set_feature(
+            1, data.eid[1], np.arange(data.n_objects[1], dtype=float))
+        filter_cond = rng.rand(100) < 0.3
+
+        copied = data.filter_event(filter_cond)
+        view = data.filter_event(filter_cond, view=True)
+        self.assertNotIn('event', view.__dict__)
+        self.assertNotIn('score', view.__dict__)
+
+        # object info is available without filtering events
+        assert_equal(view.n_events, copied.n_events)
+        assert_equal(
+            data.filter_event(np.flatnonzero(filter_cond),
+                              view=True).n_events,
+            np.count_nonzero(filter_cond))
+        assert_array_equal(view.n_objects, copied.n_objects)
+        assert_array_equal(view.eid[0], copied.eid[0])
+        assert_equal(dict(view.iid[1]), dict(copied.iid[1]))
+
+        # deferred arrays
+        assert_array_equal(view.event, copied.event)
+        self.assertIn('event', view.__dict__)
+        assert_array_equal(view.score, copied.score)
+        assert_array_equal(view.event_feature, copied.event_feature)
+        assert_array_equal(view.feature[1], data.iid[1].lookup(view.eid[1]))
+        self.assertIsNone(view.feature[0])
+        self.assertNotIn('_deferred', view.__dict__)
+        with assert_raises(AttributeError):
+            view.no_such_attribute
+
+        # pickling a view
+        view = data.filter_event(np.nonzero(filter_cond)[0], view=True)
+        view = pickle.loads(pickle.dumps(view))
+        assert_array_equal(view.event, copied.event)
+        assert_array_equal(view.score, copied.score)
+        assert_array_equal(view.feature[1], copied.feature[1])
+
+    def test_aggregate(self):
+        data = EventData()
+        data.set_event(np.array([[1, 2], [1, 2], [3, 4], [1, 4], [3, 4]]))
+
+        agg_data = data.aggregate()
+        assert_array_equal(
+            agg_data.to_eid_event(agg_data.event), [[1, 2], [1, 4], [3, 4]])
+        assert_array_equal(agg_data.event_count, [2, 1, 2])
+        assert_equal(agg_data.n_events, 3)
+        assert_array_equal(agg_data.n_objects, [2, 2])
+
+        # object ids whose product cannot be represented by int64
+        data = EventData(n_otypes=3)
+        data.set_event(np.array([[1, 2, 3], [1, 2, 3], [4, 5, 6]]))
+        data.n_objects = np.array([2 ** 21, 2 ** 21, 2 ** 21])
+        assert_array_equal(data.aggregate().event_count, [2, 1])
+
+        # no events
+        data = EventData()
+        data.set_event(np.array([[1, 2], [3, 4]]))
+        data = data.filter_event([False, False])
+        agg_data = data.aggregate()
+        assert_equal(agg_data.n_events, 0)
+        assert_equal(agg_data.event.shape, (0, 2))
+        assert_equal(agg_data.event_count.shape, (0,))
+        assert_array_equal(agg_data.n_objects, [0, 0])
+
+    def test_to_csr(self):
+        data = EventData()
+        data.set_event(np.array([[1, 2], [1, 2], [3, 4], [1, 4]]))
+
+        csr = data.to_csr()
+        assert_equal(csr.format, 'csr')
+        assert_array_equal(csr.toarray(), [[1, 1], [0, 1]])
+        assert_equal(csr.indices.dtype, np.int32)
+        assert_equal(csr.indptr.dtype, np.int32)
+        self.assertIs(data.to_csr(), csr)
+        with assert_raises(ValueError):
+            csr.data[0] = 2
+        assert_array_equal(data.to_csr('count').toarray(), [[2, 1], [0, 1]])
+        assert_array_equal(
+            data.to_csr(event_index=(1, 0)).toarray(), [[1, 0], [1, 1]])
+        with assert_raises(ValueError):
+            data.to_csr('score')
+
+        csc = data.to_csc('count')
+        assert_equal(csc.format, 'csc')
+        assert_array_equal(csc.toarray(), [[2, 1], [0, 1]])
+        coo = data.to_coo()
+        assert_equal(coo.format, 'coo')
+        assert_array_equal(coo.row, [0, 0, 1])
+        assert_array_equal(coo.col, [0, 1, 1])
+
+        # invalidated when events are modified
+        data.append_events(np.array([[3, 2]]))
+        assert_array_equal(data.to_csr().toarray(), [[1, 1], [1, 1]])
+        assert_array_equal(data.aggregate().to_csr('count').toarray(),
+                           [[2, 1], [1, 1]])
+
 
 # =============================================================================
 # Main Routines
@@ -73,6 +73,31 @@ class TestEventWithScoreData(TestCase):
         assert_allclose(data.score_domain, [1.0, 5.0, 0.5])
         self.assertEqual(data.n_score_levels, 9)
 
+    def test_dtypes(self):
+        from kamrecsys.data import EventWithScoreData
+
+        data = EventWithScoreData()
+        data.set_event(np.array([[1, 2], [2, 1]]), [1., 2.])
+        assert_equal(data.event.dtype, np.int32)
+        assert_equal(data.score.dtype, np.float64)
+
+        data.set_event(
+            np.array([[1, 2], [2, 1]]), [1., 2.],
+            index_dtype=np.int64, score_dtype=np.float32)
+        assert_equal(data.event.dtype, np.int64)
+        assert_equal(data.score.dtype, np.float32)
+        data.append_events(np.array([[3, 1]]), [3.])
+        assert_equal(data.score.dtype, np.float32)
+        assert_allclose(data.score, [1., 2., 3.])
+
+        # fractional scores appended to int scores
+        data = EventWithScoreData()
+        data.set_event(np.array([[1, 2], [2, 1]]), [1, 2], score_dtype=int)
+        assert_equal(data.score.dtype.kind, 'i')
+        data.append_events(np.array([[3, 1]]), [3.5])
+        assert_equal(data.score.dtype, np.float64)
+        assert_allclose(data.score, [1., 2., 3.5])
+
     def test_generate_score_bins(self):
         data, x = load_test_data()
 
@@ -129,6 +154,73 @@ class TestEventWithScoreData(TestCase):
             [0, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 1, 1, 0, 1,
              0, 1, 0, 0, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1])
 
+    def test_aggregate(self):
+        from kamrecsys.data import EventWithScoreData
+
+        data = EventWithScoreData()
+        data.set_event(
+            [[1, 10], [2, 10], [1, 10], [3, 20], [1, 10], [2, 10]],
+            [1, 2, 3, 4, 5, 4], score_domain=(1, 5, 1),
+            event_feature=np.arange(6))
+
+        # collapsed events are placed at the positions of the last ones
+        agg_data = data.aggregate()
+        assert_array_equal(
+            agg_data.to_eid_event(agg_data.event), [[3, 20], [1, 10], [2, 10]])
+        assert_array_equal(agg_data.score, [4, 5, 4])
+        assert_array_equal(agg_data.event_count, [1, 3, 2])
+        assert_array_equal(agg_data.event_feature, [3, 4, 5])
+        assert_equal(agg_data.n_events, 3)
+        self.assertIsNone(data.event_count)
+
+        assert_allclose(data.aggregate('mean').score, [4., 3., 3.])
+        assert_array_equal(data.aggregate('max').score, [4, 5, 4])
+        agg_data = data.aggregate('count')
+        assert_array_equal(agg_data.score, [1, 3, 2])
+        assert_array_equal(agg_data.score_domain, [1, 3, 1])
+        assert_equal(agg_data.n_score_levels, 3)
+
+        # aggregation of aggregated data
+        agg_data = data.aggregate('max')
+        agg_data.append_events([[1, 10], [4, 10]], [2, 3], [6, 7])
+        assert_array_equal(agg_data.event_count, [1, 3, 2, 1, 1])
+        agg_data = agg_data.aggregate('mean')
+        assert_array_equal(
+            agg_data.to_eid_event(agg_data.event),
+            [[3, 20], [2, 10], [1, 10], [4, 10]])
+        assert_allclose(agg_data.score, [4., 4., 4.25, 3.])
+        assert_array_equal(agg_data.event_count, [1, 2, 4, 1])
+        filtered_data = agg_data.filter_event(agg_data.score > 3.5)
+        assert_array_equal(filtered_data.event_count, [1, 2, 4])
+
+        with assert_raises(ValueError):
+            data.aggregate('sum')
+
+        # no events
+        data = data.filter_event(np.zeros(6, dtype=bool))
+        for how in ('last', 'mean', 'count', 'max'):
+            agg_data = data.aggregate(how)
+            assert_equal(agg_data.n_events, 0)
+            assert_equal(agg_data.score.shape, (0,))
+            assert_equal(agg_data.event_count.shape, (0,))
+            assert_equal(agg_data.event_feature.shape, (0,))
+        assert_array_equal(data.aggregate('count').score_domain, [1, 1, 1])
+
+    def test_to_csr(self):
+        from kamrecsys.data import EventWithScoreData
+
+        data = EventWithScoreData()
+        data.set_event(
+            [[1, 10], [2, 10], [1, 20], [2, 10]], [1, 2, 5, 3],
+            score_domain=(1, 5, 1))
+        assert_array_equal(data.to_csr().toarray(), [[1, 5], [5, 0]])
+        assert_array_equal(data.to_csc('binary').toarray(), [[1, 1], [1, 0]])
+        assert_array_equal(data.to_coo('count').data, [1, 1, 2])
+
+        # invalidated when scores are modified
+        data.binarize_score()
+        assert_array_equal(data.to_csr().toarray(), [[0, 1], [0, 0]])
+
 
 # =============================================================================
 # Main Routines
@@ -20,6 +20,9 @@ import logging
 from .base import (
     SAMPLE_PATH,
     event_dtype_timestamp,
+    read_event_file,
+    iter_event_chunks,
+    convert_binary,
     load_event,
     load_event_with_score)
 from .flixster import (
@@ -35,6 +38,8 @@ from .others import (
 from .sushi3 import (
     SUSHI3_INFO,
     load_sushi3b_score)
+from .synthetic import (
+    make_synthetic_events)
 
 # =============================================================================
 # Metadata variables
@@ -47,6 +52,9 @@ from .sushi3 import (
 __all__ = [
     'SAMPLE_PATH',
     'event_dtype_timestamp',
+    'read_event_file',
+    'iter_event_chunks',
+    'convert_binary',
     'load_event',
     'load_event_with_score',
     'load_flixster_rating',
@@ -57,7 +65,8 @@ __all__ = [
     'load_movielens1m',
     'load_pci_sample',
     'SUSHI3_INFO',
-    'load_sushi3b_score']
+    'load_sushi3b_score',
+    'make_synthetic_events']
 
 # =============================================================================
 # Constants
@@ -14,14 +14,32 @@ from six.moves import xrange
 # Imports
 # =============================================================================
 
+import bz2
+import gzip
+import hashlib
+import io
+import json
 import logging
+import multiprocessing
 import os
+import re
+import shutil
+import tempfile
+import warnings
 
 import numpy as np
+import six
+from sklearn.utils import check_random_state
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
 
 from ..data import (
     EventData,
-    EventWithScoreData)
+    EventWithScoreData,
+    EventDataBuilder)
 
 # =============================================================================
 # Public symbols
@@ -41,6 +59,18 @@ SAMPLE_PATH = os.path.join(os.path.dirname(__file__), 'data')
 # timestamp
 event_dtype_timestamp = np.dtype([('timestamp', int)])
 
+# magic numbers of compressed files
+_COMPRESSION_MAGICS = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz')]
+
+# suffix of directories of sample data converted into a binary format
+BINARY_SUFFIX = '.bin'
+
+# environment variable specifying the default directory of loader caches
+CACHE_DIR_ENV = 'KAMRECSYS_CACHE_DIR'
+
 # =============================================================================
 # Module variables
 # =============================================================================
@@ -54,7 +84,972 @@ event_dtype_timestamp = np.dtype([('timestamp', int)])
 # =============================================================================
 
 
-def load_event(infile, n_otypes=2, event_otypes=None, event_dtype=None):
+def _leaf_fields(dtype, names=()):
+    """
+    Enumerate leaf fields of a structured dtype in the order of columns
+
+    Parameters
+    ----------
+    dtype : np.dtype
+        structured dtype
+    names : tuple
+        names of fields leading to `dtype`
+
+    Yields
+    ------
+    names : tuple
+        names of fields leading to a leaf field
+    dtype : np.dtype
+        dtype of a leaf field, which may be a sub-array
+    """
+    if dtype.names is None:
+        yield names, dtype
+    else:
+        for name in dtype.names:
+            for leaf in _leaf_fields(dtype.fields[name][0], names + (name,)):
+                yield leaf
+
+
+def _parse_numeric_text(text, dtype):
+    """
+    Parse numeric tab-separated text into a structured array
+
+    All values are parsed at once by :func:`numpy.fromstring` , and the
+    numbers of values and delimiters are checked.
+
+    Parameters
+    ----------
+    text : bytes
+        tab-separated text whose comments have been removed
+    dtype : np.dtype
+        structured dtype of a row
+
+    Returns
+    -------
+    x : array, dtype=dtype or None
+        parsed array.  None if text cannot be parsed by this function.
+    """
+    leaves = list(_leaf_fields(dtype))
+    n_cols = sum(int(np.prod(d.shape)) for n, d in leaves)
+    if any(d.base.kind not in 'biuf' for n, d in leaves):
+        return None
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        values = np.fromstring(text, dtype=float, sep=' ')
+    n_rows = values.shape[0] // n_cols
+    if (values.shape[0] != n_rows * n_cols or
+            text.count(b'\t') != n_rows * (n_cols - 1)):
+        return None
+    values = values.reshape(n_rows, n_cols)
+
+    # integers that are not exactly represented by float64
+    is_int = np.repeat([d.base.kind in 'biu' for n, d in leaves],
+                       [int(np.prod(d.shape)) for n, d in leaves])
+    if np.any(np.abs(values[:, is_int]) >= 2 ** 53):
+        return None
+
+    x = np.empty(n_rows, dtype=dtype)
+    col = 0
+    for names, d in leaves:
+        field = x
+        for name in names:
+            field = field[name]
+        size = int(np.prod(d.shape))
+        field[...] = values[:, col:col + size].reshape(field.shape)
+        col += size
+
+    return x
+
+
+def _get_compression(file_name):
+    """
+    Detect the compression format of a file from its magic number
+
+    Parameters
+    ----------
+    file_name : str
+        path to a file
+
+    Returns
+    -------
+    compression : str or None
+        'gzip', 'bz2', or 'xz'.  None if the file is not compressed.
+    """
+    with open(file_name, 'rb') as f:
+        head = f.read(6)
+    for magic, compression in _COMPRESSION_MAGICS:
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+
+def _open_file(file_name):
+    """
+    Open a file in a binary mode.  gzip, bz2, and xz-compressed files are
+    decompressed transparently.
+
+    Parameters
+    ----------
+    file_name : str
+        path to a file
+
+    Returns
+    -------
+    f : file
+        binary file object
+
+    Raises
+    ------
+    ValueError
+        if the file is compressed by xz, but :mod:`lzma` is not available
+    """
+    compression = _get_compression(file_name)
+    if compression == 'gzip':
+        return gzip.GzipFile(file_name, 'rb')
+    elif compression == 'bz2':
+        return bz2.BZ2File(file_name, 'rb')
+    elif compression == 'xz':
+        if lzma is None:
+            raise ValueError("lzma module is required to read xz files")
+        return lzma.LZMAFile(file_name, 'rb')
+
+    return open(file_name, 'rb')
+
+
+def _split_file(file_name, n_chunks):
+    """
+    Split a file into byte ranges at line boundaries
+
+    Parameters
+    ----------
+    file_name : str
+        path to a file
+    n_chunks : int
+        the maximum number of ranges
+
+    Returns
+    -------
+    ranges : list of tuple
+        pairs of the start and end positions of ranges
+    """
+    size = os.path.getsize(file_name)
+    bounds = [0]
+    with open(file_name, 'rb') as f:
+        for i in xrange(1, n_chunks):
+            pos = max(size * i // n_chunks, bounds[-1])
+            f.seek(pos)
+            f.readline()
+            pos = min(f.tell(), size) if pos > 0 else 0
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    if bounds[-1] < size:
+        bounds.append(size)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _read_event_range(args):
+    """
+    Read a byte range of an event file.  This is called by worker processes.
+
+    Parameters
+    ----------
+    args : tuple
+        a path to a file, the start and end positions, and a dtype
+
+    Returns
+    -------
+    x : array, dtype=dtype
+        parsed array
+    """
+    file_name, start, end, dtype = args
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start)
+
+    return read_event_file(io.BytesIO(text), dtype)
+
+
+def read_event_file(infile, dtype, n_jobs=None):
+    """
+    Read a tab-separated event file into a structured array
+
+    Lines or parts of lines that follow ``#`` are treated as comments, and
+    blank lines are ignored.  If all fields are numeric, values are parsed in
+    bulk by :func:`numpy.fromstring` ; otherwise, or if the file cannot be
+    parsed in this way, :func:`numpy.genfromtxt` is used.  Files compressed
+    by gzip, bz2, or xz are decompressed transparently.
+
+    Parameters
+    ----------
+    infile : file or str
+        input file
+    dtype : np.dtype
+        structured dtype of a row, whose leaf fields correspond to columns
+    n_jobs : optional, int
+        the number of processes.  if `infile` is a path and `n_jobs` is
+        greater than 1, the file is split at line boundaries and its parts
+        are parsed in parallel.  if -1, all CPUs are used.  compressed
+        files are always parsed by one process.  (default=None)
+
+    Returns
+    -------
+    x : array, shape=(n_rows,), dtype=dtype
+        parsed array
+    """
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = multiprocessing.cpu_count()
+    if (n_jobs is not None and n_jobs > 1 and
+            isinstance(infile, six.string_types) and
+            _get_compression(infile) is None):
+        ranges = _split_file(infile, n_jobs)
+        pool = multiprocessing.Pool(min(n_jobs, len(ranges)))
+        try:
+            chunks = pool.map(
+                _read_event_range,
+                [(infile, start, end, dtype) for start, end in ranges])
+        finally:
+            pool.close()
+            pool.join()
+        if len(chunks) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate(chunks)
+
+    # read text
+    if hasattr(infile, 'read'):
+        text = infile.read()
+    else:
+        with _open_file(infile) as f:
+            text = f.read()
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8')
+
+    # remove comments
+    x = _parse_numeric_text(re.sub(b'#[^\n]*', b'', text), np.dtype(dtype))
+    if x is None:
+        x = np.atleast_1d(np.genfromtxt(
+            fname=io.BytesIO(text), delimiter='\t', dtype=dtype))
+
+    return x
+
+
+def iter_event_chunks(
+        infile, chunk_size=100000, n_otypes=2, event_otypes=None,
+        with_score=True, event_dtype=None, block_size=1 << 22):
+    """
+    Iterate over chunks of events in an event file
+
+    An event file, which has the same format as those read by
+    :func:`load_event` or :func:`load_event_with_score` , is read block by
+    block, and the whole file is never held in memory.  Files compressed by
+    gzip, bz2, or xz are decompressed transparently.  Chunks can be passed
+    to :meth:`kamrecsys.data.EventDataBuilder.extend` .
+
+    Parameters
+    ----------
+    infile : file or str
+        input file.  a file object must be opened in a binary mode.
+    chunk_size : optional, int
+        the number of events in each chunk, except for the last one
+        (default=100000)
+    n_otypes : optional, int
+        see attribute n_otypes (default=2)
+    event_otypes : array_like, shape=(variable,), optional
+        see attribute event_otypes. as default, a type of the i-th element of
+        each event is the i-th object type.
+    with_score : optional, bool
+        if True, the column following events are read as scores
+        (default=True)
+    event_dtype : np.dtype, default=None
+        dtype of extra event features
+    block_size : optional, int
+        the number of bytes read at once (default=4194304)
+
+    Yields
+    ------
+    event : array, shape=(n_chunk_events, s_event), dtype=int
+        events represented by external ids
+    score : array, shape=(n_chunk_events,), dtype=float or None
+        scores of events.  None if `with_score` is False.
+    event_feature : array, shape=(n_chunk_events,), dtype=event_dtype or None
+        features of events.  None if `event_dtype` is None.
+
+    Examples
+    --------
+    >>> builder = EventDataBuilder(score_domain=(1, 5, 1))
+    >>> builder.extend(iter_event_chunks('ml.event.gz'))  # doctest: +SKIP
+    >>> data = builder.build()  # doctest: +SKIP
+    """
+    s_events = n_otypes if event_otypes is None else len(event_otypes)
+    fields = [('event', int, s_events)]
+    if with_score:
+        fields.append(('score', float))
+    if event_dtype is not None:
+        fields.append(('event_feature', event_dtype))
+    dtype = np.dtype(fields)
+
+    def gen_chunk(x):
+        return (x['event'],
+                x['score'] if with_score else None,
+                x['event_feature'] if event_dtype is not None else None)
+
+    f = infile if hasattr(infile, 'read') else _open_file(infile)
+    try:
+        pending, n_pending = [], 0
+        rest = b''
+        eof = False
+        while not eof:
+            # read a block, and parse its complete lines
+            block = f.read(block_size)
+            if block:
+                block = rest + block
+                pos = block.rfind(b'\n') + 1
+                block, rest = block[:pos], block[pos:]
+            else:
+                eof = True
+                block, rest = rest, b''
+            if block:
+                x = read_event_file(io.BytesIO(block), dtype)
+                pending.append(x)
+                n_pending += x.shape[0]
+
+            # yield chunks of full size
+            if n_pending >= chunk_size:
+                x = np.concatenate(pending)
+                n_full = x.shape[0] - x.shape[0] % chunk_size
+                for i in xrange(0, n_full, chunk_size):
+                    yield gen_chunk(x[i:i + chunk_size])
+                pending, n_pending = [x[n_full:]], x.shape[0] - n_full
+
+        # the last chunk
+        if n_pending > 0:
+            yield gen_chunk(np.concatenate(pending))
+    finally:
+        if f is not infile:
+            f.close()
+
+
+def _get_object_index(eid):
+    """
+    Index numbers of objects, which are used for counting events of objects
+
+    Non-negative integer ids within a moderate range are used as index
+    numbers without sorting; otherwise, ids are mapped by
+    :func:`numpy.unique` .
+
+    Parameters
+    ----------
+    eid : array, shape=(n_events,)
+        external ids of objects
+
+    Returns
+    -------
+    index : array, shape=(n_events,), dtype=int
+        index numbers of objects
+    n_objects : int
+        upper bound of index numbers
+    """
+    if eid.dtype.kind in 'iu' and eid.shape[0] > 0:
+        min_id, max_id = eid.min(), eid.max()
+        if min_id >= 0 and max_id < 2 * eid.shape[0] + 65536:
+            return eid, int(max_id) + 1
+    eid, index = np.unique(eid, return_inverse=True)
+
+    return index, eid.shape[0]
+
+
+def _sample_objects(index, n_objects, mask, sample, rng):
+    """
+    Select events whose objects are sampled from objects of remaining events
+
+    Parameters
+    ----------
+    index : array, shape=(n_events,), dtype=int
+        index numbers of objects of events
+    n_objects : int
+        the number of objects
+    mask : array, shape=(n_events,), dtype=bool
+        remaining events
+    sample : int or float
+        the number of sampled objects if int; otherwise, the ratio of
+        sampled objects
+    rng : RandomState
+        random number generator
+
+    Returns
+    -------
+    mask : array, shape=(n_events,), dtype=bool
+        events whose objects are sampled
+    """
+    candidates = np.flatnonzero(np.bincount(index[mask], minlength=n_objects))
+    if isinstance(sample, float):
+        sample = int(round(sample * candidates.shape[0]))
+    sample = min(sample, candidates.shape[0])
+
+    is_sampled = np.zeros(n_objects, dtype=bool)
+    is_sampled[rng.choice(candidates, sample, replace=False)] = True
+
+    return is_sampled[index]
+
+
+def _filter_rows(
+        x, min_user_events=None, min_item_events=None, k_core=None,
+        user_sample=None, item_sample=None, event_filter=None,
+        random_state=None):
+    """
+    Filter parsed events before mapping external ids to internal ids
+
+    Users and items are objects in the first and the second columns of
+    events, respectively.  Filters are applied in the order of `event_filter`,
+    sampling of users and items, the minimum numbers of events, and k-core
+    reduction.  All filters are vectorized over events, and the counts of
+    events are computed by :func:`numpy.bincount` .
+
+    Parameters
+    ----------
+    x : array, dtype=structured
+        parsed events, which has a field ``event`` and optionally fields
+        ``score`` and ``event_feature``
+    min_user_events : optional, int
+        events of users who have fewer events are removed
+    min_item_events : optional, int
+        events of items that have fewer events are removed
+    k_core : optional, int
+        events are removed until all remaining users and items have at least
+        `k_core` events
+    user_sample : optional, int or float
+        the number or the ratio of sampled users.  events of the other users
+        are removed.
+    item_sample : optional, int or float
+        the number or the ratio of sampled items.  events of the other items
+        are removed.
+    event_filter : optional, callable
+        function that takes `x` and returns a boolean array, which is True
+        for events to keep.  for example, events in a range of time are
+        selected by ``lambda x: x['event_feature']['timestamp'] >= t``
+    random_state : RandomState or an int seed, optional
+        random number generator for sampling
+
+    Returns
+    -------
+    x : array, dtype=structured
+        filtered events
+    """
+    if (min_user_events is None and min_item_events is None and
+            k_core is None and user_sample is None and item_sample is None
+            and event_filter is None):
+        return x
+
+    mask = np.ones(x.shape[0], dtype=bool)
+    if event_filter is not None:
+        mask &= np.asarray(event_filter(x), dtype=bool)
+
+    user_index, n_users = _get_object_index(x['event'][:, 0])
+    item_index, n_items = _get_object_index(x['event'][:, 1])
+
+    # sampling
+    if user_sample is not None or item_sample is not None:
+        rng = check_random_state(random_state)
+        if user_sample is not None:
+            mask &= _sample_objects(
+                user_index, n_users, mask, user_sample, rng)
+        if item_sample is not None:
+            mask &= _sample_objects(
+                item_index, n_items, mask, item_sample, rng)
+
+    # minimum numbers of events
+    if min_user_events is not None:
+        n_events = np.bincount(user_index[mask], minlength=n_users)
+        mask &= (n_events >= min_user_events)[user_index]
+    if min_item_events is not None:
+        n_events = np.bincount(item_index[mask], minlength=n_items)
+        mask &= (n_events >= min_item_events)[item_index]
+
+    # k-core
+    if k_core is not None:
+        n_remains = np.count_nonzero(mask)
+        while True:
+            n_user_events = np.bincount(user_index[mask], minlength=n_users)
+            n_item_events = np.bincount(item_index[mask], minlength=n_items)
+            mask &= ((n_user_events >= k_core)[user_index] &
+                     (n_item_events >= k_core)[item_index])
+            n_prev_remains, n_remains = n_remains, np.count_nonzero(mask)
+            if n_remains == n_prev_remains:
+                break
+
+    return x[mask]
+
+
+def _get_filter_params(filters):
+    """
+    Get filter parameters that identify filtered events in a cache key
+
+    Parameters
+    ----------
+    filters : dict
+        keyword arguments of :func:`_filter_rows`
+
+    Returns
+    -------
+    params : dict or None
+        filter parameters.  None if filtered events are not determined by the
+        parameters, i.e., a predicate is specified, or objects are sampled by
+        a random number generator that is not specified by an int seed.
+    """
+    if filters['event_filter'] is not None:
+        return None
+    params = {k: v for k, v in filters.items()
+              if k not in ('event_filter', 'random_state')}
+    if (filters['user_sample'] is not None or
+            filters['item_sample'] is not None):
+        if not isinstance(filters['random_state'], six.integer_types):
+            return None
+        params['random_state'] = filters['random_state']
+
+    return params
+
+
+def _file_digest(file_name):
+    """
+    SHA-1 digest of a file
+
+    Parameters
+    ----------
+    file_name : str
+        path to a file
+
+    Returns
+    -------
+    digest : str
+        hexadecimal digest of contents of the file
+    """
+    h = hashlib.sha1()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+def _get_source_info(file_name):
+    """
+    Information to detect changes of a source file
+
+    Parameters
+    ----------
+    file_name : str
+        path to a source file
+
+    Returns
+    -------
+    info : dict
+        size, modification time and SHA-1 digest of the file
+    """
+    stat = os.stat(file_name)
+
+    return {'size': stat.st_size, 'mtime': stat.st_mtime,
+            'sha1': _file_digest(file_name)}
+
+
+def _is_source_unchanged(file_name, info):
+    """
+    Check whether a source file is unchanged
+
+    A file is unchanged if its size is unchanged and, if its modification
+    time is changed, its contents are unchanged.  In the latter case, the
+    modification time in `info` is updated so that the file is not hashed
+    again.
+
+    Parameters
+    ----------
+    file_name : str
+        path to a source file
+    info : dict
+        information returned by :func:`_get_source_info`
+
+    Returns
+    -------
+    unchanged : bool
+        True if the file is unchanged
+    """
+    stat = os.stat(file_name)
+    if stat.st_size != info['size']:
+        return False
+    if stat.st_mtime == info['mtime']:
+        return True
+    if _file_digest(file_name) != info['sha1']:
+        return False
+    info['mtime'] = stat.st_mtime
+
+    return True
+
+
+def _write_source_info(path, info):
+    """
+    Write information of source files into ``sources.json``
+
+    A file is written into a temporary file, which then replaces the old one,
+    so that concurrent loaders never read incomplete information.
+
+    Parameters
+    ----------
+    path : str
+        directory of cached or converted data
+    info : list or dict
+        information of source files returned by :func:`_get_source_info`
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix='sources.', dir=path)
+    try:
+        with io.open(fd, 'w', encoding='utf-8') as f:
+            f.write(six.text_type(json.dumps(info)))
+        os.rename(tmp_name, os.path.join(path, 'sources.json'))
+    except (IOError, OSError):
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+def _read_cache(
+        name, sources, params, cache_dir=None, readers=(),
+        load_features=True):
+    """
+    Read data cached by :func:`_write_cache`
+
+    A cache is identified by the name of a loader, paths to source files and
+    loader parameters.  It is valid if the sizes of all source files are
+    unchanged and, for files whose modification times are changed, their
+    contents are unchanged.  Arrays of the cached data are memory-mapped in a
+    copy-on-write mode.  If features were deferred when data were cached,
+    they are set by :func:`_set_features` .  If no valid cache exists,
+    information of source files is taken before sources are parsed, so that
+    sources modified while parsing invalidate the cache.
+
+    Parameters
+    ----------
+    name : str
+        name of a loader
+    sources : list of file or str
+        source files of data
+    params : dict
+        loader parameters that affect loaded data
+    cache_dir : optional, str or bool
+        directory of caches.  if None, the environment variable
+        ``KAMRECSYS_CACHE_DIR`` is used.  if False or empty, data are not
+        cached.
+    readers : optional, list of tuple
+        see :func:`_set_features`
+    load_features : optional, bool or 'lazy'
+        see :func:`_set_features`
+
+    Returns
+    -------
+    data : :class:`kamrecsys.data.BaseData` or None
+        cached data.  None if no valid cache exists.
+    cache : tuple or None
+        a pair of a path to a cache directory and information of source
+        files, which are passed to :func:`_write_cache` .  None if data are
+        not cached, e.g., sources are file objects.
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir or not all(
+            isinstance(f, six.string_types) for f in sources):
+        return None, None
+    sources = [os.path.abspath(f) for f in sources]
+
+    h = hashlib.sha1()
+    h.update(repr((name, sources, sorted(params.items()))).encode('utf-8'))
+    cache_path = os.path.join(cache_dir, name + '-' + h.hexdigest()[:16])
+
+    def no_cache():
+        try:
+            info = [_get_source_info(file_name) for file_name in sources]
+        except (IOError, OSError):
+            return None, None
+        return None, (cache_path, info)
+
+    # check sources
+    try:
+        with io.open(os.path.join(cache_path, 'sources.json'),
+                     encoding='utf-8') as f:
+            cached_sources = json.load(f)
+        mtimes = [info['mtime'] for info in cached_sources]
+        if not all(_is_source_unchanged(file_name, info)
+                   for file_name, info in zip(sources, cached_sources)):
+            return no_cache()
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return no_cache()
+
+    try:
+        data = EventData.load(cache_path, mmap_mode='c')
+    except (IOError, OSError, ValueError):
+        return no_cache()
+
+    # record modification times of sources whose contents are unchanged
+    if mtimes != [info['mtime'] for info in cached_sources]:
+        try:
+            _write_source_info(cache_path, cached_sources)
+        except (IOError, OSError):
+            logger.warning("failed to update cache: %s", cache_path)
+
+    if 'feature' not in data.__dict__:
+        data.feature = np.tile(None, data.n_otypes)
+        _set_features(data, readers, load_features)
+    logger.debug("load cached data: %s", cache_path)
+
+    return data, None
+
+
+def _write_cache(data, cache):
+    """
+    Write data to a cache
+
+    Data are saved into a temporary directory, which then replaces the cache
+    directory, so that concurrent loaders never read incomplete caches.
+    Deferred attributes, such as features read lazily, are not computed and
+    not cached.
+
+    Parameters
+    ----------
+    data : :class:`kamrecsys.data.BaseData`
+        data to cache
+    cache : tuple or None
+        a pair of a path to a cache directory and information of source
+        files returned by :func:`_read_cache` .  if None, nothing is done.
+    """
+    if cache is None:
+        return
+    cache_path, info = cache
+
+    cache_dir = os.path.dirname(cache_path)
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    tmp_path = tempfile.mkdtemp(
+        prefix=os.path.basename(cache_path) + '.', dir=cache_dir)
+    try:
+        data.save(tmp_path, materialize=False)
+        _write_source_info(tmp_path, info)
+
+        shutil.rmtree(cache_path, ignore_errors=True)
+        os.rename(tmp_path, cache_path)
+    except (IOError, OSError):
+        logger.warning("failed to write cache: %s", cache_path)
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _load_binary(name, load_features=True):
+    """
+    Load sample data that are converted into a binary format
+
+    Converters in the ``data`` directory of the source distribution save
+    data by :func:`convert_binary` into a directory ``<name>.bin`` in the
+    sample directory, if they are invoked with a ``--binary`` option.  Arrays
+    are memory-mapped in a copy-on-write mode.  Converted data are valid if
+    their source files in the sample directory are unchanged after the
+    conversion, as checked for caches by :func:`_read_cache` .
+
+    Parameters
+    ----------
+    name : str
+        name of data, which is a stem of an event file
+    load_features : bool or 'lazy'
+        if False, features of objects are discarded (default=True)
+
+    Returns
+    -------
+    data : :class:`kamrecsys.data.BaseData` or None
+        loaded data.  None if valid converted data are not found.
+    """
+    path = os.path.join(SAMPLE_PATH, name + BINARY_SUFFIX)
+    if not os.path.exists(os.path.join(path, 'header.json')):
+        return None
+
+    # check sources
+    try:
+        with io.open(os.path.join(path, 'sources.json'),
+                     encoding='utf-8') as f:
+            sources = json.load(f)
+    except (IOError, OSError, ValueError):
+        logger.warning("no source information of converted data: %s", path)
+        return None
+    for base_name, info in sources.items():
+        file_name = os.path.join(SAMPLE_PATH, base_name)
+        if os.path.exists(file_name) and not _is_source_unchanged(
+                file_name, info):
+            logger.warning("converted data are outdated: %s", path)
+            return None
+
+    data = EventData.load(path, mmap_mode='c')
+    if not load_features:
+        data.feature = np.tile(None, data.n_otypes)
+    logger.debug("load converted data: %s", path)
+
+    return data
+
+
+def convert_binary(
+        name, target, score_domain, event_dtype=None, readers=(),
+        sources=(), chunk_size=100000):
+    """
+    Convert an event file into a binary format of sample data
+
+    An event file ``<name>.event`` in the target directory is read chunk by
+    chunk, and the whole text is never held in memory.  Converted data are
+    saved into a directory ``<name>.bin`` in the target directory, together
+    with sizes, modification times and digests of source files.  If the
+    target directory is the sample directory, the converted data are loaded
+    by sample loaders, such as :func:`load_movielens100k` , while the source
+    files are unchanged.  This is called by converters in the ``data``
+    directory of the source distribution.
+
+    Parameters
+    ----------
+    name : str
+        name of data, which is a stem of an event file
+    target : str
+        directory containing a converted event file
+    score_domain : tuple
+        min and max of scores, and the interval between scores
+    event_dtype : np.dtype, default=None
+        dtype of extra event features
+    readers : optional, list of tuple
+        pairs of an object type and a function without arguments that
+        returns external ids and features of objects
+    sources : optional, list of str
+        files in the target directory read by `readers`
+    chunk_size : optional, int
+        the number of events read at once (default=100000)
+
+    Returns
+    -------
+    data : :class:`kamrecsys.data.EventWithScoreData`
+        converted data
+    """
+    event_file = os.path.join(target, name + '.event')
+    builder = EventDataBuilder(
+        n_otypes=2, event_otypes=(0, 1), score_domain=score_domain)
+    builder.extend(iter_event_chunks(
+        event_file, chunk_size=chunk_size, event_dtype=event_dtype))
+    data = builder.build()
+    _set_features(data, readers)
+
+    path = os.path.join(target, name + BINARY_SUFFIX)
+    shutil.rmtree(path, ignore_errors=True)
+    data.save(path)
+    info = {os.path.basename(file_name): _get_source_info(file_name)
+            for file_name in [event_file] + list(sources)}
+    _write_source_info(path, info)
+
+    return data
+
+
+def _set_features(data, readers, load_features=True):
+    """
+    Set features of objects read from feature files
+
+    Parameters
+    ----------
+    data : :class:`kamrecsys.data.BaseData`
+        data whose features are set
+    readers : list of tuple
+        pairs of an object type and a function without arguments that
+        returns external ids and features of objects
+    load_features : bool or 'lazy'
+        if True, features are read immediately.  if 'lazy', features are
+        read when ``data.feature`` is accessed for the first time.  if False,
+        features are not read.
+    """
+    def read_features():
+        for otype, reader in readers:
+            data.set_feature(otype, *reader())
+
+    if load_features == 'lazy':
+        def gen_feature():
+            data.__dict__['feature'] = np.tile(None, data.n_otypes)
+            read_features()
+            return data.__dict__['feature']
+
+        data._defer('feature', gen_feature)
+    elif load_features:
+        read_features()
+
+
+def _read_loaded_data(
+        name, sources, params, cache_dir=None, readers=(),
+        load_features=True, binary=False, min_user_events=None,
+        min_item_events=None, k_core=None, user_sample=None,
+        item_sample=None, event_filter=None, random_state=None):
+    """
+    Read data from converted sample data or a cache before parsing sources
+
+    Filter parameters are added to a cache key, and data are not cached if
+    filtered events are not determined by the parameters.  See
+    :func:`_get_filter_params` .
+
+    Parameters
+    ----------
+    name : str
+        name of a loader, which is also a stem of converted sample data
+    sources : list of file or str
+        source files of data
+    params : dict
+        loader parameters that affect loaded data, except for filters
+    cache_dir : optional, str or bool
+        see :func:`_read_cache`
+    readers : optional, list of tuple
+        see :func:`_set_features`
+    load_features : optional, bool or 'lazy'
+        see :func:`_set_features`
+    binary : optional, bool
+        if True, loader parameters are defaults, and data converted by
+        :func:`convert_binary` are loaded unless events are filtered
+    min_user_events, min_item_events, k_core, user_sample, item_sample,
+    event_filter, random_state : optional
+        filters of events.  see :func:`_filter_rows`
+
+    Returns
+    -------
+    data : :class:`kamrecsys.data.BaseData` or None
+        loaded data.  None if data have to be parsed from sources.
+    cache : tuple or None
+        see :func:`_read_cache`
+    filters : dict
+        keyword arguments of :func:`_filter_rows`
+    """
+    filters = {
+        'min_user_events': min_user_events, 'min_item_events': min_item_events,
+        'k_core': k_core, 'user_sample': user_sample,
+        'item_sample': item_sample, 'event_filter': event_filter,
+        'random_state': random_state}
+
+    # load data converted into a binary format
+    if binary and all(v is None for k, v in filters.items()
+                      if k != 'random_state'):
+        data = _load_binary(name, load_features)
+        if data is not None:
+            return data, None, filters
+
+    # read a cache
+    filter_params = _get_filter_params(filters)
+    if filter_params is None:
+        cache_dir = False
+    params = dict(params, **(filter_params or {}))
+    if readers:
+        params['load_features'] = bool(load_features)
+    data, cache = _read_cache(
+        name, sources, params, cache_dir, readers, load_features)
+
+    return data, cache, filters
+
+
+def load_event(
+        infile, n_otypes=2, event_otypes=None, event_dtype=None,
+        index_dtype=None, cache_dir=None, n_jobs=None,
+        min_user_events=None, min_item_events=None, k_core=None,
+        user_sample=None, item_sample=None, event_filter=None,
+        random_state=None):
     """
     load event file
 
@@ -74,6 +1069,41 @@ def load_event(infile, n_otypes=2, event_otypes=None, event_dtype=None):
         each event is the i-th object type.
     event_dtype : np.dtype, default=None
         dtype of extra event features
+    index_dtype : np.dtype, default=None
+        dtype of an event array.  see
+        :meth:`kamrecsys.data.EventData.set_event`
+    cache_dir : optional, str or bool
+        directory in which loaded data are cached.  if None, the environment
+        variable ``KAMRECSYS_CACHE_DIR`` is used if it is set.  if False,
+        data are not cached.  caches are invalidated if input files are
+        modified.
+    n_jobs : optional, int
+        the number of processes to parse an input file.  see
+        :func:`read_event_file`
+    min_user_events : optional, int
+        events of users who have fewer events are removed.  users and items
+        are objects in the first and the second columns of events,
+        respectively.
+    min_item_events : optional, int
+        events of items that have fewer events are removed
+    k_core : optional, int
+        events are iteratively removed until all remaining users and items
+        have at least `k_core` events
+    user_sample : optional, int or float
+        the number of users if int, or the ratio of users if float.  users
+        are sampled from those of remaining events, and events of the other
+        users are removed.
+    item_sample : optional, int or float
+        the number or the ratio of sampled items
+    event_filter : optional, callable
+        predicate that takes a structured array of parsed events, whose
+        fields are ``event`` , ``score`` , and ``event_feature`` , and
+        returns a boolean array that is True for events to keep.  for
+        example, ``lambda x: x['event_feature']['timestamp'] < t`` .
+        data are not cached if this is specified.
+    random_state : RandomState or an int seed, optional
+        random number generator for sampling.  data are cached only if
+        this is an int seed.
 
     Returns
     -------
@@ -81,7 +1111,23 @@ def load_event(infile, n_otypes=2, event_otypes=None, event_dtype=None):
         event data with score information
 
         event_dtype : np.dtype, default=None
+
+    Notes
+    -----
+    Events are filtered in the order of `event_filter` , sampling of users
+    and items, `min_user_events` and `min_item_events` , and `k_core` .  The
+    filters are applied to parsed events before building internal ids, and
+    the counts of events are computed by :func:`numpy.bincount` .
     """
+    params = {'n_otypes': n_otypes, 'event_otypes': event_otypes,
+              'event_dtype': event_dtype, 'index_dtype': index_dtype}
+    data, cache, filters = _read_loaded_data(
+        'event', [infile], params, cache_dir,
+        min_user_events=min_user_events, min_item_events=min_item_events,
+        k_core=k_core, user_sample=user_sample, item_sample=item_sample,
+        event_filter=event_filter, random_state=random_state)
+    if data is not None:
+        return data
 
     s_events = n_otypes if event_otypes is None else len(event_otypes)
     if event_dtype is None:
@@ -89,21 +1135,27 @@ def load_event(infile, n_otypes=2, event_otypes=None, event_dtype=None):
     else:
         dtype = np.dtype([('event', int, s_events),
                           ('event_feature', event_dtype)])
-    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype)
+    x = read_event_file(infile, dtype, n_jobs=n_jobs)
+    x = _filter_rows(x, **filters)
 
     data = EventData(n_otypes=n_otypes, event_otypes=event_otypes)
     if event_dtype is None:
         event_feature = None
     else:
         event_feature = x['event_feature']
-    data.set_event(x['event'], event_feature=event_feature)
+    data.set_event(
+        x['event'], event_feature=event_feature, index_dtype=index_dtype)
+    _write_cache(data, cache)
 
     return data
 
 
 def load_event_with_score(
         infile, n_otypes=2, event_otypes=None, score_domain=(1, 5, 1),
-        event_dtype=None):
+        event_dtype=None, index_dtype=None, score_dtype=None, cache_dir=None,
+        n_jobs=None, min_user_events=None, min_item_events=None, k_core=None,
+        user_sample=None, item_sample=None, event_filter=None,
+        random_state=None):
     """
     load event file with rating score
 
@@ -126,6 +1178,26 @@ def load_event_with_score(
         min and max of scores, and the interval between scores
     event_dtype : np.dtype, default=None
         dtype of extra event features
+    index_dtype : np.dtype, default=None
+        dtype of an event array.  see
+        :meth:`kamrecsys.data.EventData.set_event`
+    score_dtype : np.dtype, default=None
+        dtype of scores.  as default, float64 is used.
+    cache_dir : optional, str or bool
+        directory in which loaded data are cached.  see :func:`load_event`
+    n_jobs : optional, int
+        the number of processes to parse an input file.  see
+        :func:`read_event_file`
+    min_user_events, min_item_events, k_core : optional, int
+        the minimum numbers of events of users and items.  see
+        :func:`load_event`
+    user_sample, item_sample : optional, int or float
+        the numbers or the ratios of sampled users and items.  see
+        :func:`load_event`
+    event_filter : optional, callable
+        predicate to select events.  see :func:`load_event`
+    random_state : RandomState or an int seed, optional
+        random number generator for sampling
 
     Returns
     -------
@@ -134,6 +1206,16 @@ def load_event_with_score(
     
         event_dtype : np.dtype, default=None
     """
+    params = {'n_otypes': n_otypes, 'event_otypes': event_otypes,
+              'score_domain': score_domain, 'event_dtype': event_dtype,
+              'index_dtype': index_dtype, 'score_dtype': score_dtype}
+    data, cache, filters = _read_loaded_data(
+        'event_with_score', [infile], params, cache_dir,
+        min_user_events=min_user_events, min_item_events=min_item_events,
+        k_core=k_core, user_sample=user_sample, item_sample=item_sample,
+        event_filter=event_filter, random_state=random_state)
+    if data is not None:
+        return data
 
     s_events = n_otypes if event_otypes is None else len(event_otypes)
     if event_dtype is None:
@@ -141,7 +1223,8 @@ def load_event_with_score(
     else:
         dtype = np.dtype([('event', int, s_events), ('score', float),
                           ('event_feature', event_dtype)])
-    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype)
+    x = read_event_file(infile, dtype, n_jobs=n_jobs)
+    x = _filter_rows(x, **filters)
 
     data = EventWithScoreData(n_otypes=n_otypes, event_otypes=event_otypes)
     if event_dtype is None:
@@ -150,7 +1233,9 @@ def load_event_with_score(
         event_feature = x['event_feature']
     data.set_event(
         x['event'], x['score'], score_domain=score_domain,
-        event_feature=event_feature)
+        event_feature=event_feature, index_dtype=index_dtype,
+        score_dtype=score_dtype)
+    _write_cache(data, cache)
 
     return data
 
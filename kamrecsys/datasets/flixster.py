@@ -22,6 +22,7 @@ import numpy as np
 
 from ..data import EventWithScoreData
 from . import SAMPLE_PATH, load_event_with_score
+from .base import _read_loaded_data, _write_cache
 
 # =============================================================================
 # Public symbols
@@ -46,7 +47,11 @@ __all__ = []
 # =============================================================================
 
 
-def load_flixster_rating(infile=None, event_dtype=None):
+def load_flixster_rating(
+        infile=None, event_dtype=None, index_dtype=None, score_dtype=None,
+        cache_dir=None, n_jobs=None, min_user_events=None,
+        min_item_events=None, k_core=None, user_sample=None, item_sample=None,
+        event_filter=None, random_state=None):
     """ load the sushi3b score data set
 
     An original data set is distributed at:
@@ -58,6 +63,28 @@ def load_flixster_rating(infile=None, event_dtype=None):
         input file if specified; otherwise, read from default sample directory.
     event_dtype : np.dtype, default=None
         dtype of extra event features
+    index_dtype : np.dtype, default=None
+        dtype of an event array.  see
+        :meth:`kamrecsys.data.EventData.set_event`
+    score_dtype : np.dtype, default=None
+        dtype of scores.  as default, float64 is used.
+    cache_dir : optional, str or bool
+        directory in which loaded data are cached.  see
+        :func:`kamrecsys.datasets.load_event`
+    n_jobs : optional, int
+        the number of processes to parse an input file.  see
+        :func:`kamrecsys.datasets.read_event_file`
+    min_user_events, min_item_events, k_core : optional, int
+        the minimum numbers of events of users and items.  see
+        :func:`kamrecsys.datasets.load_event`
+    user_sample, item_sample : optional, int or float
+        the numbers or the ratios of sampled users and items.  see
+        :func:`kamrecsys.datasets.load_event`
+    event_filter : optional, callable
+        predicate to select events.  see
+        :func:`kamrecsys.datasets.load_event`
+    random_state : RandomState or an int seed, optional
+        random number generator for sampling
 
     Returns
     -------
@@ -81,11 +108,25 @@ def load_flixster_rating(infile=None, event_dtype=None):
     """
 
     # load event file
+    binary = (infile is None and event_dtype is None and
+              index_dtype is None and score_dtype is None)
     if infile is None:
         infile = os.path.join(SAMPLE_PATH, 'flixster.event')
+    params = {'event_dtype': event_dtype, 'index_dtype': index_dtype,
+              'score_dtype': score_dtype}
+    data, cache, filters = _read_loaded_data(
+        'flixster', [infile], params, cache_dir, binary=binary,
+        min_user_events=min_user_events, min_item_events=min_item_events,
+        k_core=k_core, user_sample=user_sample, item_sample=item_sample,
+        event_filter=event_filter, random_state=random_state)
+    if data is not None:
+        return data
     data = load_event_with_score(
         infile, n_otypes=2, event_otypes=(0, 1),
-        score_domain=(0.5, 5.0, 0.5), event_dtype=event_dtype)
+        score_domain=(0.5, 5.0, 0.5), event_dtype=event_dtype,
+        index_dtype=index_dtype, score_dtype=score_dtype,
+        cache_dir=False, n_jobs=n_jobs, **filters)
+    _write_cache(data, cache)
 
     return data
 
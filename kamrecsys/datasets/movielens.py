@@ -22,6 +22,7 @@ import numpy as np
 
 from ..data import EventWithScoreData
 from . import SAMPLE_PATH, load_event_with_score, event_dtype_timestamp
+from .base import _read_loaded_data, _set_features, _write_cache
 
 # =============================================================================
 # Public symbols
@@ -79,7 +80,118 @@ MOVIELENS1M_INFO = {
 # =============================================================================
 
 
-def load_movielens100k(infile=None, event_dtype=event_dtype_timestamp):
+def _read_movielens100k_user(infile=None):
+    """ read user's features of the movielens100k data set
+
+    Parameters
+    ----------
+    infile : optional, file or str
+        input file if specified; otherwise, read from default sample directory.
+
+    Returns
+    -------
+    eid : array, shape=(n_objects,), dtype=int
+        external ids of objects
+    feature : array, shape=(n_objects,), dtype=structured
+        features of objects
+    """
+    if infile is None:
+        infile = os.path.join(SAMPLE_PATH, 'movielens100k.user')
+    fdtype = np.dtype([('age', int), ('gender', int),
+                       ('occupation', int), ('zip', 'U5')])
+    dtype = np.dtype([('eid', int), ('feature', fdtype)])
+    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype)
+
+    return x['eid'], x['feature']
+
+
+def _read_movielens100k_item(infile=None):
+    """ read item's features of the movielens100k data set
+
+    Parameters
+    ----------
+    infile : optional, file or str
+        input file if specified; otherwise, read from default sample directory.
+
+    Returns
+    -------
+    eid : array, shape=(n_objects,), dtype=int
+        external ids of objects
+    feature : array, shape=(n_objects,), dtype=structured
+        features of objects
+    """
+    if infile is None:
+        infile = os.path.join(SAMPLE_PATH, 'movielens100k.item')
+    fdtype = np.dtype([('name', 'U81'),
+                       ('day', int),
+                       ('month', int),
+                       ('year', int),
+                       ('genre', 'i1', 18),
+                       ('imdb', 'U134')])
+    dtype = np.dtype([('eid', int), ('feature', fdtype)])
+    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype,
+                      converters={1: np.char.decode})
+
+    return x['eid'], x['feature']
+
+
+def _read_movielens1m_user(infile=None):
+    """ read user's features of the movielens1m data set
+
+    Parameters
+    ----------
+    infile : optional, file or str
+        input file if specified; otherwise, read from default sample directory.
+
+    Returns
+    -------
+    eid : array, shape=(n_objects,), dtype=int
+        external ids of objects
+    feature : array, shape=(n_objects,), dtype=structured
+        features of objects
+    """
+    if infile is None:
+        infile = os.path.join(SAMPLE_PATH, 'movielens1m.user')
+    fdtype = np.dtype([('gender', int), ('age', int),
+                       ('occupation', int), ('zip', 'U5')])
+    dtype = np.dtype([('eid', int), ('feature', fdtype)])
+    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype)
+
+    return x['eid'], x['feature']
+
+
+def _read_movielens1m_item(infile=None):
+    """ read item's features of the movielens1m data set
+
+    Parameters
+    ----------
+    infile : optional, file or str
+        input file if specified; otherwise, read from default sample directory.
+
+    Returns
+    -------
+    eid : array, shape=(n_objects,), dtype=int
+        external ids of objects
+    feature : array, shape=(n_objects,), dtype=structured
+        features of objects
+    """
+    if infile is None:
+        infile = os.path.join(SAMPLE_PATH, 'movielens1m.item')
+    fdtype = np.dtype([('name', 'U82'),
+                       ('year', int),
+                       ('genre', 'i1', 18)])
+    dtype = np.dtype([('eid', int), ('feature', fdtype)])
+    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype,
+                      converters={1: np.char.decode})
+
+    return x['eid'], x['feature']
+
+
+def load_movielens100k(
+        infile=None, event_dtype=event_dtype_timestamp, index_dtype=None,
+        score_dtype=None, cache_dir=None, min_user_events=None,
+        min_item_events=None, k_core=None, user_sample=None, item_sample=None,
+        event_filter=None, random_state=None, load_features=True):
     """ load the MovieLens 100k data set
 
     Original file ``ml-100k.zip`` is distributed by the Grouplens Research
@@ -93,6 +205,29 @@ def load_movielens100k(infile=None, event_dtype=event_dtype_timestamp):
     event_dtype : np.dtype
         dtype of extra event features. as default, it consists of only a
         ``timestamp`` feature.
+    index_dtype : np.dtype, default=None
+        dtype of an event array.  see
+        :meth:`kamrecsys.data.EventData.set_event`
+    score_dtype : np.dtype, default=None
+        dtype of scores.  as default, float64 is used.
+    cache_dir : optional, str or bool
+        directory in which loaded data are cached.  see
+        :func:`kamrecsys.datasets.load_event`
+    min_user_events, min_item_events, k_core : optional, int
+        the minimum numbers of events of users and items.  see
+        :func:`kamrecsys.datasets.load_event`
+    user_sample, item_sample : optional, int or float
+        the numbers or the ratios of sampled users and items.  see
+        :func:`kamrecsys.datasets.load_event`
+    event_filter : optional, callable
+        predicate to select events.  see
+        :func:`kamrecsys.datasets.load_event`
+    random_state : RandomState or an int seed, optional
+        random number generator for sampling
+    load_features : optional, bool or 'lazy'
+        if True, features of users and items are loaded.  if 'lazy', they
+        are loaded when `data.feature` is accessed for the first time.  if
+        False, they are not loaded.  (default=True)
 
     Returns
     -------
@@ -152,32 +287,34 @@ def load_movielens100k(infile=None, event_dtype=event_dtype_timestamp):
     """
 
     # load event file
+    binary = (infile is None and event_dtype == event_dtype_timestamp and
+              index_dtype is None and score_dtype is None)
     if infile is None:
         infile = os.path.join(SAMPLE_PATH, 'movielens100k.event')
+    sources = [infile]
+    if load_features:
+        sources += [os.path.join(SAMPLE_PATH, 'movielens100k.user'),
+                    os.path.join(SAMPLE_PATH, 'movielens100k.item')]
+    params = {'event_dtype': event_dtype, 'index_dtype': index_dtype,
+              'score_dtype': score_dtype}
+    readers = [(0, _read_movielens100k_user), (1, _read_movielens100k_item)]
+    data, cache, filters = _read_loaded_data(
+        'movielens100k', sources, params, cache_dir, readers, load_features,
+        binary, min_user_events=min_user_events,
+        min_item_events=min_item_events, k_core=k_core,
+        user_sample=user_sample, item_sample=item_sample,
+        event_filter=event_filter, random_state=random_state)
+    if data is not None:
+        return data
     data = load_event_with_score(
         infile, n_otypes=2, event_otypes=(0, 1),
-        score_domain=(1., 5., 1.), event_dtype=event_dtype)
+        score_domain=(1., 5., 1.), event_dtype=event_dtype,
+        index_dtype=index_dtype, score_dtype=score_dtype,
+        cache_dir=False, **filters)
 
-    # load user's feature file
-    infile = os.path.join(SAMPLE_PATH, 'movielens100k.user')
-    fdtype = np.dtype([('age', int), ('gender', int),
-                       ('occupation', int), ('zip', 'U5')])
-    dtype = np.dtype([('eid', int), ('feature', fdtype)])
-    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype)
-    data.set_feature(0, x['eid'], x['feature'])
-
-    # load item's feature file
-    infile = os.path.join(SAMPLE_PATH, 'movielens100k.item')
-    fdtype = np.dtype([('name', 'U81'),
-                       ('day', int),
-                       ('month', int),
-                       ('year', int),
-                       ('genre', 'i1', 18),
-                       ('imdb', 'U134')])
-    dtype = np.dtype([('eid', int), ('feature', fdtype)])
-    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype,
-                      converters={1: np.char.decode})
-    data.set_feature(1, x['eid'], x['feature'])
+    # load feature files
+    _set_features(data, readers, load_features)
+    _write_cache(data, cache)
 
     return data
 
@@ -206,7 +343,11 @@ def load_movielens_mini():
     return load_movielens100k(infile=infile)
 
 
-def load_movielens1m(infile=None, event_dtype=event_dtype_timestamp):
+def load_movielens1m(
+        infile=None, event_dtype=event_dtype_timestamp, index_dtype=None,
+        score_dtype=None, cache_dir=None, min_user_events=None,
+        min_item_events=None, k_core=None, user_sample=None, item_sample=None,
+        event_filter=None, random_state=None, load_features=True):
     """ load the MovieLens 1m data set
 
     Original file ``ml-1m.zip`` is distributed by the Grouplens Research
@@ -220,6 +361,29 @@ def load_movielens1m(infile=None, event_dtype=event_dtype_timestamp):
     event_dtype : np.dtype
         dtype of extra event features. as default, it consists of only a
         ``timestamp`` feature.
+    index_dtype : np.dtype, default=None
+        dtype of an event array.  see
+        :meth:`kamrecsys.data.EventData.set_event`
+    score_dtype : np.dtype, default=None
+        dtype of scores.  as default, float64 is used.
+    cache_dir : optional, str or bool
+        directory in which loaded data are cached.  see
+        :func:`kamrecsys.datasets.load_event`
+    min_user_events, min_item_events, k_core : optional, int
+        the minimum numbers of events of users and items.  see
+        :func:`kamrecsys.datasets.load_event`
+    user_sample, item_sample : optional, int or float
+        the numbers or the ratios of sampled users and items.  see
+        :func:`kamrecsys.datasets.load_event`
+    event_filter : optional, callable
+        predicate to select events.  see
+        :func:`kamrecsys.datasets.load_event`
+    random_state : RandomState or an int seed, optional
+        random number generator for sampling
+    load_features : optional, bool or 'lazy'
+        if True, features of users and items are loaded.  if 'lazy', they
+        are loaded when `data.feature` is accessed for the first time.  if
+        False, they are not loaded.  (default=True)
 
     Returns
     -------
@@ -282,29 +446,34 @@ def load_movielens1m(infile=None, event_dtype=event_dtype_timestamp):
     """
 
     # load event file
+    binary = (infile is None and event_dtype == event_dtype_timestamp and
+              index_dtype is None and score_dtype is None)
     if infile is None:
         infile = os.path.join(SAMPLE_PATH, 'movielens1m.event')
+    sources = [infile]
+    if load_features:
+        sources += [os.path.join(SAMPLE_PATH, 'movielens1m.user'),
+                    os.path.join(SAMPLE_PATH, 'movielens1m.item')]
+    params = {'event_dtype': event_dtype, 'index_dtype': index_dtype,
+              'score_dtype': score_dtype}
+    readers = [(0, _read_movielens1m_user), (1, _read_movielens1m_item)]
+    data, cache, filters = _read_loaded_data(
+        'movielens1m', sources, params, cache_dir, readers, load_features,
+        binary, min_user_events=min_user_events,
+        min_item_events=min_item_events, k_core=k_core,
+        user_sample=user_sample, item_sample=item_sample,
+        event_filter=event_filter, random_state=random_state)
+    if data is not None:
+        return data
     data = load_event_with_score(
         infile, n_otypes=2, event_otypes=(0, 1),
-        score_domain=(1., 5., 1.), event_dtype=event_dtype)
-
-    # load user's feature file
-    infile = os.path.join(SAMPLE_PATH, 'movielens1m.user')
-    fdtype = np.dtype([('gender', int), ('age', int),
-                       ('occupation', int), ('zip', 'U5')])
-    dtype = np.dtype([('eid', int), ('feature', fdtype)])
-    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype)
-    data.set_feature(0, x['eid'], x['feature'])
+        score_domain=(1., 5., 1.), event_dtype=event_dtype,
+        index_dtype=index_dtype, score_dtype=score_dtype,
+        cache_dir=False, **filters)
 
-    # load item's feature file
-    infile = os.path.join(SAMPLE_PATH, 'movielens1m.item')
-    fdtype = np.dtype([('name', 'U82'),
-                       ('year', int),
-                       ('genre', 'i1', 18)])
-    dtype = np.dtype([('eid', int), ('feature', fdtype)])
-    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype,
-                      converters={1: np.char.decode})
-    data.set_feature(1, x['eid'], x['feature'])
+    # load feature files
+    _set_features(data, readers, load_features)
+    _write_cache(data, cache)
 
     return data
 
@@ -22,6 +22,7 @@ import numpy as np
 
 from ..data import EventWithScoreData
 from . import SAMPLE_PATH, load_event_with_score
+from .base import _read_loaded_data, _set_features, _write_cache
 
 # =============================================================================
 # Public symbols
@@ -86,7 +87,79 @@ SUSHI3_INFO = {
 # =============================================================================
 
 
-def load_sushi3b_score(infile=None, event_dtype=None):
+def _read_sushi3_user(infile=None):
+    """ read user's features of the sushi3 data set
+
+    Parameters
+    ----------
+    infile : optional, file or str
+        input file if specified; otherwise, read from default sample directory.
+
+    Returns
+    -------
+    eid : array, shape=(n_objects,), dtype=int
+        external ids of objects
+    feature : array, shape=(n_objects,), dtype=structured
+        features of objects
+    """
+    if infile is None:
+        infile = os.path.join(SAMPLE_PATH, 'sushi3.user')
+    fdtype = np.dtype([
+        ('original_uid', int),
+        ('gender', int),
+        ('age', int),
+        ('answer_time', int),
+        ('child_prefecture', int),
+        ('child_region', int),
+        ('child_ew', int),
+        ('current_prefecture', int),
+        ('current_region', int),
+        ('current_ew', int),
+        ('moved', int)])
+    dtype = np.dtype([('eid', int), ('feature', fdtype)])
+    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype)
+
+    return x['eid'], x['feature']
+
+
+def _read_sushi3_item(infile=None):
+    """ read item's features of the sushi3 data set
+
+    Parameters
+    ----------
+    infile : optional, file or str
+        input file if specified; otherwise, read from default sample directory.
+
+    Returns
+    -------
+    eid : array, shape=(n_objects,), dtype=int
+        external ids of objects
+    feature : array, shape=(n_objects,), dtype=structured
+        features of objects
+    """
+    if infile is None:
+        infile = os.path.join(SAMPLE_PATH, 'sushi3.item')
+    fdtype = np.dtype([
+        ('name', 'U20'),
+        ('maki', int),
+        ('seafood', int),
+        ('genre', int),
+        ('heaviness', float),
+        ('frequency', float),
+        ('price', float),
+        ('supply', float)])
+    dtype = np.dtype([('eid', int), ('feature', fdtype)])
+    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype,
+                      converters={1: np.char.decode})
+
+    return x['eid'], x['feature']
+
+
+def load_sushi3b_score(infile=None, event_dtype=None,
+                       index_dtype=None, score_dtype=None, cache_dir=None,
+                       min_user_events=None, min_item_events=None, k_core=None,
+                       user_sample=None, item_sample=None, event_filter=None,
+                       random_state=None, load_features=True):
     """ load the sushi3b score data set
 
     An original data set is distributed at:
@@ -98,6 +171,29 @@ def load_sushi3b_score(infile=None, event_dtype=None):
         input file if specified; otherwise, read from default sample directory.
     event_dtype : np.dtype, default=None
         dtype of extra event features
+    index_dtype : np.dtype, default=None
+        dtype of an event array.  see
+        :meth:`kamrecsys.data.EventData.set_event`
+    score_dtype : np.dtype, default=None
+        dtype of scores.  as default, float64 is used.
+    cache_dir : optional, str or bool
+        directory in which loaded data are cached.  see
+        :func:`kamrecsys.datasets.load_event`
+    min_user_events, min_item_events, k_core : optional, int
+        the minimum numbers of events of users and items.  see
+        :func:`kamrecsys.datasets.load_event`
+    user_sample, item_sample : optional, int or float
+        the numbers or the ratios of sampled users and items.  see
+        :func:`kamrecsys.datasets.load_event`
+    event_filter : optional, callable
+        predicate to select events.  see
+        :func:`kamrecsys.datasets.load_event`
+    random_state : RandomState or an int seed, optional
+        random number generator for sampling
+    load_features : optional, bool or 'lazy'
+        if True, features of users and items are loaded.  if 'lazy', they
+        are loaded when `data.feature` is accessed for the first time.  if
+        False, they are not loaded.  (default=True)
 
     Returns
     -------
@@ -168,45 +264,34 @@ def load_sushi3b_score(infile=None, event_dtype=None):
     """
 
     # load event file
+    binary = (infile is None and event_dtype is None and
+              index_dtype is None and score_dtype is None)
     if infile is None:
         infile = os.path.join(SAMPLE_PATH, 'sushi3b_score.event')
+    sources = [infile]
+    if load_features:
+        sources += [os.path.join(SAMPLE_PATH, 'sushi3.user'),
+                    os.path.join(SAMPLE_PATH, 'sushi3.item')]
+    params = {'event_dtype': event_dtype, 'index_dtype': index_dtype,
+              'score_dtype': score_dtype}
+    readers = [(0, _read_sushi3_user), (1, _read_sushi3_item)]
+    data, cache, filters = _read_loaded_data(
+        'sushi3b_score', sources, params, cache_dir, readers, load_features,
+        binary, min_user_events=min_user_events,
+        min_item_events=min_item_events, k_core=k_core,
+        user_sample=user_sample, item_sample=item_sample,
+        event_filter=event_filter, random_state=random_state)
+    if data is not None:
+        return data
     data = load_event_with_score(
         infile, n_otypes=2, event_otypes=(0, 1),
-        score_domain=(0., 4., 1.), event_dtype=event_dtype)
+        score_domain=(0., 4., 1.), event_dtype=event_dtype,
+        index_dtype=index_dtype, score_dtype=score_dtype,
+        cache_dir=False, **filters)
 
-    # load user's feature file
-    infile = os.path.join(SAMPLE_PATH, 'sushi3.user')
-    fdtype = np.dtype([
-        ('original_uid', int),
-        ('gender', int),
-        ('age', int),
-        ('answer_time', int),
-        ('child_prefecture', int),
-        ('child_region', int),
-        ('child_ew', int),
-        ('current_prefecture', int),
-        ('current_region', int),
-        ('current_ew', int),
-        ('moved', int)])
-    dtype = np.dtype([('eid', int), ('feature', fdtype)])
-    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype)
-    data.set_feature(0, x['eid'], x['feature'])
-
-    # load item's feature file
-    infile = os.path.join(SAMPLE_PATH, 'sushi3.item')
-    fdtype = np.dtype([
-        ('name', 'U20'),
-        ('maki', int),
-        ('seafood', int),
-        ('genre', int),
-        ('heaviness', float),
-        ('frequency', float),
-        ('price', float),
-        ('supply', float)])
-    dtype = np.dtype([('eid', int), ('feature', fdtype)])
-    x = np.genfromtxt(fname=infile, delimiter='\t', dtype=dtype,
-                      converters={1: np.char.decode})
-    data.set_feature(1, x['eid'], x['feature'])
+    # load feature files
+    _set_features(data, readers, load_features)
+    _write_cache(data, cache)
 
     return data
 
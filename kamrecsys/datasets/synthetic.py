@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Generate synthetic data sets
+"""
+
+from __future__ import (
+    print_function,
+    division,
+    absolute_import)
+from six.moves import xrange
+
+# =============================================================================
+# Imports
+# =============================================================================
+
+import sys
+import logging
+import numpy as np
+from sklearn.utils import check_random_state
+
+from ..data import EventData, EventWithScoreData
+from ..utils import safe_sigmoid
+
+# =============================================================================
+# Public symbols
+# =============================================================================
+
+__all__ = []
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+# the number of events whose latent scores are computed at once
+CHUNK_SIZE = 1 << 20
+
+# =============================================================================
+# Module variables
+# =============================================================================
+
+# =============================================================================
+# Classes
+# =============================================================================
+
+# =============================================================================
+# Functions
+# =============================================================================
+
+
+def _draw_objects(n_objects, n_draws, distribution, exponent, rng):
+    """
+    Draw objects from a popularity distribution
+
+    A power-law distribution is sampled by the inverse transform of its
+    continuous approximation, which is much faster than sampling from a
+    discrete distribution by :meth:`numpy.random.RandomState.choice` .
+
+    Parameters
+    ----------
+    n_objects : int
+        the number of objects
+    n_draws : int
+        the number of draws
+    distribution : {'powerlaw', 'uniform'}
+        distribution of popularity
+    exponent : float
+        exponent of a power-law distribution
+    rng : RandomState
+        random number generator
+
+    Returns
+    -------
+    obj : array, shape=(n_draws,), dtype=int
+        drawn objects
+    """
+    if distribution == 'uniform':
+        return rng.randint(0, n_objects, n_draws)
+    elif distribution != 'powerlaw':
+        raise ValueError("Invalid distribution: {0!s}".format(distribution))
+
+    # density proportional to x ** -exponent in [1, n_objects + 1)
+    u = rng.uniform(size=n_draws)
+    if np.isclose(exponent, 1.0):
+        x = np.exp(u * np.log(n_objects + 1.0))
+    else:
+        a = 1.0 - exponent
+        x = (1.0 + u * ((n_objects + 1.0) ** a - 1.0)) ** (1.0 / a)
+    obj = x.astype(np.int64) - 1
+
+    return np.clip(obj, 0, n_objects - 1, out=obj)
+
+
+def _latent_score(user_factor, item_factor, user, item):
+    """
+    Inner products of latent factors of users and items of events
+
+    Parameters
+    ----------
+    user_factor : array, shape=(n_users, k)
+        latent factors of users
+    item_factor : array, shape=(n_items, k)
+        latent factors of items
+    user : array, shape=(n_events,), dtype=int
+        users of events
+    item : array, shape=(n_events,), dtype=int
+        items of events
+
+    Returns
+    -------
+    r : array, shape=(n_events,), dtype=float
+        latent scores
+    """
+    r = np.empty(user.shape[0], dtype=float)
+    for i in xrange(0, user.shape[0], CHUNK_SIZE):
+        s = slice(i, i + CHUNK_SIZE)
+        r[s] = np.einsum(
+            'ij,ij->i', user_factor[user[s]], item_factor[item[s]])
+
+    return r
+
+
+def make_synthetic_events(
+        n_users=1000, n_items=1000, n_events=10000, score_domain=(1, 5, 1),
+        distribution='powerlaw', k=2, exponent=1.0, noise=0.5,
+        score_type='rating', random_state=None, index_dtype=None,
+        score_dtype=None):
+    """
+    Generate synthetic events whose scores have low-rank structure
+
+    Users and items of events are independently drawn from their popularity
+    distributions, and each pair of a user and an item appears at most once.
+    Latent factors of users and items are drawn from a normal distribution,
+    and a latent score of an event is an inner product of the factors of its
+    user and item plus Gaussian noise, whose variance is ``1 + noise ** 2`` .
+
+    Parameters
+    ----------
+    n_users : optional, int
+        the number of users (default=1000)
+    n_items : optional, int
+        the number of items (default=1000)
+    n_events : optional, int
+        the number of events, which must not exceed ``n_users * n_items``
+        (default=10000)
+    score_domain : optional, tuple
+        min and max of scores, and the interval between scores.  this is
+        used only if `score_type` is 'rating'.  (default=(1, 5, 1))
+    distribution : optional, {'powerlaw', 'uniform'}
+        popularity distribution of users and items.  if 'powerlaw', the
+        i-th object is drawn with a probability approximately proportional
+        to ``i ** -exponent`` .  (default='powerlaw')
+    k : optional, int
+        the number of latent factors (default=2)
+    exponent : optional, float
+        exponent of a power-law distribution (default=1.0)
+    noise : optional, float
+        standard deviation of noise added to latent scores (default=0.5)
+    score_type : optional, {'rating', 'binary', 'implicit'}
+        type of scores.  if 'rating', latent scores are standardized and
+        quantized into `score_domain` .  if 'binary', a score is 1 with a
+        probability of the sigmoid of a latent score, and 0 otherwise.  if
+        'implicit', events are accepted with the probability of the sigmoid
+        of a latent score, and no scores are generated.  (default='rating')
+    random_state : RandomState or an int seed, optional
+        random number generator
+    index_dtype : np.dtype, default=None
+        dtype of an event array.  see
+        :meth:`kamrecsys.data.EventData.set_event`
+    score_dtype : np.dtype, default=None
+        dtype of scores.  as default, float64 is used.
+
+    Returns
+    -------
+    data : :class:`kamrecsys.data.EventWithScoreData`
+        synthetic data.  if `score_type` is 'implicit', an instance of
+        :class:`kamrecsys.data.EventData` is returned.
+
+    Raises
+    ------
+    ValueError
+        if arguments are invalid, or events cannot be generated because
+        popularity is too skewed
+
+    Notes
+    -----
+    External ids of users and items are integers in ``[0, n_users)`` and
+    ``[0, n_items)`` , respectively, and smaller ids are more popular.
+    Objects that appear in no events are not included in the data.
+    """
+    if score_type not in ('rating', 'binary', 'implicit'):
+        raise ValueError("Invalid score_type: {0!s}".format(score_type))
+    if n_events > n_users * n_items:
+        raise ValueError("n_events must not exceed n_users * n_items")
+    rng = check_random_state(random_state)
+
+    # model parameters
+    scale = k ** -0.25
+    user_factor = rng.normal(0.0, scale, (n_users, k))
+    item_factor = rng.normal(0.0, scale, (n_items, k))
+
+    # draw distinct pairs of users and items.  keys of drawn pairs are
+    # kept sorted, and the number of draws is adjusted by the ratio of new
+    # pairs in the previous draws.
+    key = np.empty(0, dtype=np.int64)
+    ratio = 1.0
+    for i in xrange(100):
+        n_needed = n_events - key.shape[0]
+        n_draws = min(int(n_needed / ratio * 1.1) + 16, 4 * n_events + 16)
+        user = _draw_objects(n_users, n_draws, distribution, exponent, rng)
+        item = _draw_objects(n_items, n_draws, distribution, exponent, rng)
+        if score_type == 'implicit':
+            r = _latent_score(user_factor, item_factor, user, item)
+            r += rng.normal(0.0, noise, n_draws)
+            accepted = rng.uniform(size=n_draws) < safe_sigmoid(r)
+            user, item = user[accepted], item[accepted]
+        new_key = np.unique(user.astype(np.int64) * n_items + item)
+        if key.shape[0] > 0:
+            pos = np.minimum(np.searchsorted(key, new_key), key.shape[0] - 1)
+            new_key = new_key[key[pos] != new_key]
+        ratio = max(new_key.shape[0] / n_draws, 1e-3)
+
+        if new_key.shape[0] > n_needed:
+            new_key = rng.choice(new_key, n_needed, replace=False)
+        key = np.sort(np.r_[key, new_key], kind='mergesort')
+        if key.shape[0] >= n_events:
+            break
+    else:
+        raise ValueError("Failed to draw distinct pairs of users and items")
+    key = key[rng.permutation(n_events)]
+    event = np.c_[key // n_items, key % n_items]
+    del key
+
+    if score_type == 'implicit':
+        data = EventData(n_otypes=2, event_otypes=(0, 1))
+        data.set_event(event, index_dtype=index_dtype)
+        return data
+
+    # scores
+    r = _latent_score(user_factor, item_factor, event[:, 0], event[:, 1])
+    r += rng.normal(0.0, noise, n_events)
+    if score_type == 'binary':
+        score = (rng.uniform(size=n_events) < safe_sigmoid(r)).astype(float)
+        score_domain = (0, 1, 1)
+    else:
+        min_score, max_score, interval = score_domain
+        n_levels = int(np.round((max_score - min_score) / interval)) + 1
+        r /= np.sqrt(1.0 + noise ** 2)
+        level = np.round((r + 2.0) / 4.0 * (n_levels - 1))
+        score = min_score + interval * np.clip(level, 0, n_levels - 1)
+
+    data = EventWithScoreData(n_otypes=2, event_otypes=(0, 1))
+    data.set_event(
+        event, score, score_domain=score_domain, index_dtype=index_dtype,
+        score_dtype=score_dtype)
+
+    return data
+
+
+# =============================================================================
+# Module initialization
+# =============================================================================
+
+# init logging system ---------------------------------------------------------
+logger = logging.getLogger('kamrecsys')
+if not logger.handlers:
+    logger.addHandler(logging.NullHandler())
+
+# =============================================================================
+# Test routine
+# =============================================================================
+
+
+def _test():
+    """ test function for this module
+    """
+
+    # perform doctest
+    import doctest
+
+    doctest.testmod()
+
+    sys.exit(0)
+
+
+# Check if this is call as command script -------------------------------------
+
+if __name__ == '__main__':
+    _test()
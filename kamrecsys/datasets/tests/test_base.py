@@ -44,6 +44,429 @@ from kamrecsys.datasets import SAMPLE_PATH
 # =============================================================================
 
 
+class TestReadEventFile(TestCase):
+
+    def test_func(self):
+        import io
+        from kamrecsys.datasets import read_event_file
+
+        text = (b"# comment\n"
+                b"1\t2\t3.5\t875636053\n"
+                b"  # indented comment\n"
+                b"\n"
+                b"5\t10\t1\t877892210 # trailing comment\n"
+                b"7\t3\t2\t875635748\n")
+        dtype = np.dtype([('event', int, 2), ('score', float),
+                          ('event_feature', [('timestamp', int)])])
+
+        # numeric fields
+        x = read_event_file(io.BytesIO(text), dtype)
+        y = np.genfromtxt(io.BytesIO(text), delimiter='\t', dtype=dtype)
+        assert_equal(x.dtype, dtype)
+        assert_array_equal(x, y)
+        assert_array_equal(x['event'], [[1, 2], [5, 10], [7, 3]])
+        assert_allclose(x['score'], [3.5, 1., 2.])
+        assert_array_equal(
+            x['event_feature']['timestamp'],
+            [875636053, 877892210, 875635748])
+
+        # single row
+        x = read_event_file(io.BytesIO(b"1\t2\t3\t4\n"), dtype)
+        assert_equal(x.shape, (1,))
+        assert_array_equal(x['event'], [[1, 2]])
+
+        # non-numeric fields or malformed text
+        dtype = np.dtype([('event', 'U8', 2), ('score', float)])
+        x = read_event_file(io.BytesIO(b"#\na\tb\t1\nc\td\t2\n"), dtype)
+        assert_array_equal(x['event'], [['a', 'b'], ['c', 'd']])
+        dtype = np.dtype([('event', int, 2), ('score', float)])
+        with assert_raises(ValueError):
+            read_event_file(io.BytesIO(b"1\t2\t3\n4 5\t6\n"), dtype)
+
+        # file name
+        infile = os.path.join(
+            os.path.dirname(__file__), 'sushi3bs_test.event')
+        x = read_event_file(
+            infile, [('event', int, 2), ('event_feature', int)])
+        assert_equal(x.shape, (20,))
+        assert_array_equal(x['event_feature'][:5], [0, 0, 3, 4, 1])
+
+    def test_parallel(self):
+        import shutil
+        import tempfile
+        from kamrecsys.datasets import read_event_file
+        from kamrecsys.datasets.base import _split_file
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            infile = os.path.join(tmp_dir, 'test.event')
+            with open(infile, 'w') as f:
+                f.write("# comment\n")
+                for i in xrange(100):
+                    f.write("{0:d}\t{1:d}\t{2:d}\n".format(i, i % 7, i % 5))
+            dtype = np.dtype([('event', int, 2), ('score', float)])
+
+            # byte ranges
+            ranges = _split_file(infile, 7)
+            assert_equal(len(ranges), 7)
+            assert_equal(ranges[0][0], 0)
+            assert_equal(ranges[-1][1], os.path.getsize(infile))
+            for (s1, e1), (s2, e2) in zip(ranges[:-1], ranges[1:]):
+                assert_equal(e1, s2)
+            assert_equal(len(_split_file(infile, 1000)) <= 101, True)
+
+            x = read_event_file(infile, dtype)
+            assert_array_equal(read_event_file(infile, dtype, n_jobs=3), x)
+            assert_array_equal(read_event_file(infile, dtype, n_jobs=200), x)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class TestIterEventChunks(TestCase):
+
+    def test_func(self):
+        import bz2
+        import gzip
+        import io
+        import shutil
+        import tempfile
+        from kamrecsys.data import EventDataBuilder
+        from kamrecsys.datasets import iter_event_chunks, load_event_with_score
+
+        infile = os.path.join(
+            os.path.dirname(__file__), 'sushi3bs_test.event')
+        data = load_event_with_score(infile, score_domain=(0., 4., 1.))
+        event = data.to_eid_event(data.event)
+
+        # chunks
+        chunks = list(iter_event_chunks(infile, chunk_size=6, block_size=16))
+        assert_equal([len(c[0]) for c in chunks], [6, 6, 6, 2])
+        assert_array_equal(np.concatenate([c[0] for c in chunks]), event)
+        assert_array_equal(
+            np.concatenate([c[1] for c in chunks]), data.score)
+        self.assertIsNone(chunks[0][2])
+
+        # event features without scores
+        chunks = list(iter_event_chunks(
+            infile, chunk_size=100, with_score=False,
+            event_dtype=np.dtype([('score', int)])))
+        assert_equal(len(chunks), 1)
+        self.assertIsNone(chunks[0][1])
+        assert_array_equal(chunks[0][2]['score'], data.score)
+
+        # file object without the last new line
+        with open(infile, 'rb') as f:
+            text = f.read().rstrip()
+        chunks = list(iter_event_chunks(
+            io.BytesIO(text), chunk_size=7, block_size=10))
+        assert_equal([len(c[0]) for c in chunks], [7, 7, 6])
+        assert_array_equal(np.concatenate([c[0] for c in chunks]), event)
+
+        # compressed files
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            compressed_files = [
+                (gzip.GzipFile, 'test.event.gz'),
+                (bz2.BZ2File, 'test.event.bz2')]
+            try:
+                import lzma
+                compressed_files.append((lzma.LZMAFile, 'test.event.xz'))
+            except ImportError:
+                pass
+            for open_file, file_name in compressed_files:
+                file_name = os.path.join(tmp_dir, file_name)
+                f = open_file(file_name, 'wb')
+                f.write(text)
+                f.close()
+
+                builder = EventDataBuilder(score_domain=(0., 4., 1.))
+                builder.extend(iter_event_chunks(file_name, chunk_size=3))
+                data2 = builder.build()
+                assert_array_equal(data2.event, data.event)
+                assert_array_equal(data2.score, data.score)
+                assert_array_equal(data2.eid[1], data.eid[1])
+
+                data2 = load_event_with_score(
+                    file_name, score_domain=(0., 4., 1.), n_jobs=2)
+                assert_array_equal(data2.event, data.event)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class TestSetFeatures(TestCase):
+
+    def test_func(self):
+        import pickle
+        from kamrecsys.data import EventData
+        from kamrecsys.datasets.base import _set_features
+
+        n_reads = [0]
+        fdtype = np.dtype([('age', int), ('name', 'U8')])
+
+        def read_user():
+            n_reads[0] += 1
+            return [3, 1, 2], np.array(
+                [(30, 'c'), (10, 'a'), (20, 'b')], dtype=fdtype)
+
+        data = EventData()
+        data.set_event(np.array([[1, 10], [2, 20], [3, 10]]))
+
+        # not loaded
+        _set_features(data, [(0, read_user)], load_features=False)
+        assert_equal(n_reads[0], 0)
+        self.assertIsNone(data.feature[0])
+
+        # loaded immediately
+        _set_features(data, [(0, read_user)])
+        assert_equal(n_reads[0], 1)
+        assert_array_equal(data.feature[0]['age'], [10, 20, 30])
+
+        # loaded lazily
+        data = EventData()
+        data.set_event(np.array([[1, 10], [2, 20], [3, 10]]))
+        _set_features(data, [(0, read_user)], load_features='lazy')
+        assert_equal(n_reads[0], 1)
+        self.assertNotIn('feature', data.__dict__)
+        view = data.filter_event([False, True, True], view=True)
+        assert_array_equal(view.feature[0]['name'], ['b', 'c'])
+        assert_equal(n_reads[0], 2)
+        assert_array_equal(data.feature[0]['name'], ['a', 'b', 'c'])
+        self.assertIsNone(data.feature[1])
+        assert_equal(n_reads[0], 2)
+        self.assertNotIn('_deferred', data.__dict__)
+
+        # pickle
+        data = EventData()
+        data.set_event(np.array([[1, 10], [2, 20], [3, 10]]))
+        _set_features(data, [(0, read_user)], load_features='lazy')
+        data = pickle.loads(pickle.dumps(data))
+        assert_array_equal(data.feature[0]['age'], [10, 20, 30])
+
+    def test_deferred(self):
+        import copy
+        import shutil
+        import tempfile
+        from kamrecsys.data import EventData
+        from kamrecsys.datasets.base import (
+            _read_cache, _set_features, _write_cache)
+
+        n_reads = [0]
+        fdtype = np.dtype([('age', int), ('name', 'U8')])
+
+        def read_user():
+            n_reads[0] += 1
+            return [3, 1, 2], np.array(
+                [(30, 'c'), (10, 'a'), (20, 'b')], dtype=fdtype)
+
+        readers = [(0, read_user)]
+        data = EventData()
+        data.set_event(np.array([[1, 10], [2, 20], [3, 10]]))
+        _set_features(data, readers, load_features='lazy')
+
+        # copies and views
+        data2 = copy.copy(data)
+        view = data.filter_event([False, True, True], view=True)
+        assert_equal(n_reads[0], 0)
+        self.assertNotIn('feature', data2.__dict__)
+        self.assertNotIn('feature', view.__dict__)
+        assert_array_equal(data2.feature[0]['age'], [10, 20, 30])
+        assert_equal(n_reads[0], 1)
+        self.assertIn('feature', data.__dict__)
+        assert_array_equal(view.feature[0]['name'], ['b', 'c'])
+        assert_equal(n_reads[0], 1)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            infile = os.path.join(tmp_dir, 'test.event')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            with open(infile, 'w') as f:
+                f.write("1\t10\n2\t20\n3\t10\n")
+            data = EventData()
+            data.set_event(np.array([[1, 10], [2, 20], [3, 10]]))
+            _set_features(data, readers, load_features='lazy')
+
+            # features are not cached
+            data2, cache = _read_cache('test', [infile], {}, cache_dir)
+            self.assertIsNone(data2)
+            _write_cache(data, cache)
+            assert_equal(n_reads[0], 1)
+            self.assertNotIn('feature', data.__dict__)
+
+            # features stay deferred after loading a cache
+            data2, _ = _read_cache(
+                'test', [infile], {}, cache_dir, readers, 'lazy')
+            assert_equal(n_reads[0], 1)
+            self.assertNotIn('feature', data2.__dict__)
+            assert_array_equal(data2.feature[0]['name'], ['a', 'b', 'c'])
+            self.assertIsNone(data2.feature[1])
+            assert_equal(n_reads[0], 2)
+
+            # features are read immediately
+            data2, _ = _read_cache('test', [infile], {}, cache_dir, readers)
+            assert_equal(n_reads[0], 3)
+            assert_array_equal(data2.feature[0]['age'], [10, 20, 30])
+            data2, _ = _read_cache('test', [infile], {}, cache_dir)
+            assert_equal(n_reads[0], 3)
+            self.assertIsNone(data2.feature[0])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class TestReadCache(TestCase):
+
+    def test_sources(self):
+        import json
+        import shutil
+        import tempfile
+        import kamrecsys.datasets.base as base
+        from kamrecsys.data import EventData
+
+        data = EventData()
+        data.set_event(np.array([[1, 10], [2, 20], [3, 10]]))
+        tmp_dir = tempfile.mkdtemp()
+        file_digest = base._file_digest
+        n_digests = [0]
+
+        def count_digest(file_name):
+            n_digests[0] += 1
+            return file_digest(file_name)
+
+        try:
+            infile = os.path.join(tmp_dir, 'test.event')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            with open(infile, 'w') as f:
+                f.write("1\t10\n2\t20\n3\t10\n")
+
+            # sources modified while parsing invalidate a cache
+            cache = base._read_cache('test', [infile], {}, cache_dir)[1]
+            with open(infile, 'w') as f:
+                f.write("1\t10\n2\t20\n3\t30\n")
+            base._write_cache(data, cache)
+            self.assertIsNone(
+                base._read_cache('test', [infile], {}, cache_dir)[0])
+
+            # modification times are updated if contents are unchanged
+            cache = base._read_cache('test', [infile], {}, cache_dir)[1]
+            base._write_cache(data, cache)
+            os.utime(infile, (0, 0))
+            base._file_digest = count_digest
+            self.assertIsNotNone(
+                base._read_cache('test', [infile], {}, cache_dir)[0])
+            assert_equal(n_digests[0], 1)
+            with open(os.path.join(cache[0], 'sources.json')) as f:
+                assert_equal(json.load(f)[0]['mtime'], 0)
+            self.assertIsNotNone(
+                base._read_cache('test', [infile], {}, cache_dir)[0])
+            assert_equal(n_digests[0], 1)
+            assert_equal([f for f in os.listdir(cache[0])
+                          if f.startswith('sources')], ['sources.json'])
+        finally:
+            base._file_digest = file_digest
+            shutil.rmtree(tmp_dir)
+
+
+class TestConvertBinary(TestCase):
+
+    def test_func(self):
+        import shutil
+        import tempfile
+        import kamrecsys.datasets.base as base
+        from kamrecsys.datasets import load_flixster_rating
+
+        tmp_dir = tempfile.mkdtemp()
+        sample_path = base.SAMPLE_PATH
+        try:
+            infile = os.path.join(tmp_dir, 'flixster.event')
+            with open(infile, 'w') as f:
+                f.write("# comment\n5\t10\t4.5\n1\t20\t1.0\n5\t20\t3.5\n")
+            data = base.convert_binary(
+                'flixster', tmp_dir, (0.5, 5.0, 0.5), chunk_size=2)
+            assert_array_equal(data.eid[0], [1, 5])
+            assert_array_equal(data.score, [4.5, 1.0, 3.5])
+
+            # converted data are loaded only with default options
+            base.SAMPLE_PATH = tmp_dir
+            data2 = load_flixster_rating()
+            assert_(isinstance(data2.event, np.memmap))
+            assert_array_equal(data2.event, data.event)
+            assert_array_equal(data2.score, data.score)
+            assert_array_equal(data2.score_domain, [0.5, 5.0, 0.5])
+            assert_equal(data2.to_iid(1, 20), 1)
+            data2 = load_flixster_rating(infile=infile)
+            assert_(not isinstance(data2.event, np.memmap))
+            assert_array_equal(data2.event, data.event)
+            data2 = base._read_loaded_data(
+                'flixster', [infile], {}, False, binary=True)[0]
+            assert_(isinstance(data2.event, np.memmap))
+            data2 = base._read_loaded_data(
+                'flixster', [infile], {}, False, binary=True,
+                min_user_events=2)[0]
+            self.assertIsNone(data2)
+
+            # converted data are outdated
+            os.utime(infile, (0, 0))
+            self.assertIsNotNone(base._load_binary('flixster'))
+            with open(infile, 'a') as f:
+                f.write("1\t10\t2.0\n")
+            self.assertIsNone(base._load_binary('flixster'))
+
+            # no source information
+            base.convert_binary('flixster', tmp_dir, (0.5, 5.0, 0.5))
+            self.assertIsNotNone(base._load_binary('flixster'))
+            os.remove(os.path.join(tmp_dir, 'flixster.bin', 'sources.json'))
+            self.assertIsNone(base._load_binary('flixster'))
+
+            # no converted data
+            self.assertIsNone(base._load_binary('movielens100k'))
+        finally:
+            base.SAMPLE_PATH = sample_path
+            shutil.rmtree(tmp_dir)
+
+
+class TestReadLoadedData(TestCase):
+
+    def test_func(self):
+        import shutil
+        import tempfile
+        from kamrecsys.datasets.base import _read_loaded_data
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            infile = os.path.join(tmp_dir, 'test.event')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            with open(infile, 'w') as f:
+                f.write("1\t10\n2\t20\n3\t10\n")
+
+            # filters
+            data, cache, filters = _read_loaded_data(
+                'test', [infile], {}, cache_dir, k_core=2)
+            self.assertIsNone(data)
+            assert_equal(filters['k_core'], 2)
+            self.assertIsNone(filters['min_user_events'])
+            assert_equal(len(filters), 7)
+
+            # cache keys depend on filter parameters
+            cache2 = _read_loaded_data(
+                'test', [infile], {}, cache_dir, k_core=3)[1]
+            self.assertNotEqual(cache2[0], cache[0])
+            cache2 = _read_loaded_data(
+                'test', [infile], {}, cache_dir, user_sample=2,
+                random_state=1)[1]
+            self.assertIsNotNone(cache2)
+
+            # filtered events are not cached if they are not reproducible
+            cache = _read_loaded_data(
+                'test', [infile], {}, cache_dir,
+                event_filter=lambda x: x['event'][:, 0] > 1)[1]
+            self.assertIsNone(cache)
+            cache = _read_loaded_data(
+                'test', [infile], {}, cache_dir, user_sample=2,
+                random_state=np.random.RandomState(1))[1]
+            self.assertIsNone(cache)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
 class TestLoadEvent(TestCase):
 
     def test_func(self):
@@ -103,10 +526,10 @@ class TestLoadEventWithScore(TestCase):
         assert_array_equal(
             data.eid[1], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
         self.assertDictEqual(
-            data.iid[0],
+            dict(data.iid[0]),
             {1: 0, 2: 1, 5: 2, 6: 3, 7: 4, 8: 5, 9: 6, 10: 7})
         self.assertDictEqual(
-            data.iid[1],
+            dict(data.iid[1]),
             {1: 0, 2: 1, 3: 2, 4: 3, 5: 4, 6: 5, 7: 6, 8: 7, 9: 8, 10: 9})
         self.assertIsNone(data.feature[0])
         self.assertIsNone(data.feature[1])
@@ -145,6 +568,129 @@ class TestLoadEventWithScore(TestCase):
         self.assertEqual(data.n_score_levels, 5)
         assert_allclose(data.score_domain, [0., 4., 1.])
 
+    def test_cache(self):
+        import shutil
+        import tempfile
+        from kamrecsys.datasets import load_event_with_score
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            infile = os.path.join(tmp_dir, 'test.event')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            shutil.copy(os.path.join(
+                os.path.dirname(__file__), 'sushi3bs_test.event'), infile)
+
+            # the first call parses the file, and the second one reads a cache
+            data = load_event_with_score(
+                infile, score_domain=(0., 4., 1.), cache_dir=cache_dir)
+            assert_equal(len(os.listdir(cache_dir)), 1)
+            data2 = load_event_with_score(
+                infile, score_domain=(0., 4., 1.), cache_dir=cache_dir)
+            assert_(isinstance(data2.event, np.memmap))
+            assert_array_equal(data2.event, data.event)
+            assert_array_equal(data2.score, data.score)
+            assert_array_equal(data2.eid[0], data.eid[0])
+            assert_equal(data2.to_iid(1, 7), data.to_iid(1, 7))
+
+            # different parameters
+            data2 = load_event_with_score(
+                infile, score_domain=(0., 4., 1.), score_dtype=np.float32,
+                cache_dir=cache_dir)
+            assert_equal(data2.score.dtype, np.float32)
+            assert_equal(len(os.listdir(cache_dir)), 2)
+
+            # modified source file
+            with open(infile, 'a') as f:
+                f.write("100\t1\t3\n")
+            data2 = load_event_with_score(
+                infile, score_domain=(0., 4., 1.), cache_dir=cache_dir)
+            assert_equal(data2.n_events, data.n_events + 1)
+            assert_(not isinstance(data2.event, np.memmap))
+
+            # environment variable
+            os.environ['KAMRECSYS_CACHE_DIR'] = cache_dir
+            try:
+                data2 = load_event_with_score(
+                    infile, score_domain=(0., 4., 1.))
+                assert_(isinstance(data2.event, np.memmap))
+                data2 = load_event_with_score(
+                    infile, score_domain=(0., 4., 1.), cache_dir=False)
+                assert_(not isinstance(data2.event, np.memmap))
+            finally:
+                del os.environ['KAMRECSYS_CACHE_DIR']
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_filter(self):
+        import io
+        from kamrecsys.datasets import load_event_with_score
+
+        rng = np.random.RandomState(1234)
+        event = np.c_[rng.zipf(1.5, 2000) % 100, rng.zipf(1.5, 2000) % 50]
+        score = rng.randint(1, 6, 2000)
+        timestamp = np.arange(2000)
+        text = io.BytesIO()
+        np.savetxt(text, np.c_[event, score, timestamp], fmt=str('%d'),
+                   delimiter=str('\t'))
+        text = text.getvalue()
+
+        def load(**kwargs):
+            return load_event_with_score(
+                io.BytesIO(text), event_dtype=np.dtype([('timestamp', int)]),
+                **kwargs)
+
+        def count(data, otype):
+            return np.bincount(
+                data.event[:, otype], minlength=data.n_objects[otype])
+
+        # predicate
+        data = load(
+            event_filter=lambda x: x['event_feature']['timestamp'] < 500)
+        assert_equal(data.n_events, 500)
+        assert_array_equal(data.to_eid_event(data.event), event[:500])
+
+        # minimum numbers of events
+        data = load(min_user_events=5)
+        assert_array_less(4, count(data, 0))
+        n_events = np.bincount(event[:, 0])
+        assert_equal(data.n_events, np.sum(n_events[event[:, 0]] >= 5))
+        data = load(min_item_events=10)
+        assert_array_less(9, count(data, 1))
+
+        # k-core
+        data = load(k_core=5)
+        assert_array_less(4, count(data, 0))
+        assert_array_less(4, count(data, 1))
+        ref = load()
+        while True:
+            mask = ((count(ref, 0) >= 5)[ref.event[:, 0]] &
+                    (count(ref, 1) >= 5)[ref.event[:, 1]])
+            if np.all(mask):
+                break
+            ref = ref.filter_event(mask)
+        assert_array_equal(
+            data.to_eid_event(data.event), ref.to_eid_event(ref.event))
+        assert_array_equal(data.score, ref.score)
+
+        # sparse external ids
+        text2 = io.BytesIO()
+        np.savetxt(text2, np.c_[event * 10 ** 12, score, timestamp],
+                   fmt=str('%d'), delimiter=str('\t'))
+        data2 = load_event_with_score(
+            io.BytesIO(text2.getvalue()), k_core=5,
+            event_dtype=np.dtype([('timestamp', int)]))
+        assert_array_equal(data2.event, data.event)
+        assert_array_equal(data2.eid[0], data.eid[0] * 10 ** 12)
+
+        # sampling
+        data = load(user_sample=10, random_state=1)
+        assert_equal(data.n_objects[0], 10)
+        data2 = load(user_sample=10, random_state=1)
+        assert_array_equal(data2.eid[0], data.eid[0])
+        data = load(item_sample=0.5, k_core=2, random_state=1)
+        assert_equal(data.n_objects[1] <= 25, True)
+        assert_array_less(1, count(data, 0))
+
 
 # =============================================================================
 # Main Routine
@@ -49,7 +49,7 @@ class TestFlixsterClass(TestCase):
         assert_array_equal(
             sorted(data.__dict__.keys()),
             sorted(['event_otypes', 'n_otypes', 'n_events', 'n_score_levels',
-                    'feature', 'event', 'iid', 'event_feature',
+                    'feature', 'event', 'iid', 'event_feature', 'event_count',
                     'score', 'eid', 'n_objects', 's_event', 'score_domain']))
         assert_array_equal(data.event_otypes, [0, 1])
         assert_equal(data.n_otypes, 2)
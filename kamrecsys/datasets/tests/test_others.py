@@ -58,7 +58,7 @@ class TestLoadPCISample(TestCase):
              [3, 5], [6, 2], [6, 3], [6, 5], [1, 1], [1, 2], [1, 0],
              [1, 3], [1, 5], [1, 4], [4, 1], [4, 2], [4, 3], [4, 4]])
         self.assertDictEqual(
-            data.iid[0],
+            dict(data.iid[0]),
             {
                 'Jack Matthews': 2, 'Mick LaSalle': 5, 'Claudia Puig': 0,
                 'Lisa Rose': 3, 'Toby': 6, 'Gene Seymour': 1,
@@ -66,7 +66,7 @@ class TestLoadPCISample(TestCase):
             }
         )
         self.assertDictEqual(
-            data.iid[1],
+            dict(data.iid[1]),
             {
                 'Lady in the Water': 1, 'Just My Luck': 0,
                 'Superman Returns': 3, 'You, Me and Dupree': 5,
@@ -49,7 +49,7 @@ class TestSushi3Class(TestCase):
         assert_array_equal(
             sorted(data.__dict__.keys()),
             sorted(['event_otypes', 'n_otypes', 'n_events', 'n_score_levels',
-                    'feature', 'event', 'iid', 'event_feature',
+                    'feature', 'event', 'iid', 'event_feature', 'event_count',
                     'score', 'eid', 'n_objects', 's_event',
                     'score_domain']))
         assert_array_equal(data.event_otypes, [0, 1])
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import (
+    print_function,
+    division,
+    absolute_import,
+    unicode_literals)
+from six.moves import xrange
+
+# =============================================================================
+# Imports
+# =============================================================================
+
+from numpy.testing import (
+    TestCase,
+    run_module_suite,
+    assert_,
+    assert_allclose,
+    assert_array_almost_equal_nulp,
+    assert_array_max_ulp,
+    assert_array_equal,
+    assert_array_less,
+    assert_equal,
+    assert_raises,
+    assert_raises_regex,
+    assert_warns,
+    assert_string_equal)
+import numpy as np
+
+# =============================================================================
+# Module variables
+# =============================================================================
+
+# =============================================================================
+# Functions
+# =============================================================================
+
+# =============================================================================
+# Test Classes
+# =============================================================================
+
+
+class TestMakeSyntheticEvents(TestCase):
+
+    def test_rating(self):
+        from kamrecsys.data import EventWithScoreData
+        from kamrecsys.datasets import make_synthetic_events
+
+        data = make_synthetic_events(
+            n_users=200, n_items=100, n_events=5000, score_domain=(1, 5, 1),
+            k=3, random_state=1234)
+        assert_(isinstance(data, EventWithScoreData))
+        assert_equal(data.n_events, 5000)
+        assert_array_less(data.n_objects, [201, 101])
+        assert_array_equal(data.score_domain, [1, 5, 1])
+        assert_array_equal(np.unique(data.score), [1, 2, 3, 4, 5])
+
+        # pairs of users and items are distinct
+        event = data.to_eid_event(data.event)
+        assert_equal(np.unique(event[:, 0] * 100 + event[:, 1]).shape[0],
+                     5000)
+
+        # popularity
+        n_events = np.bincount(event[:, 1], minlength=100)
+        assert_array_less(n_events[50:].max(), n_events[:5].min())
+        data2 = make_synthetic_events(
+            n_users=200, n_items=100, n_events=5000, distribution='uniform',
+            random_state=1234)
+        n_events = np.bincount(data2.event[:, 1])
+        assert_array_less(n_events.max(), 3 * n_events.min())
+
+        # random state
+        data2 = make_synthetic_events(
+            n_users=200, n_items=100, n_events=5000, score_domain=(1, 5, 1),
+            k=3, random_state=1234)
+        assert_array_equal(data2.event, data.event)
+        assert_array_equal(data2.score, data.score)
+
+        # half-point scores
+        data = make_synthetic_events(
+            n_users=50, n_items=50, n_events=2000, score_domain=(0.5, 5, 0.5),
+            exponent=0.5, random_state=1234, index_dtype=np.int16,
+            score_dtype=np.float32)
+        assert_array_equal(np.unique(data.score), np.arange(1, 11) / 2)
+        assert_equal(data.event.dtype, np.int16)
+        assert_equal(data.score.dtype, np.float32)
+
+        # all pairs
+        data = make_synthetic_events(
+            n_users=10, n_items=10, n_events=100, random_state=1234)
+        assert_array_equal(data.n_objects, [10, 10])
+
+    def test_binary_and_implicit(self):
+        from kamrecsys.data import EventData, EventWithScoreData
+        from kamrecsys.datasets import make_synthetic_events
+
+        data = make_synthetic_events(
+            n_users=100, n_items=100, n_events=3000, score_type='binary',
+            random_state=1234)
+        assert_(isinstance(data, EventWithScoreData))
+        assert_array_equal(data.score_domain, [0, 1, 1])
+        assert_array_equal(np.unique(data.score), [0, 1])
+
+        data = make_synthetic_events(
+            n_users=100, n_items=100, n_events=3000, score_type='implicit',
+            random_state=1234)
+        assert_(isinstance(data, EventData))
+        assert_(not isinstance(data, EventWithScoreData))
+        assert_equal(data.n_events, 3000)
+
+    def test_errors(self):
+        from kamrecsys.datasets import make_synthetic_events
+
+        with assert_raises(ValueError):
+            make_synthetic_events(n_users=10, n_items=10, n_events=101)
+        with assert_raises(ValueError):
+            make_synthetic_events(score_type='ranking')
+        with assert_raises(ValueError):
+            make_synthetic_events(distribution='normal')
+
+
+# =============================================================================
+# Main Routines
+# =============================================================================
+
+if __name__ == '__main__':
+    run_module_suite()
@@ -139,6 +139,46 @@ class BaseImplicitItemFinder(with_metaclass(ABCMeta, BaseEventRecommender)):
     task_type = 'item_finder'
     explicit_ratings = True
 
+    def __init__(self, random_state=None):
+        super(BaseImplicitItemFinder, self).__init__(random_state=random_state)
+
+        self._event_array = None
+
+    def __getstate__(self):
+        """
+        A matrix of events shared with input data is not pickled, and it is
+        generated from `event` if required
+        """
+        state = super(BaseImplicitItemFinder, self).__getstate__().copy()
+        state['_event_array'] = None
+
+        return state
+
+    def remove_data(self):
+        """
+        Remove information related to a training dataset
+        """
+        super(BaseImplicitItemFinder, self).remove_data()
+
+        self._event_array = None
+
+    def fit(self, data, event_index=None):
+        """
+        fitting model
+
+        Parameters
+        ----------
+        data : :class:`kamrecsys.data.BaseData`
+            input data
+        event_index : array_like, shape=(variable,)
+            a set of indexes to specify the elements in events that are used
+            in a recommendation model
+        """
+        super(BaseImplicitItemFinder, self).fit(data, event_index)
+
+        # a matrix of events cached in data is shared
+        self._event_array = data.to_csr('count', self.event_index[:2])
+
     def get_event_array(self, sparse_type='csr'):
         """
         Set statistics of input dataset, and generate a matrix representing
@@ -154,7 +194,10 @@ class BaseImplicitItemFinder(with_metaclass(ABCMeta, BaseEventRecommender)):
         -------
         ev : array, shape=(n_users, n_items), dtype=int
             return rating matrix that takes 1 if it is consumed, 0 otherwise.
-            if event data are not available, return None
+            if event data are not available, return None.  the dtype of
+            an event array is preserved.  a CSR matrix may be shared with
+            input data, and its arrays are read-only; copy it before
+            modifying.
         n_objects : array_like, shape=(event_index.shape[0],), dtype=int
             the number of objects corresponding to elements tof an extracted
             events
@@ -168,12 +211,14 @@ class BaseImplicitItemFinder(with_metaclass(ABCMeta, BaseEventRecommender)):
         n_objects = self.n_objects[self.event_otypes[self.event_index]]
 
         # get event data
-        users = self.event[:, self.event_index[0]]
-        items = self.event[:, self.event_index[1]]
-        scores = np.ones_like(users, dtype=int)
+        ev = self._event_array
+        if ev is None:
+            users = self.event[:, self.event_index[0]]
+            items = self.event[:, self.event_index[1]]
+            scores = np.ones_like(users)
+            ev = sparse.coo_matrix((scores, (users, items)), shape=n_objects)
 
         # generate array
-        ev = sparse.coo_matrix((scores, (users, items)), shape=n_objects)
         if sparse_type == 'csc':
             ev = ev.tocsc()
         elif sparse_type == 'csr':
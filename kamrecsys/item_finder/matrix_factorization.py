@@ -25,6 +25,7 @@ from scipy.optimize import minimize
 from sklearn.utils import check_random_state
 
 from . import BaseExplicitItemFinder, BaseImplicitItemFinder
+from ..base import MatrixFactorizationMixin
 from ..utils import safe_sigmoid as sigmoid
 
 # =============================================================================
@@ -37,6 +38,9 @@ __all__ = []
 # Constants
 # =============================================================================
 
+# the number of pairs of users and items whose scores are computed at once
+BLOCK_SIZE = 1 << 18
+
 # =============================================================================
 # Module variables
 # =============================================================================
@@ -46,7 +50,7 @@ __all__ = []
 # =============================================================================
 
 
-class LogisticPMF(BaseExplicitItemFinder):
+class LogisticPMF(BaseExplicitItemFinder, MatrixFactorizationMixin):
     """
     A probabilistic matrix factorization model proposed in [1]_.
     A method of handling bias terms is defined by equation (5) in [2]_.
@@ -62,8 +66,19 @@ class LogisticPMF(BaseExplicitItemFinder):
     k : int, optional
         the number of latent factors (= sizes of :math:`\mathbf{p}_u` or
         :math:`\mathbf{q}_i`), default=1
+    solver : {'minimize', 'sgd'}, optional
+        if 'minimize', all parameters are jointly optimized by
+        :func:`scipy.optimize.minimize` .  if 'sgd', mini-batch stochastic
+        gradient descent by :func:`kamrecsys.utils.minimize_sgd` is used.
+        default='minimize'
     optimizer_kwargs : keyword arguments, optional
-        keyword arguments passed to optimizer
+        keyword arguments passed to optimizer.  the 'minimize' solver passes
+        them to :func:`scipy.optimize.minimize` , and its `method` is 'CG' by
+        default.  the 'sgd' solver accepts `maxiter` , which is the number of
+        epochs, and arguments of :func:`kamrecsys.utils.minimize_sgd` :
+        `n_epochs` , `batch_size` , `learning_rate` , `eta0` , `decay` ,
+        `beta1` , `beta2` , `epsilon` , and `tol` .  :meth:`fit` raises
+        ValueError if the other arguments are passed to the 'sgd' solver.
 
     Attributes
     ----------
@@ -109,6 +124,12 @@ class LogisticPMF(BaseExplicitItemFinder):
     events, and a regularization term is scaled by the number of model
     parameters.
 
+    The 'sgd' solver minimizes a loss divided by the number of events.  A
+    regularization term of an object is distributed over its events, so
+    that each step updates only parameters of users and items in a
+    mini-batch.  Losses after each epoch are stored in
+    ``fit_results_['epoch_losses']`` .
+
     References
     ----------
     .. [1] R. Salakhutdinov and A. Mnih. "Probabilistic matrix factorization"
@@ -117,7 +138,9 @@ class LogisticPMF(BaseExplicitItemFinder):
         Collaborative Filtering Model", KDD2008
     """
 
-    def __init__(self, C=1.0, k=1, random_state=None, **optimizer_kwargs):
+    def __init__(
+            self, C=1.0, k=1, random_state=None, solver='minimize',
+            **optimizer_kwargs):
 
         super(LogisticPMF, self).__init__(random_state=random_state)
 
@@ -126,6 +149,7 @@ class LogisticPMF(BaseExplicitItemFinder):
         self.k = int(k)
 
         # optimizer parameter
+        self.solver = solver
         self.optimizer_kwargs = optimizer_kwargs
         self.optimizer_kwargs['options'] = (
             self.optimizer_kwargs.get('options', {}))
@@ -149,6 +173,7 @@ class LogisticPMF(BaseExplicitItemFinder):
         # private instance variables
         self._coef = None
         self._dt = None
+        self._buffers = None
 
     def _init_coef(self, ev, sc, n_objects):
         """
@@ -190,68 +215,77 @@ class LogisticPMF(BaseExplicitItemFinder):
         self.q_ = self._coef.view(self._dt)['q'][0]
 
         # set bias term
-        self.mu_[0] = np.sum(sc) / n_events
-        for i in xrange(n_users):
-            j = np.nonzero(ev[:, 0] == i)[0]
-            if len(j) > 0:
-                self.bu_[i] = np.sum(sc[j] - self.mu_[0]) / len(j)
-        for i in xrange(n_items):
-            j = np.nonzero(ev[:, 1] == i)[0]
-            if len(j) > 0:
-                self.bi_[i] = (
-                    np.sum(sc[j] - (self.mu_[0] + self.bu_[ev[j, 0]])) /
-                    len(j))
+        # scores are accumulated in float64 even if they are stored in float32
+        self.mu_[0] = np.sum(sc, dtype=float) / n_events
+        # biases are means of residuals over events of each object
+        res = sc - self.mu_[0]
+        n_user_events = np.bincount(ev[:, 0], minlength=n_users)
+        np.divide(np.bincount(ev[:, 0], weights=res, minlength=n_users),
+                  n_user_events, out=self.bu_, where=n_user_events > 0)
+        res = sc - (self.mu_[0] + self.bu_[ev[:, 0]])
+        n_item_events = np.bincount(ev[:, 1], minlength=n_items)
+        np.divide(np.bincount(ev[:, 1], weights=res, minlength=n_items),
+                  n_item_events, out=self.bi_, where=n_item_events > 0)
 
         # fill cross terms by normal randoms
-        mask = np.bincount(ev[:, 0], minlength=n_users).nonzero()[0]
+        mask = n_user_events.nonzero()[0]
         self.p_[mask, :] = self._rng.normal(0.0, 1.0, (len(mask), k))
-        mask = np.bincount(ev[:, 1], minlength=n_items).nonzero()[0]
+        mask = n_item_events.nonzero()[0]
         self.q_[mask, :] = self._rng.normal(0.0, 1.0, (len(mask), k))
 
-    def loss(self, coef, ev, sc, n_objects):
+    def _transform_estimates(self, esc):
         """
-        loss function to optimize
+        Transform sums of biases and cross products into estimated scores
 
         Parameters
         ----------
-        coef : array_like, shape=(variable,)
-            coefficients of this model
-        ev : array_like, shape(n_events, 2), dtype=int
-            user and item indexes
+        esc : array, shape=(n_events,), dtype=float
+            sums of biases and cross products, which are overwritten
+
+        Returns
+        -------
+        esc : array, shape=(n_events,), dtype=float
+            sigmoid of input
+        """
+        return sigmoid(esc, out=esc)
+
+    def _get_loss_term(self, esc, sc, buf):
+        """
+        Cross entropy of estimated scores, which is computed in chunks
+
+        Parameters
+        ----------
+        esc : array, shape=(n_events,), dtype=float
+            estimated scores
         sc : array_like, shape(n_events,), dtype=float
             target scores
-        n_objects : array_like, shape(2,), dtype=int
-            numbers of users and items
+        buf : dict
+            work buffers returned by :meth:`_get_buffers`
 
         Returns
         -------
         loss : float
-            value of loss function
+            loss term of a loss function
         """
-        # constants
-        n_events = ev.shape[0]
+        n_events = esc.shape[0]
+        n_rows = buf['tmp'].shape[0]
 
-        # set array's view
-        mu = coef.view(self._dt)['mu'][0]
-        bu = coef.view(self._dt)['bu'][0]
-        bi = coef.view(self._dt)['bi'][0]
-        p = coef.view(self._dt)['p'][0]
-        q = coef.view(self._dt)['q'][0]
-
-        # loss term
-        esc = sigmoid(
-            mu[0] + bu[ev[:, 0]] + bi[ev[:, 1]] +
-            np.sum(p[ev[:, 0], :] * q[ev[:, 1], :], axis=1))
-        loss = - np.sum(sc * np.log(esc) + (1 - sc) * np.log(1 - esc))
-
-        # regularization term
-        reg = (np.sum(bu**2) + np.sum(bi**2) + np.sum(p**2) + np.sum(q**2))
+        loss = 0.0
+        for i in xrange(0, n_events, n_rows):
+            s = slice(i, min(i + n_rows, n_events))
+            loss += _cross_entropy(
+                esc[s], sc[s], buf['tmp'][:s.stop - s.start])
 
-        return loss + 0.5 * self.C * reg
+        return loss
 
-    def grad_loss(self, coef, ev, sc, n_objects):
+    def loss_and_grad(self, coef, ev, sc, n_objects):
         """
-        gradient of loss function
+        loss function to optimize and its gradient
+
+        Estimated scores of events, which are shared by a loss and its
+        gradient, are computed only once, and gradients of latent factors
+        are computed as products of a sparse matrix of common terms and
+        latent factors.
 
         Parameters
         ----------
@@ -266,23 +300,31 @@ class LogisticPMF(BaseExplicitItemFinder):
 
         Returns
         -------
+        loss : float
+            value of loss function
         grad : array_like, shape=coef.shape
             the first gradient of loss function by coef
         """
         # constants
-        n_events = ev.shape[0]
         n_users = n_objects[0]
         n_items = n_objects[1]
 
         # set input array's view
-        mu = coef.view(self._dt)['mu'][0]
         bu = coef.view(self._dt)['bu'][0]
         bi = coef.view(self._dt)['bi'][0]
         p = coef.view(self._dt)['p'][0]
         q = coef.view(self._dt)['q'][0]
 
-        # create empty gradient
-        grad = np.zeros_like(coef)
+        # loss term and regularization term
+        buf = self._get_buffers(ev, n_objects)
+        esc = self._get_estimates(coef, ev, buf)
+        loss = self._get_loss_term(esc, sc, buf)
+        reg = self._get_regularizer(coef)
+        common_term = np.subtract(esc, sc, out=esc)
+
+        # create empty gradient.  a new array is required for each call,
+        # because optimizers may keep gradients of previous iterations.
+        grad = np.empty_like(coef)
         grad_mu = grad.view(self._dt)['mu'][0]
         grad_bu = grad.view(self._dt)['bu'][0]
         grad_bi = grad.view(self._dt)['bi'][0]
@@ -290,32 +332,75 @@ class LogisticPMF(BaseExplicitItemFinder):
         grad_q = grad.view(self._dt)['q'][0]
 
         # gradient of loss term
-        esc = sigmoid(
-            mu[0] + bu[ev[:, 0]] + bi[ev[:, 1]] +
-            np.sum(p[ev[:, 0], :] * q[ev[:, 1], :], axis=1))
-        common_term = esc - sc
-
         grad_mu[0] = np.sum(common_term)
         grad_bu[:] = np.bincount(
             ev[:, 0], weights=common_term, minlength=n_users)
         grad_bi[:] = np.bincount(
             ev[:, 1], weights=common_term, minlength=n_items)
-        weights = common_term[:, np.newaxis] * q[ev[:, 1], :]
-        for i in xrange(self.k):
-            grad_p[:, i] = np.bincount(
-                ev[:, 0], weights=weights[:, i], minlength=n_users)
-        weights = common_term[:, np.newaxis] * p[ev[:, 0], :]
-        for i in xrange(self.k):
-            grad_q[:, i] = np.bincount(
-                ev[:, 1], weights=weights[:, i], minlength=n_items)
+        res = buf['res']
+        np.take(common_term, buf['order'], out=res.data)
+        grad_p[:, :] = res.dot(q)
+        grad_q[:, :] = res.T.dot(p)
 
         # gradient of regularization term
-        grad_bu[:] += self.C * bu
-        grad_bi[:] += self.C * bi
-        grad_p[:, :] += self.C * p
-        grad_q[:, :] += self.C * q
+        grad_bu += self.C * bu
+        grad_bi += self.C * bi
+        grad_p += self.C * p
+        grad_q += self.C * q
+
+        return loss + 0.5 * self.C * reg, grad
 
-        return grad
+    def loss(self, coef, ev, sc, n_objects):
+        """
+        loss function to optimize
+
+        Only estimated scores of events are computed, and no gradients are.
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        sc : array_like, shape(n_events,), dtype=float
+            target scores
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+
+        Returns
+        -------
+        loss : float
+            value of loss function
+        """
+
+        buf = self._get_buffers(ev, n_objects)
+        esc = self._get_estimates(coef, ev, buf)
+
+        return (self._get_loss_term(esc, sc, buf) +
+                0.5 * self.C * self._get_regularizer(coef))
+
+    def grad_loss(self, coef, ev, sc, n_objects):
+        """
+        gradient of loss function
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        sc : array_like, shape(n_events,), dtype=float
+            target scores
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+
+        Returns
+        -------
+        grad : array_like, shape=coef.shape
+            the first gradient of loss function by coef
+        """
+
+        return self.loss_and_grad(coef, ev, sc, n_objects)[1]
 
     def fit(self, data, event_index=(0, 1)):
         """
@@ -343,7 +428,12 @@ class LogisticPMF(BaseExplicitItemFinder):
 
         # check optimization parameters
         optimizer_kwargs = self.optimizer_kwargs.copy()
-        optimizer_method = optimizer_kwargs.pop('method', 'CG')
+        if self.solver == 'minimize':
+            optimizer_method = optimizer_kwargs.pop('method', 'CG')
+        elif self.solver == 'sgd':
+            optimizer_method = 'sgd'
+        else:
+            raise ValueError("Invalid solver: {0!s}".format(self.solver))
 
         # get initial loss
         self.fit_results_['initial_loss'] = self.loss(
@@ -352,13 +442,17 @@ class LogisticPMF(BaseExplicitItemFinder):
         # optimize model
         # fmin_bfgs is slow for large data, maybe because due to the
         # computation cost for the Hessian matrices.
-        res = minimize(
-            fun=self.loss,
-            x0=self._coef,
-            args=(ev, sc, n_objects),
-            method=optimizer_method,
-            jac=self.grad_loss,
-            **optimizer_kwargs)
+        if self.solver == 'sgd':
+            res = self._optimize_sgd(ev, sc, n_objects, **optimizer_kwargs)
+            self.fit_results_['epoch_losses'] = res.epoch_losses
+        else:
+            res = minimize(
+                fun=self.loss_and_grad,
+                x0=self._coef,
+                args=(ev, sc, n_objects),
+                method=optimizer_method,
+                jac=True,
+                **optimizer_kwargs)
 
         # get parameters
         self._coef[:] = res.x
@@ -391,6 +485,7 @@ class LogisticPMF(BaseExplicitItemFinder):
         self.remove_data()
         self._coef = None
         self._dt = None
+        self._buffers = None
         self._reg = 1.0
 
     def raw_predict(self, ev):
@@ -524,6 +619,7 @@ class ImplicitLogisticPMF(BaseImplicitItemFinder):
         # private instance variables
         self._coef = None
         self._dt = None
+        self._buffers = None
 
     def _init_coef(self, ev, n_objects):
         """
@@ -571,9 +667,42 @@ class ImplicitLogisticPMF(BaseImplicitItemFinder):
         self.p_[0:n_users, :] = (self._rng.normal(0.0, 1.0, (n_users, k)))
         self.q_[0:n_items, :] = (self._rng.normal(0.0, 1.0, (n_items, k)))
 
-    def loss(self, coef, ev, n_objects):
+    def _get_buffers(self, n_rows, n_items, dtype):
         """
-        loss function to optimize
+        Work buffers that are reused over calls of :meth:`loss_and_grad`
+
+        Parameters
+        ----------
+        n_rows : int
+            the number of users in a block
+        n_items : int
+            the number of items
+        dtype : np.dtype
+            dtype of an event array
+
+        Returns
+        -------
+        buffers : dict
+            work buffers of estimated scores, events, and logarithms of
+            scores of a block of users
+        """
+        if (self._buffers is None or
+                self._buffers['esc'].shape != (n_rows, n_items) or
+                self._buffers['evi'].dtype != dtype):
+            self._buffers = {
+                'esc': np.empty((n_rows, n_items), dtype=float),
+                'evi': np.empty((n_rows, n_items), dtype=dtype),
+                'tmp': np.empty((n_rows, n_items), dtype=float)}
+
+        return self._buffers
+
+    def _iter_estimates(self, coef, ev, n_objects):
+        """
+        Estimated scores of all pairs of users and items in blocks of users
+
+        The size of blocks is chosen so that the number of pairs does not
+        exceed :data:`BLOCK_SIZE` .  Estimates are shared by a loss function
+        and its gradient.
 
         Parameters
         ----------
@@ -584,40 +713,51 @@ class ImplicitLogisticPMF(BaseImplicitItemFinder):
         n_objects : array_like, shape(2,), dtype=int
             numbers of users and items
 
-        Returns
-        -------
-        loss : float
-            value of loss function
+        Yields
+        ------
+        blk : slice
+            users in a block
+        esc : array, shape=(n_block_users, n_items), dtype=float
+            estimated scores of a block
+        evi : array, shape=(n_block_users, n_items)
+            events of a block
+        tmp : array, shape=(n_block_users, n_items), dtype=float
+            work buffer
         """
         # constants
         n_users = n_objects[0]
-        n_events = n_objects[0] * n_objects[1]
+        n_items = n_objects[1]
+        n_rows = min(max(BLOCK_SIZE // n_items, 1), n_users)
 
-        # set array's view
+        # set input array's view
         mu = coef.view(self._dt)['mu'][0]
         bu = coef.view(self._dt)['bu'][0]
         bi = coef.view(self._dt)['bi'][0]
         p = coef.view(self._dt)['p'][0]
         q = coef.view(self._dt)['q'][0]
 
-        # loss term
-        loss = 0.0
-        for i in xrange(n_users):
-            evi = ev.getrow(i).toarray().reshape(-1)
-            esc = sigmoid(
-                mu[0] + bu[i] + bi[:] +
-                np.sum(p[i, :][np.newaxis, :] * q, axis=1))
-            loss = loss - np.sum(
-                evi * np.log(esc) + (1 - evi) * np.log(1. - esc))
-
-        # regularization term
-        reg = (np.sum(bu**2) + np.sum(bi**2) + np.sum(p**2) + np.sum(q**2))
-
-        return loss + 0.5 * self.C * reg
-
-    def grad_loss(self, coef, ev, n_objects):
+        buf = self._get_buffers(n_rows, n_items, ev.dtype)
+        for i in xrange(0, n_users, n_rows):
+            blk = slice(i, min(i + n_rows, n_users))
+            n_blk = blk.stop - blk.start
+            esc = np.dot(p[blk], q.T, out=buf['esc'][:n_blk])
+            esc += mu[0]
+            esc += bu[blk, np.newaxis]
+            esc += bi[np.newaxis, :]
+            esc = sigmoid(esc, out=esc)
+            evi = buf['evi'][:n_blk]
+            evi.fill(0)
+            ev[blk].toarray(out=evi)
+
+            yield blk, esc, evi, buf['tmp'][:n_blk]
+
+    def loss_and_grad(self, coef, ev, n_objects):
         """
-        gradient of loss function
+        loss function to optimize and its gradient
+
+        Users are processed in blocks by :meth:`_iter_estimates` , and
+        estimated scores, which are shared by a loss and its gradient, are
+        computed only once.
 
         Parameters
         ----------
@@ -630,21 +770,19 @@ class ImplicitLogisticPMF(BaseImplicitItemFinder):
 
         Returns
         -------
+        loss : float
+            value of loss function
         grad : array_like, shape=coef.shape
             the first gradient of loss function by coef
         """
-        # constants
-        n_users = n_objects[0]
-        n_events = n_objects[0] * n_objects[1]
-
         # set input array's view
-        mu = coef.view(self._dt)['mu'][0]
         bu = coef.view(self._dt)['bu'][0]
         bi = coef.view(self._dt)['bi'][0]
         p = coef.view(self._dt)['p'][0]
         q = coef.view(self._dt)['q'][0]
 
-        # create empty gradient
+        # create empty gradient.  a new array is required for each call,
+        # because optimizers may keep gradients of previous iterations.
         grad = np.zeros_like(coef)
         grad_mu = grad.view(self._dt)['mu'][0]
         grad_bu = grad.view(self._dt)['bu'][0]
@@ -652,27 +790,81 @@ class ImplicitLogisticPMF(BaseImplicitItemFinder):
         grad_p = grad.view(self._dt)['p'][0]
         grad_q = grad.view(self._dt)['q'][0]
 
-        # gradient of loss term
-        for i in xrange(n_users):
-            evi = ev.getrow(i).toarray().reshape(-1)
-            esc = sigmoid(
-                mu[0] + bu[i] + bi[:] +
-                np.sum(p[i, :][np.newaxis, :] * q, axis=1))
-            common_term = esc - evi
-
-            grad_mu[0] += np.sum(common_term)
-            grad_bu[i] = np.sum(common_term)
-            grad_bi[:] += common_term
-            grad_p[i, :] = np.sum(common_term[:, np.newaxis] * q, axis=0)
-            grad_q[:, :] += common_term[:, np.newaxis] * p[i, :][np.newaxis, :]
+        # loss term and its gradient
+        loss = 0.0
+        for blk, esc, evi, tmp in self._iter_estimates(coef, ev, n_objects):
+            loss += _cross_entropy(esc, evi, tmp)
+            common_term = np.subtract(esc, evi, out=esc)
+            grad_bu[blk] = np.sum(common_term, axis=1)
+            grad_bi += np.sum(common_term, axis=0)
+            np.dot(common_term, q, out=grad_p[blk])
+            grad_q += np.dot(common_term.T, p[blk])
+        grad_mu[0] = np.sum(grad_bu)
+
+        # regularization term and its gradient
+        reg = (np.dot(bu, bu) + np.dot(bi, bi) +
+               np.vdot(p, p) + np.vdot(q, q))
+        grad_bu += self.C * bu
+        grad_bi += self.C * bi
+        grad_p += self.C * p
+        grad_q += self.C * q
+
+        return loss + 0.5 * self.C * reg, grad
 
-        # gradient of regularization term
-        grad_bu[:] += self.C * bu
-        grad_bi[:] += self.C * bi
-        grad_p[:, :] += self.C * p
-        grad_q[:, :] += self.C * q
+    def loss(self, coef, ev, n_objects):
+        """
+        loss function to optimize
+
+        Only estimated scores are computed, and no gradients are.
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+
+        Returns
+        -------
+        loss : float
+            value of loss function
+        """
+        # set input array's view
+        bu = coef.view(self._dt)['bu'][0]
+        bi = coef.view(self._dt)['bi'][0]
+        p = coef.view(self._dt)['p'][0]
+        q = coef.view(self._dt)['q'][0]
+
+        loss = 0.0
+        for blk, esc, evi, tmp in self._iter_estimates(coef, ev, n_objects):
+            loss += _cross_entropy(esc, evi, tmp)
+        reg = (np.dot(bu, bu) + np.dot(bi, bi) +
+               np.vdot(p, p) + np.vdot(q, q))
+
+        return loss + 0.5 * self.C * reg
 
-        return grad
+    def grad_loss(self, coef, ev, n_objects):
+        """
+        gradient of loss function
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+
+        Returns
+        -------
+        grad : array_like, shape=coef.shape
+            the first gradient of loss function by coef
+        """
+
+        return self.loss_and_grad(coef, ev, n_objects)[1]
 
     def fit(self, data, event_index=(0, 1)):
         """
@@ -709,11 +901,11 @@ class ImplicitLogisticPMF(BaseImplicitItemFinder):
         # fmin_bfgs is slow for large data, maybe because due to the
         # computation cost for the Hessian matrices.
         res = minimize(
-            fun=self.loss,
+            fun=self.loss_and_grad,
             x0=self._coef,
             args=(ev, n_objects),
             method=optimizer_method,
-            jac=self.grad_loss,
+            jac=True,
             **optimizer_kwargs)
 
         # get parameters
@@ -747,6 +939,7 @@ class ImplicitLogisticPMF(BaseImplicitItemFinder):
         self.remove_data()
         self._coef = None
         self._dt = None
+        self._buffers = None
         self._reg = 1.0
 
     def raw_predict(self, ev):
@@ -781,6 +974,33 @@ class ImplicitLogisticPMF(BaseImplicitItemFinder):
 # Functions
 # =============================================================================
 
+
+def _cross_entropy(esc, sc, tmp):
+    """
+    Cross entropy of estimated scores to binary scores
+
+    Parameters
+    ----------
+    esc : array, dtype=float
+        estimated scores, which lie in (0, 1)
+    sc : array, shape=esc.shape
+        target scores, which are 0 or 1
+    tmp : array, shape=esc.shape, dtype=float
+        work buffer
+
+    Returns
+    -------
+    loss : float
+        sum of cross entropies
+    """
+    log_esc = np.log(esc, out=tmp)
+    loss = -np.vdot(sc, log_esc)
+    log_esc = np.log(np.subtract(1.0, esc, out=log_esc), out=log_esc)
+    loss -= np.sum(log_esc) - np.vdot(sc, log_esc)
+
+    return loss
+
+
 # =============================================================================
 # Module initialization
 # =============================================================================
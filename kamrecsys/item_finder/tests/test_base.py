@@ -12,6 +12,8 @@ from six.moves import xrange
 # Imports
 # =============================================================================
 
+import pickle
+
 from numpy.testing import (
     TestCase,
     run_module_suite,
@@ -134,6 +136,38 @@ class TestBaseImplicitItemFinder(TestCase):
         ev2, n_objects = rec.get_event_array('lil')
         assert_array_equal(ev, ev2.todense())
 
+        # a matrix shared with data is read-only, and it is not pickled
+        ev2, n_objects = rec.get_event_array('csr')
+        assert_(ev2 is data.to_csr('count'))
+        assert_(not ev2.data.flags.writeable)
+        rec2 = pickle.loads(pickle.dumps(rec))
+        self.assertIsNone(rec2._event_array)
+        ev2, n_objects = rec2.get_event_array('array')
+        assert_array_equal(ev, ev2)
+
+        # remove_data
+        rec.remove_data()
+        self.assertIsNone(rec._event_array)
+
+    def test_refit(self):
+        from kamrecsys.data import EventData
+
+        rec = ImplicitItemFinder()
+        data = EventData()
+        data.set_event(np.array([[1, 10], [2, 20], [1, 20]]))
+        rec.fit(data)
+        ev, n_objects = rec.get_event_array('array')
+        assert_array_equal(ev, [[1, 1], [0, 1]])
+
+        # a matrix of the second data is used
+        data2 = EventData()
+        data2.set_event(np.array([[1, 10], [2, 10], [3, 30], [3, 30]]))
+        rec.fit(data2)
+        ev, n_objects = rec.get_event_array('csr')
+        assert_(ev is data2.to_csr('count'))
+        assert_array_equal(ev.toarray(), [[1, 0], [1, 0], [0, 2]])
+        assert_array_equal(n_objects, [3, 2])
+
 
 # =============================================================================
 # Main Routine
@@ -257,6 +257,106 @@ class TestLogisticPMF(TestCase):
             [0.2059342372, 0.0799797513, 6.2829547023, 2.0899854785],
             rtol=1e-5)
 
+    def test_loss_and_grad(self):
+        from scipy.optimize import check_grad
+        from kamrecsys.datasets import make_synthetic_events
+        import kamrecsys.base.matrix_factorization as mf
+
+        data = make_synthetic_events(
+            n_users=30, n_items=20, n_events=200, score_type='binary',
+            random_state=1234)
+        ev = data.event
+        sc = data.score
+        n_objects = data.n_objects
+        rec = LogisticPMF(C=0.1, k=2, random_state=1234)
+        rec._rng = check_random_state(rec.random_state)
+        rec._init_coef(ev, sc, n_objects)
+        coef = rec._coef
+
+        # loss is computed as defined
+        loss, grad = rec.loss_and_grad(coef, ev, sc, n_objects)
+        esc = 1 / (1 + np.exp(-(
+            rec.mu_[0] + rec.bu_[ev[:, 0]] + rec.bi_[ev[:, 1]] +
+            np.sum(rec.p_[ev[:, 0]] * rec.q_[ev[:, 1]], axis=1))))
+        assert_allclose(
+            loss,
+            -np.sum(sc * np.log(esc) + (1 - sc) * np.log(1 - esc)) +
+            0.05 * np.sum(coef[1:] ** 2),
+            rtol=1e-12)
+        assert_allclose(loss, rec.loss(coef, ev, sc, n_objects), rtol=1e-12)
+        assert_allclose(grad, rec.grad_loss(coef, ev, sc, n_objects),
+                        rtol=1e-12)
+
+        # gradient
+        assert_array_less(
+            check_grad(rec.loss, rec.grad_loss, coef, ev, sc, n_objects),
+            1e-4 * np.linalg.norm(grad))
+
+        # work buffers are reused, but gradients are not
+        grad2 = rec.loss_and_grad(coef, ev, sc, n_objects)[1]
+        self.assertIsNot(grad2, grad)
+        assert_array_equal(grad2, grad)
+
+        # results do not depend on the size of chunks
+        chunk_size = mf.CHUNK_SIZE
+        try:
+            mf.CHUNK_SIZE = 7 * rec.k
+            rec._buffers = None
+            loss2, grad2 = rec.loss_and_grad(coef, ev, sc, n_objects)
+        finally:
+            mf.CHUNK_SIZE = chunk_size
+        assert_allclose(loss2, loss, rtol=1e-12)
+        assert_allclose(grad2, grad, rtol=1e-12, atol=1e-12)
+
+    def test_sgd(self):
+        from kamrecsys.datasets import make_synthetic_events
+
+        data = make_synthetic_events(
+            n_users=60, n_items=40, n_events=1000, score_type='binary',
+            random_state=1234)
+        ev = data.event
+        sc = data.score
+        n_objects = data.n_objects
+
+        # a gradient of a full batch
+        rec = LogisticPMF(C=0.1, k=2, random_state=1234)
+        rec._rng = check_random_state(rec.random_state)
+        rec._init_coef(ev, sc, n_objects)
+        n_object_events = (np.bincount(ev[:, 0]), np.bincount(ev[:, 1]))
+        index, grad = rec._grad_batch(
+            rec._coef, np.arange(1000), ev, sc, n_objects, n_object_events)
+        assert_array_equal(np.sort(index), np.arange(rec._coef.shape[0]))
+        assert_allclose(
+            grad, rec.grad_loss(rec._coef, ev, sc, n_objects)[index] / 1000,
+            rtol=1e-10, atol=1e-14)
+
+        # fitting
+        rec1 = LogisticPMF(C=1.0, k=2, random_state=1234)
+        rec1.fit(data)
+        rec2 = LogisticPMF(C=1.0, k=2, random_state=1234, solver='sgd',
+                           n_epochs=30, batch_size=64, eta0=0.02)
+        rec2.fit(data)
+        assert_equal(sorted(rec2.fit_results_.keys()),
+                     sorted(list(rec1.fit_results_.keys()) +
+                            ['epoch_losses']))
+        assert_equal(len(rec2.fit_results_['epoch_losses']), 30)
+        assert_allclose(rec2.fit_results_['final_loss'],
+                        rec1.fit_results_['final_loss'], rtol=2e-2)
+
+        # maxiter is the number of epochs
+        rec3 = LogisticPMF(C=1.0, k=2, random_state=1234, solver='sgd',
+                           maxiter=3)
+        rec3.fit(data)
+        assert_equal(len(rec3.fit_results_['epoch_losses']), 3)
+
+        # errors
+        with assert_raises(ValueError):
+            LogisticPMF(solver='als').fit(data)
+        with assert_raises(ValueError):
+            LogisticPMF(solver='sgd', method='CG').fit(data)
+        with assert_raises(ValueError):
+            LogisticPMF(solver='sgd', gtol=1e-3).fit(data)
+
     def test_class(self):
 
         data = load_movielens_mini()
@@ -519,6 +619,53 @@ class TestImplicitLogisticPMF(TestCase):
             [13.3258685412, 4.0799595873, 17.0428870887, 5.0899652997],
             rtol=1e-5)
 
+    def test_loss_and_grad(self):
+        from scipy.optimize import check_grad
+        from kamrecsys.datasets import make_synthetic_events
+        import kamrecsys.item_finder.matrix_factorization as mf
+
+        data = make_synthetic_events(
+            n_users=30, n_items=20, n_events=200, score_type='implicit',
+            random_state=1234)
+        n_objects = data.n_objects
+        ev = sparse.coo_matrix(
+            (np.ones(data.n_events, dtype=int),
+             (data.event[:, 0], data.event[:, 1])), shape=n_objects)
+        ev = ev.tocsr()
+        rec = ImplicitLogisticPMF(C=0.1, k=2, random_state=1234)
+        rec._rng = check_random_state(rec.random_state)
+        rec._init_coef(ev, n_objects)
+        coef = rec._coef
+
+        # loss is computed as defined
+        loss, grad = rec.loss_and_grad(coef, ev, n_objects)
+        esc = 1 / (1 + np.exp(-(
+            rec.mu_[0] + rec.bu_[:, np.newaxis] + rec.bi_[np.newaxis, :] +
+            np.dot(rec.p_, rec.q_.T))))
+        evi = ev.toarray()
+        assert_allclose(
+            loss,
+            -np.sum(evi * np.log(esc) + (1 - evi) * np.log(1 - esc)) +
+            0.05 * np.sum(coef[1:] ** 2),
+            rtol=1e-12)
+        assert_allclose(grad, rec.grad_loss(coef, ev, n_objects),
+                        rtol=1e-12)
+
+        # gradient
+        assert_array_less(
+            check_grad(rec.loss, rec.grad_loss, coef, ev, n_objects),
+            1e-4 * np.linalg.norm(grad))
+
+        # results do not depend on the size of blocks
+        block_size = mf.BLOCK_SIZE
+        try:
+            mf.BLOCK_SIZE = 7 * n_objects[1]
+            loss2, grad2 = rec.loss_and_grad(coef, ev, n_objects)
+        finally:
+            mf.BLOCK_SIZE = block_size
+        assert_allclose(loss2, loss, rtol=1e-12)
+        assert_allclose(grad2, grad, rtol=1e-12, atol=1e-12)
+
     def test_class(self):
 
         # setup
@@ -26,6 +26,8 @@ from sklearn.model_selection import (
     BaseCrossValidator, PredefinedSplit, train_test_split, KFold)
 #from sklearn.model_selection._split import _validate_shuffle_split_init
 
+from ..utils import gen_group_index
+
 # =============================================================================
 # Metadata variables
 # =============================================================================
@@ -147,17 +149,17 @@ class ShuffleSplitWithinGroups(BaseCrossValidator):
             groups = np.zeros(n_samples, dtype=int)
 
         # constants
-        indices = np.arange(n_samples, dtype=int)
         test_fold = np.empty(n_samples, dtype=bool)
         rng = check_random_state(self.random_state)
-        group_indices = np.unique(groups)
+        group_indices, groups = np.unique(groups, return_inverse=True)
+        offsets, order = gen_group_index(groups, group_indices.shape[0])
 
         # generate training and test splits
         for fold in xrange(self.n_splits):
             test_fold[:] = False
             for i, g in enumerate(group_indices):
                 train_i, test_i = train_test_split(
-                    indices[groups == g],
+                    order[offsets[i]:offsets[i + 1]],
                     test_size=self.test_size, train_size=self.train_size,
                     shuffle=self.shuffle, random_state=rng)
                 test_fold[test_i] = True
@@ -277,16 +279,16 @@ class KFoldWithinGroups(BaseCrossValidator):
             groups = np.zeros(n_samples, dtype=int)
 
         # constants
-        indices = np.arange(n_samples)
         test_fold = np.empty(n_samples, dtype=bool)
         rng = check_random_state(self.random_state)
-        group_indices = np.unique(groups)
+        group_indices, groups = np.unique(groups, return_inverse=True)
+        offsets, order = gen_group_index(groups, group_indices.shape[0])
         iters = np.empty(group_indices.shape[0], dtype=object)
 
         # generate iterators
         cv = KFold(self.n_splits, self.shuffle, rng)
         for i, g in enumerate(group_indices):
-            group_member = indices[groups == g]
+            group_member = order[offsets[i]:offsets[i + 1]]
             iters[i] = cv.split(group_member)
 
         # generate training and test splits
@@ -294,7 +296,8 @@ class KFoldWithinGroups(BaseCrossValidator):
             test_fold[:] = False
             for i, g in enumerate(group_indices):
                 group_train_i, group_test_i = next(iters[i])
-                test_fold[indices[groups == g][group_test_i]] = True
+                test_fold[
+                    order[offsets[i]:offsets[i + 1]][group_test_i]] = True
             yield test_fold
 
     def get_n_splits(self, X=None, y=None, groups=None):
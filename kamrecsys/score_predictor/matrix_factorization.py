@@ -19,12 +19,17 @@ from six.moves import xrange
 # =============================================================================
 
 import logging
+import multiprocessing
 import sys
+from multiprocessing.pool import ThreadPool
+
 import numpy as np
-from scipy.optimize import minimize
+from scipy.optimize import minimize, OptimizeResult
 from sklearn.utils import check_random_state
 
 from . import BaseScorePredictor
+from ..base import MatrixFactorizationMixin
+from ..utils import get_fit_status_message
 
 # =============================================================================
 # Public symbols
@@ -36,6 +41,13 @@ __all__ = []
 # Constants
 # =============================================================================
 
+# the number of elements of Gram matrices of objects solved at once
+GRAM_BLOCK_SIZE = 1 << 20
+
+# default maximum number of iterations and tolerance of the ALS solver
+ALS_MAXITER = 50
+ALS_TOL = 1e-6
+
 # =============================================================================
 # Module variables
 # =============================================================================
@@ -45,7 +57,7 @@ __all__ = []
 # =============================================================================
 
 
-class PMF(BaseScorePredictor):
+class PMF(BaseScorePredictor, MatrixFactorizationMixin):
     """
     A probabilistic matrix factorization model proposed in [1]_.
     A method of handling bias terms is defined by equation (5) in [2]_.
@@ -57,8 +69,25 @@ class PMF(BaseScorePredictor):
     k : int, optional
         the number of latent factors (= sizes of :math:`\mathbf{p}_u` or
         :math:`\mathbf{q}_i`), default=1
+    solver : {'minimize', 'als', 'sgd'}, optional
+        if 'minimize', all parameters are jointly optimized by
+        :func:`scipy.optimize.minimize` .  if 'als', alternating least
+        squares is used.  if 'sgd', mini-batch stochastic gradient descent
+        by :func:`kamrecsys.utils.minimize_sgd` is used.  default='minimize'
+    n_jobs : int, optional
+        the number of threads used by the 'als' solver.  if -1, all CPUs
+        are used.  default=None
     optimizer_kwargs : keyword arguments, optional
-        keyword arguments passed to optimizer
+        keyword arguments passed to optimizer.  the 'minimize' solver passes
+        them to :func:`scipy.optimize.minimize` , and its `method` is 'CG' by
+        default.  the 'als' solver accepts only `maxiter` (default=50) and
+        `tol` (default=1e-6), which is a tolerance of relative changes of a
+        loss.  the 'sgd' solver accepts `maxiter` , which is the number of
+        epochs, and arguments of :func:`kamrecsys.utils.minimize_sgd` :
+        `n_epochs` , `batch_size` , `learning_rate` , `eta0` , `decay` ,
+        `beta1` , `beta2` , `epsilon` , and `tol` .  :meth:`fit` raises
+        ValueError if the other arguments are passed to the 'als' or 'sgd'
+        solver.
 
     Attributes
     ----------
@@ -99,6 +128,19 @@ class PMF(BaseScorePredictor):
     events, and a regularization term is scaled by the number of model
     parameters.
 
+    The 'als' solver alternately updates biases and latent factors of
+    users and those of items.  Because the loss is quadratic in parameters
+    of one side if those of the other side are fixed, parameters of each
+    object are obtained by solving a ridge regression, and these problems
+    are solved in batches of objects.  A global bias is updated after each
+    pair of updates.
+
+    The 'sgd' solver minimizes a loss divided by the number of events.  A
+    regularization term of an object is distributed over its events, so
+    that each step updates only parameters of users and items in a
+    mini-batch.  Losses after each epoch are stored in
+    ``fit_results_['epoch_losses']`` .
+
     References
     ----------
     .. [1] R. Salakhutdinov and A. Mnih. "Probabilistic matrix factorization"
@@ -107,7 +149,9 @@ class PMF(BaseScorePredictor):
         Collaborative Filtering Model", KDD2008
     """
 
-    def __init__(self, C=1.0, k=1, random_state=None, **optimizer_kwargs):
+    def __init__(
+            self, C=1.0, k=1, random_state=None, solver='minimize',
+            n_jobs=None, **optimizer_kwargs):
         super(PMF, self).__init__(random_state=random_state)
 
         # model hyper-parameter
@@ -115,6 +159,8 @@ class PMF(BaseScorePredictor):
         self.k = int(k)
 
         # optimizer parameter
+        self.solver = solver
+        self.n_jobs = n_jobs
         self.optimizer_kwargs = optimizer_kwargs
         self.optimizer_kwargs['options'] = (
             self.optimizer_kwargs.get('options', {}))
@@ -138,6 +184,7 @@ class PMF(BaseScorePredictor):
         # private instance variables
         self._coef = None
         self._dt = None
+        self._buffers = None
 
     def _init_coef(self, ev, sc, n_objects):
         """
@@ -179,36 +226,32 @@ class PMF(BaseScorePredictor):
         self.q_ = self._coef.view(self._dt)['q'][0]
 
         # set bias term
-        self.mu_[0] = np.sum(sc) / n_events
-        for i in xrange(n_users):
-            j = np.nonzero(ev[:, 0] == i)[0]
-            if len(j) > 0:
-                self.bu_[i] = np.sum(sc[j] - self.mu_[0]) / len(j)
-        for i in xrange(n_items):
-            j = np.nonzero(ev[:, 1] == i)[0]
-            if len(j) > 0:
-                self.bi_[i] = (
-                    np.sum(sc[j] - (self.mu_[0] + self.bu_[ev[j, 0]])) /
-                    len(j))
+        # scores are accumulated in float64 even if they are stored in float32
+        self.mu_[0] = np.sum(sc, dtype=float) / n_events
+        # biases are means of residuals over events of each object
+        res = sc - self.mu_[0]
+        n_user_events = np.bincount(ev[:, 0], minlength=n_users)
+        np.divide(np.bincount(ev[:, 0], weights=res, minlength=n_users),
+                  n_user_events, out=self.bu_, where=n_user_events > 0)
+        res = sc - (self.mu_[0] + self.bu_[ev[:, 0]])
+        n_item_events = np.bincount(ev[:, 1], minlength=n_items)
+        np.divide(np.bincount(ev[:, 1], weights=res, minlength=n_items),
+                  n_item_events, out=self.bi_, where=n_item_events > 0)
 
         # fill cross terms by normal randoms whose s.d.'s are mean residuals
-        var = 0.0
-        for i in xrange(n_events):
-            var += (
-                (sc[i] -
-                 (self.mu_[0] + self.bu_[ev[i, 0]] + self.bi_[ev[i, 1]])) ** 2)
-        var /= n_events
-
-        mask = np.bincount(ev[:, 0], minlength=n_users).nonzero()[0]
+        res = sc - (self.mu_[0] + self.bu_[ev[:, 0]] + self.bi_[ev[:, 1]])
+        var = np.dot(res, res) / n_events
+
+        mask = n_user_events.nonzero()[0]
         self.p_[mask, :] = (
             self._rng.normal(0.0, np.sqrt(var), (len(mask), k)))
-        mask = np.bincount(ev[:, 1], minlength=n_items).nonzero()[0]
+        mask = n_item_events.nonzero()[0]
         self.q_[mask, :] = (
             self._rng.normal(0.0, np.sqrt(var), (len(mask), k)))
 
-    def loss(self, coef, ev, sc, n_objects):
+    def _get_neg_residuals(self, coef, ev, sc, buf):
         """
-        loss function to optimize
+        Estimated scores minus target scores of events
 
         Parameters
         ----------
@@ -218,35 +261,26 @@ class PMF(BaseScorePredictor):
             user and item indexes
         sc : array_like, shape(n_events,), dtype=float
             target scores
-        n_objects : array_like, shape(2,), dtype=int
-            numbers of users and items
+        buf : dict
+            work buffers returned by :meth:`_get_buffers`
 
         Returns
         -------
-        loss : float
-            value of loss function
+        neg_res : array, shape=(n_events,), dtype=float
+            negative residuals, which are stored in ``buf['esc']``
         """
+        neg_res = self._get_estimates(coef, ev, buf)
+        neg_res -= sc
 
-        # set array's view
-        mu = coef.view(self._dt)['mu'][0]
-        bu = coef.view(self._dt)['bu'][0]
-        bi = coef.view(self._dt)['bi'][0]
-        p = coef.view(self._dt)['p'][0]
-        q = coef.view(self._dt)['q'][0]
-
-        # loss term
-        esc = (mu[0] + bu[ev[:, 0]] + bi[ev[:, 1]] +
-               np.sum(p[ev[:, 0], :] * q[ev[:, 1], :], axis=1))
-        loss = np.sum((sc - esc)**2)
-
-        # regularization term
-        reg = (np.sum(bu**2) + np.sum(bi**2) + np.sum(p**2) + np.sum(q**2))
+        return neg_res
 
-        return 0.5 * loss + 0.5 * self.C * reg
-
-    def grad_loss(self, coef, ev, sc, n_objects):
+    def loss_and_grad(self, coef, ev, sc, n_objects):
         """
-        gradient of loss function
+        loss function to optimize and its gradient
+
+        Residuals of events, which are shared by a loss and its gradient,
+        are computed only once, and gradients of latent factors are computed
+        as products of a sparse matrix of residuals and latent factors.
 
         Parameters
         ----------
@@ -261,6 +295,8 @@ class PMF(BaseScorePredictor):
 
         Returns
         -------
+        loss : float
+            value of loss function
         grad : array_like, shape=coef.shape
             the first gradient of loss function by coef
         """
@@ -270,14 +306,20 @@ class PMF(BaseScorePredictor):
         n_items = n_objects[1]
 
         # set input array's view
-        mu = coef.view(self._dt)['mu'][0]
         bu = coef.view(self._dt)['bu'][0]
         bi = coef.view(self._dt)['bi'][0]
         p = coef.view(self._dt)['p'][0]
         q = coef.view(self._dt)['q'][0]
 
-        # create empty gradient
-        grad = np.zeros_like(coef)
+        # loss term and regularization term
+        buf = self._get_buffers(ev, n_objects)
+        neg_res = self._get_neg_residuals(coef, ev, sc, buf)
+        loss = np.dot(neg_res, neg_res)
+        reg = self._get_regularizer(coef)
+
+        # create empty gradient.  a new array is required for each call,
+        # because optimizers may keep gradients of previous iterations.
+        grad = np.empty_like(coef)
         grad_mu = grad.view(self._dt)['mu'][0]
         grad_bu = grad.view(self._dt)['bu'][0]
         grad_bi = grad.view(self._dt)['bi'][0]
@@ -285,29 +327,240 @@ class PMF(BaseScorePredictor):
         grad_q = grad.view(self._dt)['q'][0]
 
         # gradient of loss term
-        neg_res = -(sc - (mu[0] + bu[ev[:, 0]] + bi[ev[:, 1]] +
-                          np.sum(p[ev[:, 0], :] * q[ev[:, 1], :], axis=1)))
         grad_mu[0] = np.sum(neg_res)
         grad_bu[:] = np.bincount(
             ev[:, 0], weights=neg_res, minlength=n_users)
         grad_bi[:] = np.bincount(
             ev[:, 1], weights=neg_res, minlength=n_items)
-        weights = neg_res[:, np.newaxis] * q[ev[:, 1], :]
-        for i in xrange(self.k):
-            grad_p[:, i] = np.bincount(
-                ev[:, 0], weights=weights[:, i], minlength=n_users)
-        weights = neg_res[:, np.newaxis] * p[ev[:, 0], :]
-        for i in xrange(self.k):
-            grad_q[:, i] = np.bincount(
-                ev[:, 1], weights=weights[:, i], minlength=n_items)
+        res = buf['res']
+        np.take(neg_res, buf['order'], out=res.data)
+        grad_p[:, :] = res.dot(q)
+        grad_q[:, :] = res.T.dot(p)
 
         # gradient of regularization term
-        grad_bu[:] += self.C * bu
-        grad_bi[:] += self.C * bi
-        grad_p[:, :] += self.C * p
-        grad_q[:, :] += self.C * q
+        grad_bu += self.C * bu
+        grad_bi += self.C * bi
+        grad_p += self.C * p
+        grad_q += self.C * q
 
-        return grad
+        return 0.5 * loss + 0.5 * self.C * reg, grad
+
+    def loss(self, coef, ev, sc, n_objects):
+        """
+        loss function to optimize
+
+        Only residuals of events are computed, and no gradients are.
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        sc : array_like, shape(n_events,), dtype=float
+            target scores
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+
+        Returns
+        -------
+        loss : float
+            value of loss function
+        """
+
+        buf = self._get_buffers(ev, n_objects)
+        neg_res = self._get_neg_residuals(coef, ev, sc, buf)
+
+        return (0.5 * np.dot(neg_res, neg_res) +
+                0.5 * self.C * self._get_regularizer(coef))
+
+    def grad_loss(self, coef, ev, sc, n_objects):
+        """
+        gradient of loss function
+
+        Parameters
+        ----------
+        coef : array_like, shape=(variable,)
+            coefficients of this model
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        sc : array_like, shape(n_events,), dtype=float
+            target scores
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+
+        Returns
+        -------
+        grad : array_like, shape=coef.shape
+            the first gradient of loss function by coef
+        """
+
+        return self.loss_and_grad(coef, ev, sc, n_objects)[1]
+
+    def _solve_als(self, x, index, target, indptr, pool):
+        """
+        Solve ridge regressions of all objects of one side
+
+        Objects are split into blocks, each of which is solved by
+        :func:`_solve_ridge` , and blocks are processed by `pool` if
+        specified.
+
+        Parameters
+        ----------
+        x : array, shape=(n_others, k + 1), dtype=float
+            features of objects of the other side
+        index : array, shape=(n_events,), dtype=int
+            objects of the other side of events, sorted by objects to solve
+        target : array, shape=(n_events,), dtype=float
+            target values of events, sorted in the same order as `index`
+        indptr : array, shape=(n_objects + 1,), dtype=int
+            events of the j-th object are in ``[indptr[j], indptr[j + 1])``
+        pool : ThreadPool or None
+            thread pool
+
+        Returns
+        -------
+        w : array, shape=(n_objects, k + 1), dtype=float
+            a bias and latent factors of each object
+        """
+        n_objects = indptr.shape[0] - 1
+        n_features = x.shape[1]
+        w = np.empty((n_objects, n_features), dtype=float)
+        step = max(GRAM_BLOCK_SIZE // (n_features * n_features), 1)
+
+        def solve_block(start):
+            end = min(start + step, n_objects)
+            w[start:end] = _solve_ridge(
+                x, index, target, indptr[start:end + 1], self.C)
+
+        starts = list(xrange(0, n_objects, step))
+        if pool is None:
+            for start in starts:
+                solve_block(start)
+        else:
+            pool.map(solve_block, starts)
+
+        return w
+
+    def _optimize_als(self, ev, sc, n_objects, tol=None, options=None,
+                      **kwargs):
+        """
+        Optimize model parameters by alternating least squares
+
+        Parameters
+        ----------
+        ev : array_like, shape(n_events, 2), dtype=int
+            user and item indexes
+        sc : array_like, shape(n_events,), dtype=float
+            target scores
+        n_objects : array_like, shape(2,), dtype=int
+            numbers of users and items
+        tol : optional, float
+            tolerance of relative changes of a loss
+        options : optional, dict
+            `maxiter` is the maximum number of iterations, and `disp` is
+            ignored.
+        kwargs : keyword arguments
+            no other arguments are accepted
+
+        Returns
+        -------
+        res : OptimizeResult
+            results in the same format as :func:`scipy.optimize.minimize`
+
+        Raises
+        ------
+        ValueError
+            if unsupported arguments or options are specified
+        """
+        if kwargs:
+            raise ValueError(
+                "Invalid arguments of the 'als' solver: " +
+                ", ".join(sorted(kwargs)))
+        options = {} if options is None else options
+        invalid = sorted(set(options) - {'maxiter', 'disp'})
+        if invalid:
+            raise ValueError(
+                "Invalid options of the 'als' solver: " + ", ".join(invalid))
+
+        # constants
+        n_events = ev.shape[0]
+        n_users = n_objects[0]
+        n_items = n_objects[1]
+        maxiter = options.get('maxiter', ALS_MAXITER)
+        tol = ALS_TOL if tol is None else tol
+        n_jobs = self.n_jobs
+        if n_jobs is not None and n_jobs < 0:
+            n_jobs = multiprocessing.cpu_count()
+
+        # events sorted by users and by items
+        user_order = np.argsort(ev[:, 0], kind='mergesort')
+        user_indptr = np.zeros(n_users + 1, dtype=int)
+        np.cumsum(np.bincount(ev[:, 0], minlength=n_users),
+                  out=user_indptr[1:])
+        user_index = ev[user_order, 1]
+        user_sc = sc[user_order]
+        item_order = np.argsort(ev[:, 1], kind='mergesort')
+        item_indptr = np.zeros(n_items + 1, dtype=int)
+        np.cumsum(np.bincount(ev[:, 1], minlength=n_items),
+                  out=item_indptr[1:])
+        item_index = ev[item_order, 0]
+        item_sc = sc[item_order]
+
+        # features of objects, a constant for biases and latent factors
+        x = np.ones((max(n_users, n_items), self.k + 1), dtype=float)
+
+        buf = self._get_buffers(ev, n_objects)
+        pool = None if n_jobs is None or n_jobs <= 1 else ThreadPool(n_jobs)
+        try:
+            pre_loss = self.loss(self._coef, ev, sc, n_objects)
+            cur_loss = pre_loss
+            status = 2
+            for iter_no in xrange(maxiter):
+                # users
+                x[:n_items, 1:] = self.q_
+                w = self._solve_als(
+                    x[:n_items], user_index,
+                    user_sc - (self.mu_[0] + self.bi_[user_index]),
+                    user_indptr, pool)
+                self.bu_[:] = w[:, 0]
+                self.p_[:, :] = w[:, 1:]
+
+                # items
+                x[:n_users, 1:] = self.p_
+                w = self._solve_als(
+                    x[:n_users], item_index,
+                    item_sc - (self.mu_[0] + self.bu_[item_index]),
+                    item_indptr, pool)
+                self.bi_[:] = w[:, 0]
+                self.q_[:, :] = w[:, 1:]
+
+                # global bias, and loss
+                neg_res = self._get_neg_residuals(self._coef, ev, sc, buf)
+                shift = np.sum(neg_res) / n_events
+                self.mu_[0] -= shift
+                cur_loss = (
+                    0.5 * (np.dot(neg_res, neg_res) - n_events * shift ** 2) +
+                    0.5 * self.C * self._get_regularizer(self._coef))
+                logger.info("iter {:d}: {:.15g}".format(iter_no + 1, cur_loss))
+
+                precision = np.abs(cur_loss - pre_loss) / max(
+                    np.abs(cur_loss), np.finfo(float).eps)
+                pre_loss = cur_loss
+                if precision < tol:
+                    status = 0
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        n_iterations = iter_no + 1 if maxiter > 0 else 0
+
+        return OptimizeResult(
+            x=self._coef, fun=cur_loss, success=(status == 0),
+            status=status, message=get_fit_status_message(status),
+            nit=n_iterations, nfev=n_iterations + 1, njev=0)
 
     def fit(self, data, event_index=(0, 1)):
         """
@@ -335,7 +588,12 @@ class PMF(BaseScorePredictor):
 
         # check optimization parameters
         optimizer_kwargs = self.optimizer_kwargs.copy()
-        optimizer_method = optimizer_kwargs.pop('method', 'CG')
+        if self.solver == 'minimize':
+            optimizer_method = optimizer_kwargs.pop('method', 'CG')
+        elif self.solver in ('als', 'sgd'):
+            optimizer_method = self.solver
+        else:
+            raise ValueError("Invalid solver: {0!s}".format(self.solver))
 
         # get initial loss
         self.fit_results_['initial_loss'] = self.loss(
@@ -344,13 +602,19 @@ class PMF(BaseScorePredictor):
         # optimize model
         # fmin_bfgs is slow for large data, maybe because due to the
         # computation cost for the Hessian matrices.
-        res = minimize(
-            fun=self.loss,
-            x0=self._coef,
-            args=(ev, sc, n_objects),
-            method=optimizer_method,
-            jac=self.grad_loss,
-            **optimizer_kwargs)
+        if self.solver == 'als':
+            res = self._optimize_als(ev, sc, n_objects, **optimizer_kwargs)
+        elif self.solver == 'sgd':
+            res = self._optimize_sgd(ev, sc, n_objects, **optimizer_kwargs)
+            self.fit_results_['epoch_losses'] = res.epoch_losses
+        else:
+            res = minimize(
+                fun=self.loss_and_grad,
+                x0=self._coef,
+                args=(ev, sc, n_objects),
+                method=optimizer_method,
+                jac=True,
+                **optimizer_kwargs)
 
         # get parameters
         self._coef[:] = res.x
@@ -383,6 +647,7 @@ class PMF(BaseScorePredictor):
         self.remove_data()
         self._coef = None
         self._dt = None
+        self._buffers = None
         self._reg = 1.0
 
     def raw_predict(self, ev):
@@ -415,6 +680,71 @@ class PMF(BaseScorePredictor):
 # Functions
 # =============================================================================
 
+
+def _solve_ridge(x, index, target, indptr, C):
+    """
+    Solve ridge regressions of objects whose events are stored contiguously
+
+    Objects are grouped by the numbers of their events rounded up to powers
+    of two.  Events of objects in a group are padded by zero rows to the
+    same length, and their Gram matrices are computed by one batched matrix
+    product, so that the padding at most doubles the work.
+
+    Parameters
+    ----------
+    x : array, shape=(n_others, n_features), dtype=float
+        features of objects of the other side
+    index : array, shape=(n_events,), dtype=int
+        objects of the other side of events
+    target : array, shape=(n_events,), dtype=float
+        target values of events
+    indptr : array, shape=(n_objects + 1,), dtype=int
+        events of the j-th object are in ``[indptr[j], indptr[j + 1])``
+    C : float
+        regularization parameter
+
+    Returns
+    -------
+    w : array, shape=(n_objects, n_features), dtype=float
+        coefficients of objects.  those of objects without events are zeros.
+    """
+    n_objects = indptr.shape[0] - 1
+    n_features = x.shape[1]
+    n_obj_events = np.diff(indptr)
+    nonempty = n_obj_events > 0
+    length = np.zeros(n_objects, dtype=int)
+    length[nonempty] = 1 << np.ceil(
+        np.log2(n_obj_events[nonempty])).astype(int)
+
+    # normal equations
+    a = np.zeros((n_objects, n_features, n_features), dtype=float)
+    b = np.zeros((n_objects, n_features), dtype=float)
+    for n_rows in np.unique(length[nonempty]):
+        objs = np.flatnonzero(length == n_rows)
+        if n_rows > n_features:
+            # products dominate the overhead of a loop, and are not padded
+            for j in objs:
+                xs = x[index[indptr[j]:indptr[j + 1]]]
+                np.dot(xs.T, xs, out=a[j])
+                np.dot(target[indptr[j]:indptr[j + 1]], xs, out=b[j])
+            continue
+        step = max(GRAM_BLOCK_SIZE // (n_rows * n_features), 1)
+        for i in xrange(0, objs.shape[0], step):
+            obj = objs[i:i + step]
+            pos = indptr[obj, np.newaxis] + np.arange(n_rows)
+            mask = pos < indptr[obj + 1, np.newaxis]
+            pos = np.where(mask, pos, indptr[obj, np.newaxis])
+            xs = x[index[pos]]
+            xs *= mask[:, :, np.newaxis]
+            a[obj] = np.matmul(xs.transpose(0, 2, 1), xs)
+            b[obj] = np.matmul(target[pos][:, np.newaxis, :], xs)[:, 0]
+    a[~nonempty] = np.identity(n_features)
+    diag = np.arange(n_features)
+    a[:, diag, diag] += C
+
+    return np.linalg.solve(a, b[:, :, np.newaxis])[:, :, 0]
+
+
 # =============================================================================
 # Module initialization
 # =============================================================================
@@ -114,6 +114,38 @@ class TestPMF(TestCase):
             rec.loss(rec._coef, ev, sc, n_objects), 947.15920616,
             rtol=1e-5)
 
+    def test_init_coef(self):
+        from kamrecsys.datasets import make_synthetic_events
+
+        data = make_synthetic_events(
+            n_users=30, n_items=20, n_events=200, random_state=1234)
+        ev = data.event
+        sc = data.score
+        n_objects = data.n_objects + 2
+        rec = PMF(C=0.1, k=2, random_state=1234)
+        rec._rng = check_random_state(rec.random_state)
+        rec._init_coef(ev, sc, n_objects)
+
+        # means of residuals computed per object
+        mu = np.mean(sc)
+        assert_allclose(rec.mu_[0], mu, rtol=1e-12)
+        for i in xrange(n_objects[0]):
+            j = ev[:, 0] == i
+            bu = np.mean(sc[j] - mu) if j.any() else 0.0
+            assert_allclose(rec.bu_[i], bu, rtol=1e-12, atol=1e-14)
+        for i in xrange(n_objects[1]):
+            j = ev[:, 1] == i
+            bi = np.mean(sc[j] - (mu + rec.bu_[ev[j, 0]])) if j.any() else 0.0
+            assert_allclose(rec.bi_[i], bi, rtol=1e-12, atol=1e-14)
+
+        # factors of objects without events are zeros
+        res = sc - (mu + rec.bu_[ev[:, 0]] + rec.bi_[ev[:, 1]])
+        rng = check_random_state(rec.random_state)
+        p = rng.normal(0.0, np.sqrt(np.mean(res ** 2)), (30, 2))
+        assert_allclose(rec.p_[:30], p, rtol=1e-12)
+        assert_array_equal(rec.p_[30:], 0.0)
+        assert_array_equal(rec.q_[20:], 0.0)
+
     def test_grad_loss(self):
 
         # setup
@@ -254,6 +286,204 @@ class TestPMF(TestCase):
             [101.688816, 30.9072, 86.899864, 27.822],
             rtol=1e-5)
 
+    def test_loss_and_grad(self):
+        from scipy.optimize import check_grad
+        from kamrecsys.datasets import make_synthetic_events
+        import kamrecsys.base.matrix_factorization as mf
+
+        data = make_synthetic_events(
+            n_users=30, n_items=20, n_events=200, random_state=1234)
+        ev = data.event
+        sc = data.score
+        n_objects = data.n_objects
+        rec = PMF(C=0.1, k=2, random_state=1234)
+        rec._rng = check_random_state(rec.random_state)
+        rec._init_coef(ev, sc, n_objects)
+        coef = rec._coef
+
+        # loss is computed as defined
+        loss, grad = rec.loss_and_grad(coef, ev, sc, n_objects)
+        esc = (rec.mu_[0] + rec.bu_[ev[:, 0]] + rec.bi_[ev[:, 1]] +
+               np.sum(rec.p_[ev[:, 0]] * rec.q_[ev[:, 1]], axis=1))
+        assert_allclose(
+            loss,
+            0.5 * np.sum((sc - esc) ** 2) + 0.05 * np.sum(coef[1:] ** 2),
+            rtol=1e-12)
+        assert_allclose(loss, rec.loss(coef, ev, sc, n_objects), rtol=1e-12)
+        assert_allclose(grad, rec.grad_loss(coef, ev, sc, n_objects),
+                        rtol=1e-12)
+
+        # gradient
+        assert_array_less(
+            check_grad(rec.loss, rec.grad_loss, coef, ev, sc, n_objects),
+            1e-4 * np.linalg.norm(grad))
+
+        # work buffers are reused, but gradients are not
+        grad2 = rec.loss_and_grad(coef, ev, sc, n_objects)[1]
+        self.assertIsNot(grad2, grad)
+        assert_array_equal(grad2, grad)
+
+        # results do not depend on the size of chunks
+        chunk_size = mf.CHUNK_SIZE
+        try:
+            mf.CHUNK_SIZE = 7 * rec.k
+            rec._buffers = None
+            loss2, grad2 = rec.loss_and_grad(coef, ev, sc, n_objects)
+        finally:
+            mf.CHUNK_SIZE = chunk_size
+        assert_allclose(loss2, loss, rtol=1e-12)
+        assert_allclose(grad2, grad, rtol=1e-12, atol=1e-12)
+
+    def test_als(self):
+        import warnings
+        from kamrecsys.data import EventWithScoreData
+        from kamrecsys.datasets import make_synthetic_events
+        import kamrecsys.score_predictor.matrix_factorization as mf
+        from kamrecsys.score_predictor.matrix_factorization import (
+            _solve_ridge)
+
+        # ridge regressions
+        rng = check_random_state(1234)
+        x = rng.normal(size=(6, 3))
+        index = np.array([0, 2, 5, 1, 3, 4, 5])
+        target = rng.normal(size=7)
+        w = _solve_ridge(x, index, target, np.array([0, 3, 3, 7]), 0.5)
+        for j, s in enumerate([slice(0, 3), slice(3, 3), slice(3, 7)]):
+            xs = x[index[s]]
+            assert_allclose(
+                w[j],
+                np.linalg.solve(np.dot(xs.T, xs) + 0.5 * np.identity(3),
+                                np.dot(target[s], xs)),
+                rtol=1e-10, atol=1e-14)
+
+        # objects whose events are padded, and solved in small batches
+        x = rng.normal(size=(8, 6))
+        indptr = np.r_[0, np.cumsum(rng.randint(0, 12, 30))]
+        index = rng.randint(0, 8, indptr[-1])
+        target = rng.normal(size=indptr[-1])
+        gram_block_size = mf.GRAM_BLOCK_SIZE
+        try:
+            mf.GRAM_BLOCK_SIZE = 2 * 2 * 6
+            w = _solve_ridge(x, index, target, indptr[5:], 0.5)
+        finally:
+            mf.GRAM_BLOCK_SIZE = gram_block_size
+        for j in xrange(5, 30):
+            xs = x[index[indptr[j]:indptr[j + 1]]]
+            assert_allclose(
+                w[j - 5],
+                np.linalg.solve(np.dot(xs.T, xs) + 0.5 * np.identity(6),
+                                np.dot(target[indptr[j]:indptr[j + 1]], xs)),
+                rtol=1e-10, atol=1e-14)
+
+        # a loss that reaches zero
+        data = EventWithScoreData()
+        data.set_event(
+            np.array([[u, i] for u in xrange(4) for i in xrange(4)]),
+            np.full(16, 3.0), score_domain=(1, 5, 1))
+        rec = PMF(C=5e-324, k=1, random_state=1234, solver='als')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            rec.fit(data)
+        assert_equal(rec.fit_results_['final_loss'], 0.0)
+        assert_(rec.fit_results_['success'])
+
+        # fitting
+        data = make_synthetic_events(
+            n_users=60, n_items=40, n_events=1000, random_state=1234)
+        rec1 = PMF(C=1.0, k=2, random_state=1234)
+        rec1.fit(data)
+        rec2 = PMF(C=1.0, k=2, random_state=1234, solver='als', maxiter=200)
+        rec2.fit(data)
+        assert_equal(sorted(rec2.fit_results_.keys()),
+                     sorted(rec1.fit_results_.keys()))
+        assert_equal(rec2.fit_results_['optimizer_method'], 'als')
+        assert_(rec2.fit_results_['success'])
+        assert_array_less(rec2.fit_results_['final_loss'],
+                          rec2.fit_results_['initial_loss'])
+        assert_allclose(rec2.fit_results_['final_loss'],
+                        rec1.fit_results_['final_loss'], rtol=1e-2)
+        ev = data.to_eid_event(data.event)
+        assert_allclose(rec2.predict(ev), rec1.predict(ev), atol=0.1)
+
+        # threads
+        rec3 = PMF(C=1.0, k=2, random_state=1234, solver='als', maxiter=200,
+                   n_jobs=2)
+        rec3.fit(data)
+        assert_allclose(rec3.fit_results_['final_loss'],
+                        rec2.fit_results_['final_loss'], rtol=1e-12)
+
+        # errors
+        with assert_raises(ValueError):
+            PMF(solver='invalid').fit(data)
+        with assert_raises(ValueError):
+            PMF(solver='als', method='CG').fit(data)
+        with assert_raises(ValueError):
+            PMF(solver='als', options={'gtol': 1e-3}).fit(data)
+
+    def test_sgd(self):
+        from kamrecsys.datasets import make_synthetic_events
+
+        data = make_synthetic_events(
+            n_users=60, n_items=40, n_events=1000, random_state=1234)
+        ev = data.event
+        sc = data.score
+        n_objects = data.n_objects
+
+        # a gradient of a full batch
+        rec = PMF(C=0.1, k=2, random_state=1234)
+        rec._rng = check_random_state(rec.random_state)
+        rec._init_coef(ev, sc, n_objects)
+        n_object_events = (np.bincount(ev[:, 0]), np.bincount(ev[:, 1]))
+        index, grad = rec._grad_batch(
+            rec._coef, np.arange(1000), ev, sc, n_objects, n_object_events)
+        assert_array_equal(np.sort(index), np.arange(rec._coef.shape[0]))
+        assert_allclose(
+            grad, rec.grad_loss(rec._coef, ev, sc, n_objects)[index] / 1000,
+            rtol=1e-10, atol=1e-14)
+
+        # fitting
+        rec1 = PMF(C=1.0, k=2, random_state=1234, solver='als')
+        rec1.fit(data)
+        rec2 = PMF(C=1.0, k=2, random_state=1234, solver='sgd',
+                   n_epochs=30, batch_size=64, eta0=0.02)
+        rec2.fit(data)
+        assert_equal(sorted(rec2.fit_results_.keys()),
+                     sorted(list(rec1.fit_results_.keys()) +
+                            ['epoch_losses']))
+        assert_equal(rec2.fit_results_['optimizer_method'], 'sgd')
+        assert_equal(len(rec2.fit_results_['epoch_losses']), 30)
+        assert_equal(rec2.fit_results_['final_loss'],
+                     rec2.fit_results_['epoch_losses'][-1])
+        assert_allclose(rec2.fit_results_['final_loss'],
+                        rec1.fit_results_['final_loss'], rtol=2e-2)
+
+        # maxiter is the number of epochs
+        rec3 = PMF(C=1.0, k=2, random_state=1234, solver='sgd', maxiter=3)
+        rec3.fit(data)
+        assert_equal(len(rec3.fit_results_['epoch_losses']), 3)
+        rec3 = PMF(C=1.0, k=2, random_state=1234, solver='sgd',
+                   options={'maxiter': 3})
+        rec3.fit(data)
+        assert_equal(len(rec3.fit_results_['epoch_losses']), 3)
+        self.assertFalse(rec3.fit_results_['success'])
+        assert_equal(rec3.fit_results_['status'], 2)
+
+        # convergence
+        rec3 = PMF(C=1.0, k=2, random_state=1234, solver='sgd',
+                   n_epochs=1000, tol=1e-3)
+        rec3.fit(data)
+        self.assertTrue(rec3.fit_results_['success'])
+        assert_equal(rec3.fit_results_['status'], 0)
+        assert_array_less(rec3.fit_results_['n_iterations'], 1000)
+
+        # errors
+        with assert_raises(ValueError):
+            PMF(solver='sgd', method='CG').fit(data)
+        with assert_raises(ValueError):
+            PMF(solver='sgd', gtol=1e-3).fit(data)
+        with assert_raises(ValueError):
+            PMF(solver='sgd', options={'gtol': 1e-3}).fit(data)
+
     def test_class(self):
 
         data = load_movielens_mini()
@@ -20,8 +20,11 @@ import logging
 from .base import (
     fit_status_message,
     get_fit_status_message,
-    is_binary_score)
+    is_binary_score,
+    get_index_dtype,
+    gen_group_index)
 from .kammath import safe_sigmoid
+from .kamoptimize import minimize_sgd
 from .kamexputils import (
     json_decodable,
     get_system_info,
@@ -39,7 +42,10 @@ __all__ = [
     'fit_status_message',
     'get_fit_status_message',
     'is_binary_score',
+    'get_index_dtype',
+    'gen_group_index',
     'safe_sigmoid',
+    'minimize_sgd',
     'json_decodable',
     'get_system_info',
     'get_version_info']
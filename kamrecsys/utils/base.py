@@ -109,6 +109,74 @@ def is_binary_score(score, allow_uniform=True):
     return is_binary
 
 
+def get_index_dtype(max_value=0, index_dtype=None):
+    """
+    Get the smallest safe dtype for indexes
+
+    Parameters
+    ----------
+    max_value : optional, int
+        the maximum value of indexes (default=0)
+    index_dtype : optional, dtype
+        if specified, this dtype is used if it can represent `max_value`
+
+    Returns
+    -------
+    dtype : np.dtype
+        int32 if it can represent `max_value` ; otherwise, int64
+
+    Raises
+    ------
+    ValueError
+        if `index_dtype` is not an integer type or is too small
+    """
+    if index_dtype is None:
+        if max_value <= np.iinfo(np.int32).max:
+            return np.dtype(np.int32)
+        return np.dtype(np.int64)
+
+    index_dtype = np.dtype(index_dtype)
+    if index_dtype.kind not in 'iu':
+        raise ValueError("index_dtype must be an integer type")
+    if max_value > np.iinfo(index_dtype).max:
+        raise ValueError("index_dtype is too small to represent indexes")
+
+    return index_dtype
+
+
+def gen_group_index(groups, n_groups=None):
+    """
+    Generate a CSR-style index of elements grouped by their group labels
+
+    Indexes of elements in the g-th group are
+    ``order[offsets[g]:offsets[g + 1]]`` , and they are sorted in the
+    ascending order.
+
+    Parameters
+    ----------
+    groups : array, shape=(n_elements,), dtype=int
+        group labels, which must be non-negative integers
+    n_groups : optional, int
+        the number of groups. if None, ``max(groups) + 1`` is used.
+
+    Returns
+    -------
+    offsets : array, shape=(n_groups + 1,), dtype=int
+        start position of each group in `order`
+    order : array, shape=(n_elements,), dtype=int
+        indexes of elements sorted by their group labels
+    """
+    groups = np.asarray(groups)
+    if n_groups is None:
+        n_groups = groups.max() + 1 if groups.shape[0] > 0 else 0
+
+    order = np.argsort(groups, kind='mergesort')
+    offsets = np.zeros(n_groups + 1, dtype=int)
+    np.cumsum(np.bincount(groups, minlength=n_groups), out=offsets[1:])
+
+    return offsets, order
+
+
 # =============================================================================
 # Classes
 # =============================================================================
@@ -43,7 +43,7 @@ __all__ = []
 # =============================================================================
 
 
-def safe_sigmoid(x):
+def safe_sigmoid(x, out=None):
     """
     safe_sigmoid function
 
@@ -56,6 +56,8 @@ def safe_sigmoid(x):
     ----------
     x : array_like, shape=(n_data), dtype=float
         arguments of function
+    out : optional, array, shape=(n_data), dtype=float
+        array to store results, which may be `x` itself
 
     Returns
     -------
@@ -65,9 +67,9 @@ def safe_sigmoid(x):
     # import numpy as np
     # from scipy.special import expit
 
-    x = np.clip(x, -34.538776394910684, 34.538776394910684)
+    x = np.clip(x, -34.538776394910684, 34.538776394910684, out=out)
 
-    return expit(x)
+    return expit(x, out=out)
 
 
 # =============================================================================
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Optimizers shared by recommenders
+"""
+
+from __future__ import (
+    print_function,
+    division,
+    absolute_import,
+    unicode_literals)
+from six.moves import xrange
+
+# =============================================================================
+# Imports
+# =============================================================================
+
+import logging
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+from sklearn.utils import check_random_state
+
+from .base import get_fit_status_message
+
+# =============================================================================
+# Metadata variables
+# =============================================================================
+
+# =============================================================================
+# Public symbols
+# =============================================================================
+
+__all__ = []
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+# =============================================================================
+# Variables
+# =============================================================================
+
+# =============================================================================
+# Functions
+# =============================================================================
+
+
+def minimize_sgd(
+        fun, x0, grad, n_samples, n_epochs=10, batch_size=256,
+        learning_rate='adam', eta0=0.01, decay=1.0, beta1=0.9, beta2=0.999,
+        epsilon=1e-8, tol=None, random_state=None):
+    """
+    Minimize a sum of losses of samples by mini-batch stochastic gradient
+    descent
+
+    In each epoch, samples are shuffled and split into mini-batches.  For each
+    mini-batch, `grad` returns a stochastic gradient only at the elements of
+    parameters that are affected by the mini-batch, and only these elements
+    are updated.  Besides parameters, memory of size ``n_samples`` is used for
+    shuffling, and memory of twice the size of parameters is used for the
+    'adam' schedule, regardless of the number of epochs.  Optimization
+    terminates successfully if the relative change of an objective function
+    between epochs is less than `tol` ; otherwise, the status of results
+    indicates that the maximum number of iterations has been exceeded.
+
+    Parameters
+    ----------
+    fun : callable
+        ``fun(x)`` returns a value of an objective function, which is
+        evaluated at the end of each epoch
+    x0 : array, shape=(n_parameters,), dtype=float
+        initial parameters
+    grad : callable
+        ``grad(x, batch)`` returns a pair of unique positions of parameters
+        affected by samples whose indexes are `batch` , and a stochastic
+        gradient at these positions.  gradients are those of an objective
+        function divided by ``n_samples`` .
+    n_samples : int
+        the number of samples
+    n_epochs : optional, int
+        the number of epochs (default=10)
+    batch_size : optional, int
+        the number of samples in a mini-batch (default=256)
+    learning_rate : optional, {'constant', 'decay', 'adam'}
+        schedule of learning rates.  if 'constant', a learning rate is
+        `eta0` .  if 'decay', a learning rate of the t-th epoch is
+        ``eta0 / (1 + decay * t)`` .  if 'adam', steps are adapted by Adam
+        [1]_ , whose moments of elements are updated only when these are
+        affected.  (default='adam')
+    eta0 : optional, float
+        initial learning rate (default=0.01)
+    decay : optional, float
+        decay rate of the 'decay' schedule (default=1.0)
+    beta1 : optional, float
+        decay rate of the first moments of the 'adam' schedule
+        (default=0.9)
+    beta2 : optional, float
+        decay rate of the second moments of the 'adam' schedule
+        (default=0.999)
+    epsilon : optional, float
+        constant for numerical stability of the 'adam' schedule
+        (default=1e-8)
+    tol : optional, float
+        tolerance of relative changes of an objective function between
+        epochs.  if None, all epochs are run without checking convergence.
+        (default=None)
+    random_state : RandomState or an int seed, optional
+        random number generator for shuffling samples
+
+    Returns
+    -------
+    res : OptimizeResult
+        results in the same format as :func:`scipy.optimize.minimize` .
+        values of an objective function after each epoch are stored in
+        `epoch_losses` .  `success` is True only if `tol` is satisfied.
+
+    Raises
+    ------
+    ValueError
+        if `learning_rate` is invalid
+
+    References
+    ----------
+    .. [1] D. P. Kingma and J. Ba. "Adam: A Method for Stochastic
+        Optimization", ICLR2015
+    """
+    if learning_rate not in ('constant', 'decay', 'adam'):
+        raise ValueError(
+            "Invalid learning_rate: {0!s}".format(learning_rate))
+    rng = check_random_state(random_state)
+
+    x = np.array(x0, dtype=float)
+    if learning_rate == 'adam':
+        m = np.zeros_like(x)
+        v = np.zeros_like(x)
+
+    n_steps = 0
+    status = 2
+    epoch_losses = []
+    for epoch in xrange(n_epochs):
+        if learning_rate == 'decay':
+            eta = eta0 / (1.0 + decay * epoch)
+        else:
+            eta = eta0
+
+        order = rng.permutation(n_samples)
+        for i in xrange(0, n_samples, batch_size):
+            index, g = grad(x, order[i:i + batch_size])
+            n_steps += 1
+
+            if learning_rate == 'adam':
+                m[index] = beta1 * m[index] + (1.0 - beta1) * g
+                v[index] = beta2 * v[index] + (1.0 - beta2) * (g * g)
+                step = (eta * np.sqrt(1.0 - beta2 ** n_steps) /
+                        (1.0 - beta1 ** n_steps))
+                x[index] -= step * m[index] / (np.sqrt(v[index]) + epsilon)
+            else:
+                x[index] -= eta * g
+
+        epoch_losses.append(fun(x))
+        logger.info("epoch {:d}: {:.15g}".format(epoch + 1, epoch_losses[-1]))
+
+        # check convergence
+        if tol is not None and epoch > 0:
+            cur_loss = epoch_losses[-1]
+            precision = np.abs(cur_loss - epoch_losses[-2]) / max(
+                np.abs(cur_loss), np.finfo(float).eps)
+            if precision < tol:
+                status = 0
+                break
+
+    n_iterations = len(epoch_losses)
+
+    return OptimizeResult(
+        x=x, fun=epoch_losses[-1] if n_iterations > 0 else fun(x),
+        success=(status == 0), status=status,
+        message=get_fit_status_message(status), nit=n_iterations,
+        nfev=n_iterations, njev=n_steps, epoch_losses=epoch_losses)
+
+
+# =============================================================================
+# Classes
+# =============================================================================
+
+# =============================================================================
+# Module initialization
+# =============================================================================
+
+# init logging system
+logger = logging.getLogger('kamrecsys')
+if not logger.handlers:
+    logger.addHandler(logging.NullHandler())
+
+# =============================================================================
+# Test routine
+# =============================================================================
+
+
+def _test():
+    """ test function for this module
+    """
+
+    # perform doctest
+    import sys
+    import doctest
+
+    doctest.testmod()
+
+    sys.exit(0)
+
+
+# Check if this is call as command script
+
+if __name__ == '__main__':
+    _test()
@@ -51,6 +51,36 @@ def test_is_binary_score():
     assert_(not is_binary_score([1], allow_uniform=False))
 
 
+def test_get_index_dtype():
+    from kamrecsys.utils import get_index_dtype
+
+    assert_equal(get_index_dtype(), np.int32)
+    assert_equal(get_index_dtype(2 ** 31 - 1), np.int32)
+    assert_equal(get_index_dtype(2 ** 31), np.int64)
+    assert_equal(get_index_dtype(100, index_dtype=np.int16), np.int16)
+    assert_equal(get_index_dtype(100, index_dtype=int), np.int_)
+    with assert_raises(ValueError):
+        get_index_dtype(2 ** 31, index_dtype=np.int32)
+    with assert_raises(ValueError):
+        get_index_dtype(100, index_dtype=float)
+
+
+def test_gen_group_index():
+    from kamrecsys.utils import gen_group_index
+
+    offsets, order = gen_group_index([2, 0, 2, 3, 0, 2])
+    assert_array_equal(offsets, [0, 2, 2, 5, 6])
+    assert_array_equal(order, [1, 4, 0, 2, 5, 3])
+
+    offsets, order = gen_group_index([1, 1], n_groups=3)
+    assert_array_equal(offsets, [0, 0, 2, 2])
+    assert_array_equal(order, [0, 1])
+
+    offsets, order = gen_group_index(np.array([], dtype=int))
+    assert_array_equal(offsets, [0])
+    assert_equal(order.shape, (0,))
+
+
 # =============================================================================
 # Test Classes
 # =============================================================================
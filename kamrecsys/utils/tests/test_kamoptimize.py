@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import (
+    print_function,
+    division,
+    absolute_import,
+    unicode_literals)
+from six.moves import xrange
+
+# =============================================================================
+# Imports
+# =============================================================================
+
+from numpy.testing import (
+    TestCase,
+    run_module_suite,
+    assert_,
+    assert_allclose,
+    assert_array_almost_equal_nulp,
+    assert_array_max_ulp,
+    assert_array_equal,
+    assert_array_less,
+    assert_equal,
+    assert_raises,
+    assert_raises_regex,
+    assert_warns,
+    assert_string_equal)
+import numpy as np
+
+# =============================================================================
+# Variables
+# =============================================================================
+
+# =============================================================================
+# Functions
+# =============================================================================
+
+
+def test_minimize_sgd():
+    from kamrecsys.utils import minimize_sgd
+
+    # least squares whose samples are observations of elements
+    rng = np.random.RandomState(1234)
+    pos = rng.randint(0, 5, 1000)
+    pos[:5] = np.arange(5)
+    target = rng.normal(np.arange(5)[pos], 0.1)
+    solution = (np.bincount(pos, weights=target) /
+                np.bincount(pos).astype(float))
+
+    def fun(x):
+        return 0.5 * np.sum((x[pos] - target) ** 2)
+
+    def grad(x, batch):
+        index, inv = np.unique(pos[batch], return_inverse=True)
+        g = np.bincount(inv, weights=x[pos[batch]] - target[batch])
+        return index, g / batch.shape[0]
+
+    for kwargs in [{'learning_rate': 'constant', 'eta0': 0.5},
+                   {'learning_rate': 'decay', 'eta0': 1.0, 'decay': 0.1},
+                   {'learning_rate': 'adam', 'eta0': 0.1}]:
+        x0 = np.zeros(5)
+        res = minimize_sgd(fun, x0, grad, 1000, n_epochs=30, batch_size=50,
+                           random_state=1234, **kwargs)
+        assert_allclose(res.x, solution, atol=0.05)
+        assert_array_equal(x0, 0.0)
+        assert_equal(len(res.epoch_losses), 30)
+        assert_equal(res.fun, res.epoch_losses[-1])
+        assert_equal(res.nit, 30)
+        assert_equal(res.njev, 30 * 20)
+        assert_(not res.success)
+        assert_equal(res.status, 2)
+
+    # random state
+    res2 = minimize_sgd(fun, np.zeros(5), grad, 1000, n_epochs=30,
+                        batch_size=50, random_state=1234, **kwargs)
+    assert_array_equal(res2.x, res.x)
+
+    # convergence
+    res = minimize_sgd(fun, np.zeros(5), grad, 1000, n_epochs=1000,
+                       batch_size=50, eta0=0.1, tol=1e-3, random_state=1234)
+    assert_(res.success)
+    assert_equal(res.status, 0)
+    assert_(res.nit < 1000)
+    assert_equal(len(res.epoch_losses), res.nit)
+    assert_allclose(res.x, solution, atol=0.05)
+    res = minimize_sgd(fun, np.zeros(5), grad, 1000, n_epochs=2,
+                       batch_size=50, eta0=0.1, tol=1e-12, random_state=1234)
+    assert_(not res.success)
+    assert_equal(res.nit, 2)
+
+    # no epochs
+    res = minimize_sgd(fun, np.ones(5), grad, 1000, n_epochs=0)
+    assert_array_equal(res.x, 1.0)
+    assert_equal(res.epoch_losses, [])
+    assert_allclose(res.fun, fun(np.ones(5)))
+
+    with assert_raises(ValueError):
+        minimize_sgd(fun, np.zeros(5), grad, 1000, learning_rate='newton')
+
+
+# =============================================================================
+# Test Classes
+# =============================================================================
+
+# =============================================================================
+# Main Routine
+# =============================================================================
+
+if __name__ == '__main__':
+    run_module_suite()
@@ -0,0 +1,488 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of data containers and recommenders
+
+Each benchmark is run `repeat` times and the best elapsed time is reported.
+Benchmarks on sample data sets, such as ``movielens1m`` or ``flixster``, are
+skipped if the corresponding files are not found in the sample directory.
+
+Output Format
+-------------
+
+One line per benchmark, separated by tabs:
+
+* name of the benchmark
+* the best elapsed time in seconds
+* the number of processed events per second
+
+Options
+=======
+
+-b <BENCH>, --bench <BENCH>
+    benchmark to run. can be specified multiple times. default=all
+
+    * set_event : :meth:`kamrecsys.data.EventData.set_event` on synthetic
+      events
+    * loader : sample data loaders, ``movielens1m`` and ``flixster``
+    * load_event : :func:`kamrecsys.datasets.load_event_with_score` on a
+      synthetic event file with timestamps
+    * load_event_parallel : the same as ``load_event`` , but the file is
+      parsed by 1, 2, 4, 8, and 16 processes
+    * predict : :meth:`kamrecsys.score_predictor.PMF.predict` on
+      ``movielens1m`` , or on synthetic events of the same size if the data
+      is not available
+    * synthetic : :func:`kamrecsys.datasets.make_synthetic_events`
+    * aggregate : :meth:`kamrecsys.data.EventWithScoreData.aggregate` on
+      synthetic events, a half of which are duplicated
+    * to_csr : :meth:`kamrecsys.data.EventData.to_csr` on synthetic events,
+      with and without a cache
+    * init_coef : initialization of :class:`kamrecsys.score_predictor.PMF`
+      on ``movielens1m`` , or on synthetic events of the same size
+
+-n <N_EVENTS>, --n-events <N_EVENTS>
+    the number of events in synthetic data, default=1000000
+-r <REPEAT>, --repeat <REPEAT>
+    the number of repetitions, default=3
+-o <OUTPUT>, --out <OUTPUT>
+    specify output file name
+--rseed <RSEED>
+    random number seed. if None, use /dev/urandom (default None)
+-h, --help
+    show this help message and exit
+--version
+    show program's version number and exit
+"""
+
+from __future__ import (
+    print_function,
+    division,
+    absolute_import)
+from six.moves import xrange
+
+# =============================================================================
+# Imports
+# =============================================================================
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+from kamrecsys.data import EventData, EventWithScoreData
+from kamrecsys.datasets import (
+    SAMPLE_PATH, event_dtype_timestamp, load_event_with_score,
+    load_flixster_rating, load_movielens1m, make_synthetic_events)
+from kamrecsys.score_predictor import PMF
+
+# =============================================================================
+# Module metadata variables
+# =============================================================================
+
+__author__ = "Toshihiro Kamishima ( http://www.kamishima.net/ )"
+__date__ = "2018-03-01"
+__version__ = "1.0.0"
+__copyright__ = "Copyright (c) 2018 Toshihiro Kamishima all rights reserved."
+__license__ = "MIT License: http://www.opensource.org/licenses/mit-license.php"
+
+# =============================================================================
+# Public symbols
+# =============================================================================
+
+__all__ = ['do_task']
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+# =============================================================================
+# Module variables
+# =============================================================================
+
+# =============================================================================
+# Functions
+# =============================================================================
+
+
+def gen_synthetic_event(n_events, n_users=100000, n_items=20000, rng=None):
+    """
+    Generate synthetic events whose objects are represented by sparse external
+    ids
+
+    Parameters
+    ----------
+    n_events : int
+        the number of events
+    n_users : int
+        the number of possible users
+    n_items : int
+        the number of possible items
+    rng : RandomState
+        random number generator
+
+    Returns
+    -------
+    event : array, shape=(n_events, 2), dtype=int
+        events represented by external ids
+    score : array, shape=(n_events,), dtype=float
+        rating scores in the domain [1, 5]
+    """
+    if rng is None:
+        rng = np.random.RandomState()
+
+    event = np.c_[rng.randint(0, n_users, n_events) * 7 + 1,
+                  rng.randint(0, n_items, n_events) * 3 + 2]
+    score = rng.randint(1, 6, n_events).astype(float)
+
+    return event, score
+
+
+def run_bench(opt, name, stmt, n_events):
+    """
+    Run one benchmark and output its result
+
+    Parameters
+    ----------
+    opt : argparse.Namespace
+        Parsed command-line arguments
+    name : str
+        name of the benchmark
+    stmt : callable
+        target to measure
+    n_events : int
+        the number of events processed by the one call of `stmt`
+    """
+    elapsed = min(timeit.repeat(stmt, number=1, repeat=opt.repeat))
+    print("{:s}\t{:.6f}\t{:.1f}".format(name, elapsed, n_events / elapsed),
+          file=opt.outfile)
+
+
+def bench_set_event(opt, rng):
+    """ EventData.set_event on synthetic events
+    """
+    event, score = gen_synthetic_event(opt.n_events, rng=rng)
+
+    def stmt():
+        data = EventData(n_otypes=2, event_otypes=(0, 1))
+        data.set_event(event)
+
+    run_bench(opt, 'set_event', stmt, opt.n_events)
+
+
+def bench_loader(opt, rng):
+    """ Sample data loaders
+    """
+    loaders = [
+        ('movielens1m.event', 'load_movielens1m', load_movielens1m),
+        ('flixster.event', 'load_flixster_rating', load_flixster_rating)]
+
+    for file_name, name, loader in loaders:
+        if not os.path.exists(os.path.join(SAMPLE_PATH, file_name)):
+            print("{:s}\tskipped".format(name), file=opt.outfile)
+            continue
+        n_events = loader().n_events
+        run_bench(opt, name, loader, n_events)
+
+
+def write_synthetic_event_file(file_name, n_events, rng):
+    """
+    Write a synthetic event file with timestamps
+
+    Parameters
+    ----------
+    file_name : str
+        path to an output file
+    n_events : int
+        the number of events
+    rng : RandomState
+        random number generator
+    """
+    event, score = gen_synthetic_event(n_events, rng=rng)
+    timestamp = rng.randint(874724710, 893286638, n_events)
+
+    with open(file_name, 'w') as f:
+        f.write("# Synthetic data set\n")
+        f.write("# user_id\titem_id\tscore\ttimestamp\n")
+        np.savetxt(f, np.c_[event, score, timestamp],
+                   fmt=str('%d\t%d\t%.1f\t%d'))
+
+
+def bench_load_event(opt, rng):
+    """ load_event_with_score on a synthetic event file
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        infile = os.path.join(tmp_dir, 'synthetic.event')
+        write_synthetic_event_file(infile, opt.n_events, rng)
+
+        def stmt():
+            load_event_with_score(
+                infile, score_domain=(1., 5., 1.),
+                event_dtype=event_dtype_timestamp)
+
+        run_bench(opt, 'load_event', stmt, opt.n_events)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def bench_load_event_parallel(opt, rng):
+    """ load_event_with_score with 1 to 16 processes
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        infile = os.path.join(tmp_dir, 'synthetic.event')
+        write_synthetic_event_file(infile, opt.n_events, rng)
+
+        for n_jobs in [1, 2, 4, 8, 16]:
+            def stmt():
+                load_event_with_score(
+                    infile, score_domain=(1., 5., 1.),
+                    event_dtype=event_dtype_timestamp, n_jobs=n_jobs)
+
+            run_bench(opt, 'load_event_parallel_{:d}'.format(n_jobs), stmt,
+                      opt.n_events)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def bench_synthetic(opt, rng):
+    """ make_synthetic_events with power-law popularity
+    """
+    def stmt():
+        make_synthetic_events(
+            n_users=opt.n_events // 10, n_items=opt.n_events // 50,
+            n_events=opt.n_events, k=10, random_state=rng)
+
+    run_bench(opt, 'synthetic', stmt, opt.n_events)
+
+
+def load_movielens1m_or_synthetic(rng):
+    """
+    Load ``movielens1m`` , or generate synthetic events of the same size if
+    the data is not available
+
+    Parameters
+    ----------
+    rng : RandomState
+        random number generator
+
+    Returns
+    -------
+    data : :class:`kamrecsys.data.EventWithScoreData`
+        loaded data
+    """
+    if os.path.exists(os.path.join(SAMPLE_PATH, 'movielens1m.event')):
+        return load_movielens1m()
+
+    return make_synthetic_events(
+        n_users=6040, n_items=3706, n_events=1000209, k=5, random_state=rng)
+
+
+def bench_init_coef(opt, rng):
+    """ PMF._init_coef, which sets biases and initial latent factors
+    """
+    data = load_movielens1m_or_synthetic(rng)
+    rec = PMF(C=0.1, k=10, random_state=1234)
+    rec._rng = np.random.RandomState(1234)
+
+    def stmt():
+        rec._init_coef(data.event, data.score, data.n_objects)
+
+    run_bench(opt, 'init_coef', stmt, data.n_events)
+
+
+def bench_loss_and_grad(opt, rng):
+    """ PMF.loss_and_grad, which is evaluated once per iteration of fitting
+    """
+    data = load_movielens1m_or_synthetic(rng)
+
+    for k in [10, 50]:
+        rec = PMF(C=0.1, k=k, random_state=1234)
+        rec._rng = np.random.RandomState(1234)
+        rec._init_coef(data.event, data.score, data.n_objects)
+
+        def stmt():
+            rec.loss_and_grad(
+                rec._coef, data.event, data.score, data.n_objects)
+
+        run_bench(opt, 'loss_and_grad_k{:d}'.format(k), stmt, data.n_events)
+
+
+def bench_fit(opt, rng):
+    """ PMF.fit by each solver, whose default settings are used
+    """
+    data = load_movielens1m_or_synthetic(rng)
+
+    for solver in ['als', 'sgd', 'minimize']:
+        rec = PMF(C=10.0, k=10, random_state=1234, solver=solver)
+
+        def stmt():
+            rec.fit(data)
+
+        run_bench(opt, 'fit_' + solver, stmt, data.n_events)
+
+
+def bench_predict(opt, rng):
+    """ PMF.predict, which includes the conversion to internal ids
+    """
+    data = load_movielens1m_or_synthetic(rng)
+    ev = data.to_eid_event(data.event)
+
+    rec = PMF(C=0.1, k=1, maxiter=1, random_state=1234)
+    rec.fit(data.filter_event(np.arange(data.n_events) % 10 == 0))
+
+    def stmt():
+        rec.predict(ev)
+
+    run_bench(opt, 'predict', stmt, ev.shape[0])
+
+
+def bench_aggregate(opt, rng):
+    """ EventWithScoreData.aggregate on synthetic events with duplicates
+    """
+    n_pairs = max(opt.n_events // 2, 1)
+    event, score = gen_synthetic_event(
+        opt.n_events, n_users=n_pairs // 100 + 1, n_items=100, rng=rng)
+    data = EventWithScoreData(n_otypes=2, event_otypes=(0, 1))
+    data.set_event(event, score, score_domain=(1., 5., 1.))
+
+    for how in ['last', 'mean']:
+        def stmt():
+            data.aggregate(how)
+
+        run_bench(opt, 'aggregate_' + how, stmt, opt.n_events)
+
+
+def bench_to_csr(opt, rng):
+    """ EventWithScoreData.to_csr on synthetic events
+    """
+    event, score = gen_synthetic_event(opt.n_events, rng=rng)
+    data = EventWithScoreData(n_otypes=2, event_otypes=(0, 1))
+    data.set_event(event, score, score_domain=(1., 5., 1.))
+
+    def stmt():
+        data._clear_cache()
+        data.to_csr()
+
+    run_bench(opt, 'to_csr', stmt, opt.n_events)
+
+    def stmt():
+        data.to_csr()
+
+    run_bench(opt, 'to_csr_cached', stmt, opt.n_events)
+
+
+def do_task(opt):
+    """
+    Main task
+
+    Parameters
+    ----------
+    opt : argparse.Namespace
+        Parsed command-line arguments
+    """
+
+    rng = np.random.RandomState(opt.rseed)
+
+    for name in opt.bench:
+        BENCHMARKS[name](opt, rng)
+
+    if opt.outfile is not sys.stdout:
+        opt.outfile.close()
+
+# =============================================================================
+# Classes
+# =============================================================================
+
+# =============================================================================
+# Main routine
+# =============================================================================
+
+BENCHMARKS = {
+    'set_event': bench_set_event,
+    'loader': bench_loader,
+    'load_event': bench_load_event,
+    'load_event_parallel': bench_load_event_parallel,
+    'predict': bench_predict,
+    'synthetic': bench_synthetic,
+    'aggregate': bench_aggregate,
+    'to_csr': bench_to_csr,
+    'init_coef': bench_init_coef,
+    'loss_and_grad': bench_loss_and_grad,
+    'fit': bench_fit,
+}
+
+
+def command_line_parser():
+    """
+    Parsing Command-Line Options
+
+    Returns
+    -------
+    opt : argparse.Namespace
+        Parsed command-line arguments
+    """
+    # import argparse
+    # import sys
+
+    ap = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=__doc__)
+
+    # common options
+    ap.add_argument('--version', action='version',
+                    version='%(prog)s ' + __version__)
+
+    ap.add_argument("--rseed", type=int, default=None)
+
+    # basic file i/o
+    ap.add_argument('-o', '--out', dest='outfile', default=None,
+                    type=argparse.FileType('w'))
+    ap.add_argument('outfilep', nargs='?', metavar='OUTFILE',
+                    default=sys.stdout, type=argparse.FileType('w'))
+
+    # script specific options
+    ap.add_argument('-b', '--bench', action='append',
+                    choices=sorted(BENCHMARKS.keys()))
+    ap.add_argument('-n', '--n-events', dest='n_events', type=int,
+                    default=1000000)
+    ap.add_argument('-r', '--repeat', type=int, default=3)
+
+    # parsing
+    opt = ap.parse_args()
+
+    # post-processing for command-line options
+
+    # basic file i/o
+    if opt.outfile is None:
+        opt.outfile = opt.outfilep
+    del vars(opt)['outfilep']
+
+    # benchmarks
+    if opt.bench is None:
+        opt.bench = sorted(BENCHMARKS.keys())
+
+    return opt
+
+
+def main():
+    """ Main routine
+    """
+    # command-line arguments
+    opt = command_line_parser()
+
+    # do main task
+    do_task(opt)
+
+
+# top level -------------------------------------------------------------------
+# Call main routine if this is invoked as a top-level script environment.
+if __name__ == '__main__':
+
+    main()
+
+    sys.exit(0)
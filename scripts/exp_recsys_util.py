@@ -254,7 +254,7 @@ def cv_test(info, load_data, target_fold=None):
 
         # training
         logger.info("training fold = " + str(fold + 1) + " / " + str(n_folds))
-        training_data = data.filter_event(train_i)
+        training_data = data.filter_event(train_i, view=True)
         rec = info['model']['recommender'](**info['model']['options'])
         training_info = training(rec, training_data)
         info['training']['results'][str(fold)] = training_info
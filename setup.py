@@ -25,7 +25,8 @@ setup(
         'kamrecsys': [
             os.path.join('datasets', 'data', '*.event'),
             os.path.join('datasets', 'data', '*.user'),
-            os.path.join('datasets', 'data', '*.item')]
+            os.path.join('datasets', 'data', '*.item'),
+            os.path.join('datasets', 'data', '*.bin', '*')]
     },
     install_requires=[
         'numpy',